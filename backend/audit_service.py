@@ -1,18 +1,36 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from fastapi import HTTPException, status
+import asyncio
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
 # ARCHITECTURAL GUARD: Financial entity types that CANNOT be deleted
-FINANCIAL_ENTITY_TYPES = [
+FINANCIAL_ENTITY_TYPES = frozenset({
     "WORK_ORDER",
     "PAYMENT_CERTIFICATE",
     "PAYMENT",
     "RETENTION_RELEASE"
-]
+})
+
+# Audit write batching: flush when either limit is reached
+AUDIT_FLUSH_MAX_BATCH = 500
+AUDIT_FLUSH_INTERVAL_SECONDS = 0.05
+
+# Index key patterns for get_audit_logs: equality fields first, then the sort key
+AUDIT_ENTITY_INDEX = [("organisation_id", 1), ("entity_type", 1), ("entity_id", 1), ("timestamp", -1)]
+AUDIT_PROJECT_INDEX = [("organisation_id", 1), ("project_id", 1), ("timestamp", -1)]
+
+# Retention: audit entries expire via a TTL index on timestamp. The default
+# (7 years) covers statutory retention for financial records.
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", "2555"))
+
+# Superseded by AUDIT_ENTITY_INDEX (every audit query filters on organisation_id)
+LEGACY_AUDIT_INDEXES = ["entity_type_1_entity_id_1"]
 
 class AuditService:
     """Service for immutable audit logging"""
@@ -20,6 +38,74 @@ class AuditService:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.collection = db.audit_logs
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._pending_inserts = set()
+        # Set once create_indexes has built the lookup indexes get_audit_logs hints
+        self._indexes_ready = False
+    
+    async def start(self):
+        """
+        Start the background flusher.
+        
+        Once running, log_action enqueues entries and the flusher writes them
+        with insert_many instead of one insert_one round-trip per entry.
+        """
+        if self._flusher is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._flusher = asyncio.create_task(self._flush_loop())
+    
+    async def stop(self):
+        """Stop the background flusher after draining queued entries"""
+        if self._pending_inserts:
+            await asyncio.gather(*self._pending_inserts, return_exceptions=True)
+        
+        flusher = self._flusher
+        if flusher is None:
+            return
+        # Stop accepting queued entries; late callers fall back to insert_one
+        self._flusher = None
+        await self._queue.put(None)
+        await flusher
+        self._queue = None
+    
+    async def _flush_loop(self):
+        """Drain the queue in batches of up to AUDIT_FLUSH_MAX_BATCH entries"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        
+        while not stopping:
+            entry = await self._queue.get()
+            if entry is None:
+                break
+            
+            batch = [entry]
+            deadline = loop.time() + AUDIT_FLUSH_INTERVAL_SECONDS
+            
+            while len(batch) < AUDIT_FLUSH_MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            
+            await self._write_batch(batch)
+    
+    async def _write_batch(self, batch: List[Dict[str, Any]]):
+        """Insert a batch of audit entries"""
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+            logger.info("Audit log batch created: %s entries", len(batch))
+        except Exception as e:
+            # Don't fail the main operation if audit logging fails
+            logger.error("Failed to create audit log batch: %s", e)
     
     def enforce_financial_delete_guard(self, entity_type: str, action_type: str):
         """
@@ -36,6 +122,40 @@ class AuditService:
                 detail=f"ARCHITECTURAL GUARD: Cannot DELETE {entity_type}. Financial entities are immutable. Use status flags or soft delete instead."
             )
     
+    def _build_entry(
+        self,
+        organisation_id: str,
+        module_name: str,
+        entity_type: str,
+        entity_id: str,
+        action_type: str,
+        user_id: str,
+        project_id: Optional[str],
+        old_value: Optional[Dict[str, Any]],
+        new_value: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        return {
+            "organisation_id": organisation_id,
+            "project_id": project_id,
+            "module_name": module_name,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "action_type": action_type,
+            "old_value_json": old_value,
+            "new_value_json": new_value,
+            "user_id": user_id,
+            "timestamp": datetime.utcnow()
+        }
+    
+    async def _insert_entry(self, audit_entry: Dict[str, Any]):
+        """Insert a single audit entry"""
+        try:
+            await self.collection.insert_one(audit_entry)
+            logger.info("Audit log created: %s on %s:%s by user:%s", audit_entry['action_type'], audit_entry['entity_type'], audit_entry['entity_id'], audit_entry['user_id'])
+        except Exception as e:
+            # Don't fail the main operation if audit logging fails
+            logger.error("Failed to create audit log: %s", e)
+    
     async def log_action(
         self,
         organisation_id: str,
@@ -51,30 +171,86 @@ class AuditService:
         """
         Log an action to audit trail (INSERT ONLY).
         
+        Entries are queued for the batch flusher when it is running,
+        otherwise inserted directly.
+        
         ENFORCES: Financial entity delete guard.
         """
         # ARCHITECTURAL GUARD: Enforce financial delete protection
         self.enforce_financial_delete_guard(entity_type, action_type)
         
+        audit_entry = self._build_entry(
+            organisation_id, module_name, entity_type, entity_id, action_type,
+            user_id, project_id, old_value, new_value
+        )
+        
+        if self._flusher is not None:
+            self._queue.put_nowait(audit_entry)
+            return
+        
+        await self._insert_entry(audit_entry)
+    
+    def log_action_background(
+        self,
+        organisation_id: str,
+        module_name: str,
+        entity_type: str,
+        entity_id: str,
+        action_type: str,
+        user_id: str,
+        project_id: Optional[str] = None,
+        old_value: Optional[Dict[str, Any]] = None,
+        new_value: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Fire-and-forget variant of log_action for request handlers.
+        
+        Returns without waiting on the database. The financial delete guard
+        still runs synchronously and raises before anything is scheduled.
+        """
+        # ARCHITECTURAL GUARD: Enforce financial delete protection
+        self.enforce_financial_delete_guard(entity_type, action_type)
+        
+        audit_entry = self._build_entry(
+            organisation_id, module_name, entity_type, entity_id, action_type,
+            user_id, project_id, old_value, new_value
+        )
+        
+        if self._flusher is not None:
+            self._queue.put_nowait(audit_entry)
+            return
+        
+        # Keep a reference so the task is not garbage collected mid-flight
+        task = asyncio.create_task(self._insert_entry(audit_entry))
+        self._pending_inserts.add(task)
+        task.add_done_callback(self._pending_inserts.discard)
+    
+    async def create_indexes(self):
+        """
+        Create audit log indexes.
+        
+        The compound indexes let get_audit_logs walk the sort order instead of
+        sorting in memory; the TTL index bounds the collection to the retention window.
+        """
         try:
-            audit_entry = {
-                "organisation_id": organisation_id,
-                "project_id": project_id,
-                "module_name": module_name,
-                "entity_type": entity_type,
-                "entity_id": entity_id,
-                "action_type": action_type,
-                "old_value_json": old_value,
-                "new_value_json": new_value,
-                "user_id": user_id,
-                "timestamp": datetime.utcnow()
-            }
+            await self.collection.create_indexes([
+                IndexModel(AUDIT_ENTITY_INDEX, name="audit_entity_lookup"),
+                IndexModel(AUDIT_PROJECT_INDEX, name="audit_project_lookup"),
+                IndexModel(
+                    [("timestamp", 1)],
+                    name="audit_retention_ttl",
+                    expireAfterSeconds=AUDIT_RETENTION_DAYS * 86400
+                )
+            ])
+            self._indexes_ready = True
             
-            await self.collection.insert_one(audit_entry)
-            logger.info(f"Audit log created: {action_type} on {entity_type}:{entity_id} by user:{user_id}")
+            existing = await self.collection.index_information()
+            for index_name in LEGACY_AUDIT_INDEXES:
+                if index_name in existing:
+                    await self.collection.drop_index(index_name)
+            logger.info("Audit log indexes created")
         except Exception as e:
-            # Don't fail the main operation if audit logging fails
-            logger.error(f"Failed to create audit log: {str(e)}")
+            logger.warning("Audit index creation: %s", e)
     
     async def get_audit_logs(
         self,
@@ -82,9 +258,16 @@ class AuditService:
         entity_type: Optional[str] = None,
         entity_id: Optional[str] = None,
         project_id: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        fields: Optional[List[str]] = None,
+        summary: bool = False
     ):
-        """Retrieve audit logs (READ ONLY)"""
+        """
+        Retrieve audit logs (READ ONLY)
+        
+        fields restricts the returned document to the listed fields;
+        summary drops the old/new value JSON blobs for list views.
+        """
         query = {"organisation_id": organisation_id}
         
         if entity_type:
@@ -94,7 +277,23 @@ class AuditService:
         if project_id:
             query["project_id"] = project_id
         
-        cursor = self.collection.find(query).sort("timestamp", -1).limit(limit)
+        projection = None
+        if fields:
+            projection = {field: 1 for field in fields}
+        elif summary:
+            projection = {"old_value_json": 0, "new_value_json": 0}
+        
+        cursor = self.collection.find(query, projection)
+        
+        # Pin the compound index whose equality prefix matches the filter;
+        # a hint naming a missing index fails the query, so only once built
+        if self._indexes_ready:
+            if entity_type:
+                cursor = cursor.hint(AUDIT_ENTITY_INDEX)
+            elif project_id:
+                cursor = cursor.hint(AUDIT_PROJECT_INDEX)
+        
+        cursor = cursor.sort("timestamp", -1).limit(limit)
         logs = await cursor.to_list(length=limit)
         
         # Convert ObjectId to string
@@ -1,35 +1,109 @@
-from datetime import datetime, timedelta
-from typing import Optional
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional, Tuple, Callable, Awaitable, Dict
+import base64
+import hashlib
+import threading
 import jwt
-from passlib.context import CryptContext
+import bcrypt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import asyncio
 import os
-import secrets
+import time
 
 # JWT Configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production-2024")
 REFRESH_SECRET_KEY = os.getenv("JWT_REFRESH_SECRET_KEY", "your-refresh-secret-key-change-in-production-2024")
 ALGORITHM = "HS256"
 
+# Reused JWT codec and byte-encoded HMAC keys, so token handling does not
+# re-encode the secrets or rebuild decode options on every request
+_jwt_codec = jwt.PyJWT()
+_ACCESS_KEY = SECRET_KEY.encode("utf-8")
+_REFRESH_KEY = REFRESH_SECRET_KEY.encode("utf-8")
+_ALGORITHMS = [ALGORITHM]
+
 # CORRECTED: Access token expires in 30 minutes (not 30 days!)
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 # Refresh token expires in 7 days
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+REFRESH_TOKEN_EXPIRE_SECONDS = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
+# Validated access token cache: repeated requests with the same token skip
+# signature verification until the entry expires (never past the token's exp)
+TOKEN_CACHE_MAX_SIZE = 10_000
+TOKEN_CACHE_TTL_SECONDS = 60
+_token_cache: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+
+class _JtiPool:
+    """
+    Refresh token identifiers drawn from a pooled CSPRNG buffer.
+    
+    Reads JTI_POOL_SIZE bytes from os.urandom at a time and slices them
+    into JTI_BYTES chunks, so a burst of logins makes one getrandom call
+    per pool rather than one per token.
+    """
+    
+    JTI_BYTES = 32
+    JTI_POOL_SIZE = 4096
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool = b""
+        self._offset = 0
+    
+    def refill(self):
+        self._pool = os.urandom(self.JTI_POOL_SIZE)
+        self._offset = 0
+    
+    def next(self) -> str:
+        with self._lock:
+            if self._offset + self.JTI_BYTES > len(self._pool):
+                self.refill()
+            chunk = self._pool[self._offset:self._offset + self.JTI_BYTES]
+            self._offset += self.JTI_BYTES
+        return base64.urlsafe_b64encode(chunk).rstrip(b"=").decode("ascii")
+
+_jti_pool = _JtiPool()
+
+# Token version revocation: access tokens carry the user's sso_jwt_version
+# as "ver"; bumping the stored version revokes every token issued before it.
+# Versions are cached per user so the check normally costs no DB round-trip.
+TOKEN_VERSION_CACHE_TTL_SECONDS = 30
+_token_version_cache: Dict[str, Tuple[int, float]] = {}
+_token_version_loader: Optional[Callable[[str], Awaitable[Optional[int]]]] = None
+
+# Password hashing (rounds kept explicit so cost can be tuned per deployment)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt only uses the first 72 bytes of input; truncate explicitly so
+# behaviour does not depend on the installed bcrypt version
+BCRYPT_MAX_PASSWORD_BYTES = 72
 
 # HTTP Bearer for token extraction
 security = HTTPBearer()
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    return pwd_context.hash(password)
+def _bcrypt_hash(password: str) -> str:
+    password_bytes = password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+    return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("ascii")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+def _bcrypt_verify(plain_password: str, hashed_password: str) -> bool:
+    password_bytes = plain_password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+    try:
+        return bcrypt.checkpw(password_bytes, hashed_password.encode("ascii"))
+    except ValueError:
+        # Malformed or non-bcrypt hash
+        return False
+
+async def hash_password(password: str) -> str:
+    """Hash a password using bcrypt (runs in a worker thread to keep the event loop free)"""
+    return await asyncio.to_thread(_bcrypt_hash, password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash (runs in a worker thread to keep the event loop free)"""
+    return await asyncio.to_thread(_bcrypt_verify, plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -37,13 +111,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     CORRECTED: Expires in 30 minutes (not 30 days).
     """
     to_encode = data.copy()
+    # exp is a Unix epoch int, which is what the JWT claim holds anyway
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = int(time.time() + expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = int(time.time()) + ACCESS_TOKEN_EXPIRE_SECONDS
     
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = _jwt_codec.encode(to_encode, _ACCESS_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def create_refresh_token(user_id: str) -> str:
@@ -51,10 +126,10 @@ def create_refresh_token(user_id: str) -> str:
     Create JWT refresh token.
     Expires in 7 days.
     """
-    expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = int(time.time()) + REFRESH_TOKEN_EXPIRE_SECONDS
     
     # Generate unique token identifier
-    jti = secrets.token_urlsafe(32)
+    jti = _jti_pool.next()
     
     to_encode = {
         "user_id": user_id,
@@ -63,13 +138,13 @@ def create_refresh_token(user_id: str) -> str:
         "jti": jti
     }
     
-    encoded_jwt = jwt.encode(to_encode, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = _jwt_codec.encode(to_encode, _REFRESH_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def decode_access_token(token: str) -> dict:
     """Decode and validate JWT access token"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _jwt_codec.decode(token, _ACCESS_KEY, algorithms=_ALGORITHMS)
         
         # Verify token type
         if payload.get("type") != "access":
@@ -84,7 +159,7 @@ def decode_access_token(token: str) -> dict:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Access token has expired. Please refresh."
         )
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
@@ -93,7 +168,7 @@ def decode_access_token(token: str) -> dict:
 def decode_refresh_token(token: str) -> dict:
     """Decode and validate JWT refresh token"""
     try:
-        payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _jwt_codec.decode(token, _REFRESH_KEY, algorithms=_ALGORITHMS)
         
         # Verify token type
         if payload.get("type") != "refresh":
@@ -108,16 +183,65 @@ def decode_refresh_token(token: str) -> dict:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Refresh token has expired. Please login again."
         )
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate refresh token"
         )
 
+def _token_cache_key(token: str) -> bytes:
+    """Digest the token so raw bearer tokens are not kept in memory"""
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+
+def decode_access_token_cached(token: str) -> dict:
+    """Decode an access token, reusing the result of a recent validation"""
+    key = _token_cache_key(token)
+    now = time.time()
+    
+    cached = _token_cache.get(key)
+    if cached is not None:
+        payload, expires_at = cached
+        if now < expires_at:
+            _token_cache.move_to_end(key)
+            return dict(payload)
+        del _token_cache[key]
+    
+    payload = decode_access_token(token)
+    
+    expires_at = min(payload.get("exp", now), now + TOKEN_CACHE_TTL_SECONDS)
+    _token_cache[key] = (payload, expires_at)
+    if len(_token_cache) > TOKEN_CACHE_MAX_SIZE:
+        _token_cache.popitem(last=False)
+    
+    return dict(payload)
+
+def set_token_version_loader(loader: Callable[[str], Awaitable[Optional[int]]]):
+    """Register the coroutine that reads a user's current sso_jwt_version"""
+    global _token_version_loader
+    _token_version_loader = loader
+
+def set_cached_token_version(user_id: str, version: int):
+    """Record a user's new token version (e.g. right after a logout-all)"""
+    _token_version_cache[user_id] = (version, time.time() + TOKEN_VERSION_CACHE_TTL_SECONDS)
+
+async def get_token_version(user_id: str) -> Optional[int]:
+    """Get a user's current token version, refreshing the cache lazily"""
+    cached = _token_version_cache.get(user_id)
+    if cached is not None and time.time() < cached[1]:
+        return cached[0]
+    
+    if _token_version_loader is None:
+        return None
+    
+    version = await _token_version_loader(user_id)
+    if version is not None:
+        set_cached_token_version(user_id, version)
+    return version
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Extract and validate current user from JWT token"""
     token = credentials.credentials
-    payload = decode_access_token(token)
+    payload = decode_access_token_cached(token)
     
     user_id = payload.get("user_id")
     if user_id is None:
@@ -126,4 +250,12 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Invalid authentication credentials"
         )
     
+    # Reject tokens issued before the user's last logout-all
+    current_version = await get_token_version(user_id)
+    if current_version is not None and payload.get("ver", 0) != current_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked. Please login again."
+        )
+    
     return payload
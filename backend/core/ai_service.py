@@ -15,21 +15,279 @@ RULES:
 
 from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorClient
 from datetime import datetime
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Union, BinaryIO
 from bson import ObjectId
+from pymongo import ReturnDocument, WriteConcern
+from pymongo.errors import BulkWriteError
 from abc import ABC, abstractmethod
+from types import MappingProxyType
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError, field_validator
+import asyncio
+import binascii
+import hashlib
+import io
 import logging
 import re
-import json
 
 logger = logging.getLogger(__name__)
 
+try:
+    import ahocorasick
+except ImportError:  # optional: keyword detection falls back to substring scans
+    ahocorasick = None
+
 
 class AIServiceError(Exception):
     """Raised when AI service fails"""
     pass
 
 
+# Upload extension -> Whisper file extension (keys are lowercase)
+_AUDIO_EXTENSIONS = MappingProxyType({
+    'webm': 'webm',
+    'mp3': 'mp3',
+    'mp4': 'mp4',
+    'm4a': 'm4a',
+    'wav': 'wav',
+    'mpeg': 'mpeg',
+    'mpga': 'mpga',
+    'ogg': 'ogg',
+})
+
+# Upload extension -> image MIME subtype for OCR data URLs (keys are lowercase)
+_IMAGE_SUBTYPES = MappingProxyType({
+    'jpg': 'jpeg',
+    'jpeg': 'jpeg',
+    'png': 'png',
+    'gif': 'gif',
+    'webp': 'webp',
+})
+
+# Chunk size for base64 encoding; a multiple of 3 so chunks encode without padding
+_B64_CHUNK_BYTES = 3 * 256 * 1024
+
+
+def _image_data_url(content: bytes, image_type: str) -> str:
+    """
+    Build a base64 image data URL.
+    
+    Encodes in chunks straight into a buffer sized for the final URL, so
+    there is no full-size intermediate base64 copy before the single decode.
+    """
+    prefix = f"data:image/{image_type};base64,".encode("ascii")
+    buf = bytearray(len(prefix) + 4 * ((len(content) + 2) // 3))
+    buf[:len(prefix)] = prefix
+    
+    view = memoryview(content)
+    pos = len(prefix)
+    for start in range(0, len(content), _B64_CHUNK_BYTES):
+        encoded = binascii.b2a_base64(view[start:start + _B64_CHUNK_BYTES], newline=False)
+        buf[pos:pos + len(encoded)] = encoded
+        pos += len(encoded)
+    
+    return buf.decode("ascii")
+
+
+# Payloads above this size are encoded/parsed in a worker thread so the
+# event loop keeps serving other requests meanwhile
+_OFFLOAD_THRESHOLD_BYTES = 256 * 1024
+
+
+async def _offload_if_large(size: int, fn, *args):
+    """Run a CPU-bound call in a worker thread when its input is large"""
+    if size > _OFFLOAD_THRESHOLD_BYTES:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+def _sha256_hex(content: bytes) -> str:
+    """Content hash used to recognise re-uploaded files"""
+    return hashlib.sha256(content).hexdigest()
+
+
+# Audio may arrive as bytes or as a seekable binary file (e.g. the spooled
+# upload), which the STT provider streams without reading it into memory
+AudioPayload = Union[bytes, BinaryIO]
+
+
+def _payload_size(content: AudioPayload) -> int:
+    """Size in bytes of an in-memory or seekable file payload"""
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return len(content)
+    position = content.tell()
+    size = content.seek(0, io.SEEK_END)
+    content.seek(position)
+    return size - position
+
+
+# =============================================================================
+# BATCHED WRITES
+# =============================================================================
+
+class _BatchedInserter:
+    """
+    Coalesces inserts into one collection into insert_many calls.
+    
+    A background task takes the first queued document, then keeps draining
+    until max_batch documents are collected or max_delay seconds pass, and
+    writes the batch with a single unordered insert_many. The task starts on
+    first use so it binds to the running event loop.
+    
+    put() is fire-and-forget; submit() waits for the batch containing the
+    document and returns its inserted _id.
+    """
+    
+    def __init__(self, collection, max_batch: int, max_delay: float):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def _ensure_started(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+    
+    def put(self, doc: Dict[str, Any]):
+        """Queue a document for insertion without waiting for the write"""
+        self._ensure_started()
+        self._queue.put_nowait((doc, None))
+    
+    async def submit(self, doc: Dict[str, Any]) -> ObjectId:
+        """Queue a document and wait until its batch is written"""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((doc, future))
+        return await future
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+    
+    async def _write(self, batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]]):
+        docs = [doc for doc, _ in batch]
+        failed: Dict[int, Exception] = {}
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # Unordered: everything except the reported documents was written
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = AIServiceError(error.get("errmsg", "insert failed"))
+            logger.error("[AI] Batched insert into %s: %s of %s failed", self.collection.name, len(failed), len(docs))
+        except Exception as e:
+            failed = {index: e for index in range(len(docs))}
+            logger.error("[AI] Batched insert into %s failed: %s", self.collection.name, e)
+        
+        for index, (doc, future) in enumerate(batch):
+            if future is None or future.done():
+                continue
+            if index in failed:
+                future.set_exception(failed[index])
+            else:
+                future.set_result(doc["_id"])
+    
+    async def flush(self):
+        """Wait until every queued document has been written"""
+        if self._queue is not None:
+            await self._queue.join()
+    
+    async def close(self):
+        """Flush queued documents and stop the background task"""
+        if self._task is None:
+            return
+        await self.flush()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
+
+
+# =============================================================================
+# AI RESPONSE SCHEMAS
+# =============================================================================
+
+# Everything but digits, sign and decimal point in an extracted amount
+_AMOUNT_NOISE_RE = re.compile(r"[^0-9.\-]")
+
+
+class OCRExtraction(BaseModel):
+    """Fields the OCR prompt asks the model to return"""
+    # Models often return invoice numbers as bare numbers
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+    
+    vendor_name: Optional[str] = None
+    invoice_number: Optional[str] = None
+    invoice_date: Optional[str] = None
+    amount: Optional[float] = None
+    raw_text: str = ""
+    
+    @field_validator("amount", mode="before")
+    @classmethod
+    def strip_amount_formatting(cls, value):
+        """Accept amounts like "$1,234.50" by dropping separators and currency symbols"""
+        if isinstance(value, str):
+            value = _AMOUNT_NOISE_RE.sub("", value)
+            return value or None
+        return value
+
+
+class VisionTag(BaseModel):
+    label: str
+    confidence: float = 0.0
+
+
+class VisionTagExtraction(BaseModel):
+    """Fields the vision tagging prompt asks the model to return"""
+    tags: List[VisionTag] = []
+    suggested_code: Optional[str] = None
+    description: Optional[str] = None
+
+
+_OCR_ADAPTER = TypeAdapter(OCRExtraction)
+_VISION_TAG_ADAPTER = TypeAdapter(VisionTagExtraction)
+
+
+def _parse_ai_json(adapter: TypeAdapter, content: str):
+    """
+    Validate a model response against its schema.
+    
+    Falls back to the outermost {...} span when the model wraps the JSON
+    in prose or code fences.
+    """
+    try:
+        return adapter.validate_json(content)
+    except ValidationError:
+        start = content.find("{")
+        end = content.rfind("}")
+        if start == -1 or end <= start:
+            raise
+        return adapter.validate_json(content[start:end + 1])
+
+
 # =============================================================================
 # PROVIDER ABSTRACTION
 # =============================================================================
@@ -43,7 +301,7 @@ class AIProvider(ABC):
         pass
     
     @abstractmethod
-    async def run_stt(self, audio_content: bytes, audio_format: str) -> Dict:
+    async def run_stt(self, audio_content: AudioPayload, audio_format: str) -> Dict:
         """Convert speech to text"""
         pass
     
@@ -51,6 +309,10 @@ class AIProvider(ABC):
     async def run_vision_tag(self, image_content: bytes) -> Dict:
         """Tag image with relevant labels"""
         pass
+    
+    async def aclose(self):
+        """Release any network resources held by the provider"""
+        pass
 
 
 class MockAIProvider(AIProvider):
@@ -72,7 +334,7 @@ class MockAIProvider(AIProvider):
             "provider": "MOCK"
         }
     
-    async def run_stt(self, audio_content: bytes, audio_format: str) -> Dict:
+    async def run_stt(self, audio_content: AudioPayload, audio_format: str) -> Dict:
         """Mock STT"""
         logger.info("[AI:MOCK] Running mock STT")
         return {
@@ -104,18 +366,39 @@ class EmergentAIProvider(AIProvider):
     Uses Emergent Universal Key.
     """
     
+    STT_TIMEOUT_SECONDS = 60.0
+    STT_MAX_KEEPALIVE_CONNECTIONS = 20
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
+        self._http_client = None
+    
+    def _get_http_client(self):
+        """Shared HTTP client so Whisper calls reuse pooled keep-alive connections"""
+        if self._http_client is None:
+            import httpx
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.STT_TIMEOUT_SECONDS),
+                limits=httpx.Limits(max_keepalive_connections=self.STT_MAX_KEEPALIVE_CONNECTIONS)
+            )
+        return self._http_client
+    
+    async def aclose(self):
+        """Close the shared HTTP client"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
     
     async def run_ocr(self, file_content: bytes, file_type: str) -> Dict:
         """OCR using Emergent/OpenAI vision"""
         try:
             # Use OpenAI GPT-4 vision for OCR
-            import base64
             from emergentintegrations.llm.openai import chat_completion, Message
             
-            # Convert to base64
-            b64_content = base64.b64encode(file_content).decode('utf-8')
+            # Convert to base64 data URL
+            image_type = file_type.lower()
+            image_type = _IMAGE_SUBTYPES.get(image_type, image_type)
+            data_url = await _offload_if_large(len(file_content), _image_data_url, file_content, image_type)
             
             prompt = """Analyze this invoice/document image and extract:
 1. Vendor Name
@@ -135,7 +418,7 @@ Return JSON format:
             messages = [
                 Message(role="user", content=[
                     {"type": "text", "text": prompt},
-                    {"type": "image_url", "image_url": {"url": f"data:image/{file_type};base64,{b64_content}"}}
+                    {"type": "image_url", "image_url": {"url": data_url}}
                 ])
             ]
             
@@ -145,78 +428,75 @@ Return JSON format:
                 model="gpt-4o"
             )
             
-            # Parse response
-            result = json.loads(response.content)
-            result["confidence"] = 0.90
-            result["provider"] = "EMERGENT_OPENAI"
-            return result
+            # Parse response; a response that still doesn't fit the schema
+            # keeps its text rather than failing the request
+            try:
+                extraction = _parse_ai_json(_OCR_ADAPTER, response.content)
+            except ValidationError as e:
+                logger.warning("[AI] OCR response did not match schema, storing raw text: %s", e)
+                extraction = OCRExtraction(raw_text=response.content)
+            return {
+                "raw_text": extraction.raw_text,
+                "structured": extraction.model_dump(exclude={"raw_text"}),
+                "confidence": 0.90,
+                "provider": "EMERGENT_OPENAI"
+            }
             
         except ImportError:
             logger.warning("[AI] emergentintegrations not available, falling back to mock")
             return await MockAIProvider().run_ocr(file_content, file_type)
         except Exception as e:
-            logger.error(f"[AI] OCR failed: {e}")
+            logger.error("[AI] OCR failed: %s", e)
             raise AIServiceError(f"OCR failed: {e}")
     
-    async def run_stt(self, audio_content: bytes, audio_format: str) -> Dict:
+    async def run_stt(self, audio_content: AudioPayload, audio_format: str) -> Dict:
         """STT using OpenAI Whisper API with translation to English"""
         try:
             import httpx
-            import io
             
             # Determine file extension
-            ext_map = {
-                'webm': 'webm',
-                'mp3': 'mp3',
-                'mp4': 'mp4',
-                'm4a': 'm4a',
-                'wav': 'wav',
-                'mpeg': 'mpeg',
-                'mpga': 'mpga',
-                'ogg': 'ogg',
-            }
-            file_ext = ext_map.get(audio_format.lower(), 'mp3')
+            file_ext = _AUDIO_EXTENSIONS.get(audio_format.lower(), 'mp3')
             
             # Use OpenAI Whisper API for transcription + translation
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                # First, try translation endpoint (auto-detects language and translates to English)
-                files = {
-                    'file': (f'audio.{file_ext}', audio_content, f'audio/{file_ext}'),
-                    'model': (None, 'whisper-1'),
+            client = self._get_http_client()
+            
+            # First, try translation endpoint (auto-detects language and translates to English)
+            files = {
+                'file': (f'audio.{file_ext}', audio_content, f'audio/{file_ext}'),
+                'model': (None, 'whisper-1'),
+            }
+            
+            response = await client.post(
+                'https://api.openai.com/v1/audio/translations',
+                headers={'Authorization': f'Bearer {self.api_key}'},
+                files=files,
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    "transcript": result.get('text', ''),
+                    "language": "en",  # Translation always outputs English
+                    "confidence": 0.95,
+                    "provider": "OPENAI_WHISPER"
                 }
+            else:
+                logger.error("[AI] Whisper API error: %s - %s", response.status_code, response.text)
+                raise AIServiceError(f"Whisper API failed: {response.text}")
                 
-                response = await client.post(
-                    'https://api.openai.com/v1/audio/translations',
-                    headers={'Authorization': f'Bearer {self.api_key}'},
-                    files=files,
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "transcript": result.get('text', ''),
-                        "language": "en",  # Translation always outputs English
-                        "confidence": 0.95,
-                        "provider": "OPENAI_WHISPER"
-                    }
-                else:
-                    logger.error(f"[AI] Whisper API error: {response.status_code} - {response.text}")
-                    raise AIServiceError(f"Whisper API failed: {response.text}")
-                    
         except httpx.TimeoutException:
             logger.error("[AI] Whisper API timeout")
             raise AIServiceError("Speech transcription timed out")
         except Exception as e:
-            logger.error(f"[AI] STT failed: {e}")
+            logger.error("[AI] STT failed: %s", e)
             raise AIServiceError(f"STT failed: {e}")
     
     async def run_vision_tag(self, image_content: bytes) -> Dict:
         """Vision tagging using Emergent/OpenAI"""
         try:
-            import base64
             from emergentintegrations.llm.openai import chat_completion, Message
             
-            b64_content = base64.b64encode(image_content).decode('utf-8')
+            data_url = await _offload_if_large(len(image_content), _image_data_url, image_content, "jpeg")
             
             prompt = """Analyze this construction site image and:
 1. List relevant tags (construction activities visible)
@@ -232,7 +512,7 @@ Return JSON:
             messages = [
                 Message(role="user", content=[
                     {"type": "text", "text": prompt},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64_content}"}}
+                    {"type": "image_url", "image_url": {"url": data_url}}
                 ])
             ]
             
@@ -242,7 +522,7 @@ Return JSON:
                 model="gpt-4o"
             )
             
-            result = json.loads(response.content)
+            result = _parse_ai_json(_VISION_TAG_ADAPTER, response.content).model_dump()
             result["confidence"] = 0.85
             result["provider"] = "EMERGENT_OPENAI"
             return result
@@ -251,7 +531,7 @@ Return JSON:
             logger.warning("[AI] emergentintegrations not available, falling back to mock")
             return await MockAIProvider().run_vision_tag(image_content)
         except Exception as e:
-            logger.error(f"[AI] Vision tagging failed: {e}")
+            logger.error("[AI] Vision tagging failed: %s", e)
             raise AIServiceError(f"Vision tagging failed: {e}")
 
 
@@ -271,6 +551,20 @@ class AIService:
     """
     
     ISSUE_KEYWORDS = ["problem", "issue", "damage", "delay", "accident", "safety", "urgent"]
+    _URGENT_BIT = 1 << ISSUE_KEYWORDS.index("urgent")
+    _issue_automaton = None
+    # Fallback when pyahocorasick is missing: one alternation scan instead
+    # of a substring probe per keyword
+    _ISSUE_KEYWORD_RE = re.compile("|".join(map(re.escape, ISSUE_KEYWORDS)))
+    _ISSUE_KEYWORD_BITS = MappingProxyType(
+        {keyword: 1 << index for index, keyword in enumerate(ISSUE_KEYWORDS)}
+    )
+    
+    AUDIT_BATCH_SIZE = 200
+    AUDIT_BATCH_DELAY_SECONDS = 0.05
+    RESULT_BATCH_SIZE = 100
+    RESULT_BATCH_DELAY_SECONDS = 0.01
+    TELEMETRY_WRITE_CONCERN = WriteConcern(w=1, j=False)
     
     def __init__(self, client: AsyncIOMotorClient, db: AsyncIOMotorDatabase, api_key: Optional[str] = None):
         self.client = client
@@ -283,6 +577,38 @@ class AIService:
         else:
             self.provider = MockAIProvider()
             logger.info("[AI] Using Mock AI provider (no API key)")
+        
+        # Audit entries are written in batches off the request path
+        self._audit_writer = _BatchedInserter(
+            db.audit_logs,
+            max_batch=self.AUDIT_BATCH_SIZE,
+            max_delay=self.AUDIT_BATCH_DELAY_SECONDS
+        )
+        
+        # Result documents from concurrent requests share insert_many calls.
+        # Raw AI output can be regenerated from the upload, so those inserts
+        # are acknowledged by the primary without waiting for the journal.
+        # Issues and audit entries keep the default write concern.
+        self._ocr_writer = self._result_writer(self._telemetry_collection("ocr_results"))
+        self._stt_writer = self._result_writer(self._telemetry_collection("stt_results"))
+        self._vision_writer = self._result_writer(self._telemetry_collection("vision_tags"))
+        self._issue_writer = self._result_writer(db.issues)
+    
+    def _telemetry_collection(self, name: str):
+        return self.db.get_collection(name, write_concern=self.TELEMETRY_WRITE_CONCERN)
+    
+    def _result_writer(self, collection) -> _BatchedInserter:
+        return _BatchedInserter(
+            collection,
+            max_batch=self.RESULT_BATCH_SIZE,
+            max_delay=self.RESULT_BATCH_DELAY_SECONDS
+        )
+    
+    async def close(self):
+        """Persist queued writes and release provider resources (call on application shutdown)"""
+        for writer in (self._ocr_writer, self._stt_writer, self._vision_writer, self._issue_writer, self._audit_writer):
+            await writer.close()
+        await self.provider.aclose()
     
     # =========================================================================
     # OCR SERVICE
@@ -305,6 +631,26 @@ class AIService:
         - Do NOT auto-create PC
         - Store raw text + structured result
         """
+        # A re-upload of the same file reuses the stored extraction
+        content_sha256 = await _offload_if_large(len(file_content), _sha256_hex, file_content)
+        existing = await self.db.ocr_results.find_one(
+            {
+                "organisation_id": organisation_id,
+                "content_sha256": content_sha256,
+                "project_id": project_id
+            },
+            projection={"raw_text": 1, "structured_data": 1, "confidence": 1, "provider": 1}
+        )
+        if existing:
+            logger.info("[AI:OCR] Reused result for re-upload: %s", existing["_id"])
+            return {
+                "ocr_id": str(existing["_id"]),
+                "raw_text": existing.get("raw_text", ""),
+                "structured": existing.get("structured_data", {}),
+                "confidence": existing.get("confidence", 0),
+                "provider": existing.get("provider", "UNKNOWN")
+            }
+        
         # Run OCR
         result = await self.provider.run_ocr(file_content, file_type)
         
@@ -323,11 +669,13 @@ class AIService:
             "manually_verified": False,
             "verified_data": None
         }
+        # Mock fallbacks stand in for a failed provider; never reuse them
+        if ocr_doc["provider"] != "MOCK":
+            ocr_doc["content_sha256"] = content_sha256
         
-        db_result = await self.db.ocr_results.insert_one(ocr_doc)
-        ocr_id = str(db_result.inserted_id)
+        ocr_id = str(await self._ocr_writer.submit(ocr_doc))
         
-        logger.info(f"[AI:OCR] Completed: {ocr_id} confidence={result.get('confidence')}")
+        logger.info("[AI:OCR] Completed: %s confidence=%s", ocr_id, result.get('confidence'))
         
         return {
             "ocr_id": ocr_id,
@@ -345,14 +693,8 @@ class AIService:
         Manually verify/correct OCR result.
         Logs override event.
         """
-        ocr_doc = await self.db.ocr_results.find_one({"_id": ObjectId(ocr_id)})
-        
-        if not ocr_doc:
-            raise ValueError(f"OCR result {ocr_id} not found")
-        
-        old_data = ocr_doc.get("structured_data", {})
-        
-        await self.db.ocr_results.update_one(
+        # Update and read the previous values in one round trip
+        ocr_doc = await self.db.ocr_results.find_one_and_update(
             {"_id": ObjectId(ocr_id)},
             {
                 "$set": {
@@ -361,21 +703,32 @@ class AIService:
                     "verified_by": user_id,
                     "verified_at": datetime.utcnow()
                 }
-            }
+            },
+            # _id stays in the projection so a found document is never empty
+            projection={"structured_data": 1},
+            return_document=ReturnDocument.BEFORE
         )
         
-        # Audit log override
-        await self._log_audit(
-            organisation_id=organisation_id,
-            entity_type="OCR_RESULT",
-            entity_id=ocr_id,
-            action="MANUAL_OVERRIDE",
-            user_id=user_id,
-            old_value={"structured_data": old_data},
-            new_value={"verified_data": verified_data}
-        )
+        if not ocr_doc:
+            raise ValueError(f"OCR result {ocr_id} not found")
+        
+        old_data = ocr_doc.get("structured_data", {})
+        
+        if old_data == verified_data:
+            # Nothing was overridden (e.g. a retried submit); skip the audit write
+            logger.debug("[AI:OCR] Verified unchanged, audit skipped: %s", ocr_id)
+        else:
+            await self._log_audit(
+                organisation_id=organisation_id,
+                entity_type="OCR_RESULT",
+                entity_id=ocr_id,
+                action="MANUAL_OVERRIDE",
+                user_id=user_id,
+                old_value={"structured_data": old_data},
+                new_value={"verified_data": verified_data}
+            )
         
-        logger.info(f"[AI:OCR] Verified: {ocr_id} by {user_id}")
+        logger.info("[AI:OCR] Verified: %s by %s", ocr_id, user_id)
     
     # =========================================================================
     # STT SERVICE
@@ -383,7 +736,7 @@ class AIService:
     
     async def run_stt(
         self,
-        audio_content: bytes,
+        audio_content: AudioPayload,
         audio_format: str,
         organisation_id: str,
         user_id: str,
@@ -398,16 +751,17 @@ class AIService:
         - Bind to selected CODE
         - If keyword detected -> create Issue
         """
+        # Measure before the provider consumes a streamed payload
+        audio_size = _payload_size(audio_content)
+        
         # Run STT
         result = await self.provider.run_stt(audio_content, audio_format)
         
         transcript = result.get("transcript", "")
         
         # Check for issue keywords
-        detected_keywords = []
-        for keyword in self.ISSUE_KEYWORDS:
-            if keyword.lower() in transcript.lower():
-                detected_keywords.append(keyword)
+        keyword_mask = self._scan_issue_keywords(transcript)
+        detected_keywords = self._keywords_from_mask(keyword_mask)
         
         # Store result
         stt_doc = {
@@ -415,7 +769,7 @@ class AIService:
             "project_id": project_id,
             "code_id": code_id,
             "audio_format": audio_format,
-            "audio_size": len(audio_content),
+            "audio_size": audio_size,
             "transcript": transcript,
             "confidence": result.get("confidence", 0),
             "duration_seconds": result.get("duration_seconds", 0),
@@ -427,28 +781,48 @@ class AIService:
             "issue_id": None
         }
         
-        db_result = await self.db.stt_results.insert_one(stt_doc)
-        stt_id = str(db_result.inserted_id)
-        
-        # Auto-create issue if keywords detected
-        issue_id = None
-        if detected_keywords:
-            issue_id = await self._create_issue_from_stt(
-                organisation_id=organisation_id,
-                project_id=project_id,
-                code_id=code_id,
-                transcript=transcript,
-                keywords=detected_keywords,
-                user_id=user_id,
-                stt_id=stt_id
-            )
+        if not detected_keywords:
+            stt_id = str(await self._stt_writer.submit(stt_doc))
+            issue_id = None
+        else:
+            # Ids are assigned here so both documents reference each other on
+            # insert; the STT row is only updated again if the issue fails
+            stt_oid = ObjectId()
+            issue_oid = ObjectId()
+            stt_id = str(stt_oid)
+            issue_id = str(issue_oid)
+            stt_doc["_id"] = stt_oid
+            stt_doc["issue_created"] = True
+            stt_doc["issue_id"] = issue_id
             
-            await self.db.stt_results.update_one(
-                {"_id": ObjectId(stt_id)},
-                {"$set": {"issue_created": True, "issue_id": issue_id}}
+            # Auto-create issue alongside the STT row
+            stt_result, issue_result = await asyncio.gather(
+                self._stt_writer.submit(stt_doc),
+                self._create_issue_from_stt(
+                    organisation_id=organisation_id,
+                    project_id=project_id,
+                    code_id=code_id,
+                    transcript=transcript,
+                    keywords=detected_keywords,
+                    priority="HIGH" if keyword_mask & self._URGENT_BIT else "MEDIUM",
+                    user_id=user_id,
+                    stt_id=stt_id,
+                    issue_oid=issue_oid
+                ),
+                return_exceptions=True
             )
+            if isinstance(stt_result, BaseException):
+                raise stt_result
+            if isinstance(issue_result, BaseException):
+                # Keep the transcript but drop its claim on the missing issue
+                logger.error("[AI:STT] Issue creation failed for %s: %s", stt_id, issue_result)
+                await self.db.stt_results.update_one(
+                    {"_id": stt_oid},
+                    {"$set": {"issue_created": False, "issue_id": None}}
+                )
+                raise issue_result
         
-        logger.info(f"[AI:STT] Completed: {stt_id} keywords={detected_keywords}")
+        logger.info("[AI:STT] Completed: %s keywords=%s", stt_id, detected_keywords)
         
         return {
             "stt_id": stt_id,
@@ -459,6 +833,43 @@ class AIService:
             "issue_id": issue_id
         }
     
+    @classmethod
+    def _get_issue_automaton(cls):
+        """Aho-Corasick automaton over ISSUE_KEYWORDS, built once per class"""
+        if cls._issue_automaton is None and ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for index, keyword in enumerate(cls.ISSUE_KEYWORDS):
+                automaton.add_word(keyword.lower(), index)
+            automaton.make_automaton()
+            cls._issue_automaton = automaton
+        return cls._issue_automaton
+    
+    def _scan_issue_keywords(self, transcript: str) -> int:
+        """
+        Find ISSUE_KEYWORDS in a transcript (case-insensitive substring match).
+        
+        Returns a bitmask with bit i set when ISSUE_KEYWORDS[i] occurs. Scans
+        the transcript once for all keywords, with Aho-Corasick when
+        pyahocorasick is installed and a compiled alternation otherwise.
+        """
+        mask = 0
+        transcript_lower = transcript.lower()
+        automaton = self._get_issue_automaton()
+        if automaton is None:
+            # No keyword's suffix is another's prefix, so the non-overlapping
+            # matches of the alternation find every keyword that occurs
+            for match in self._ISSUE_KEYWORD_RE.finditer(transcript_lower):
+                mask |= self._ISSUE_KEYWORD_BITS[match.group()]
+            return mask
+        
+        for _, index in automaton.iter(transcript_lower):
+            mask |= 1 << index
+        return mask
+    
+    def _keywords_from_mask(self, mask: int) -> List[str]:
+        """Keywords for the set bits of a scan mask, in ISSUE_KEYWORDS order"""
+        return [keyword for index, keyword in enumerate(self.ISSUE_KEYWORDS) if mask >> index & 1]
+    
     async def _create_issue_from_stt(
         self,
         organisation_id: str,
@@ -466,11 +877,14 @@ class AIService:
         code_id: Optional[str],
         transcript: str,
         keywords: List[str],
+        priority: str,
         user_id: str,
-        stt_id: str
+        stt_id: str,
+        issue_oid: Optional[ObjectId] = None
     ) -> str:
         """Create issue from STT keyword detection"""
         issue_doc = {
+            "_id": issue_oid or ObjectId(),
             "organisation_id": organisation_id,
             "project_id": project_id,
             "code_id": code_id,
@@ -479,13 +893,12 @@ class AIService:
             "source": "STT_AUTO",
             "stt_id": stt_id,
             "status": "OPEN",
-            "priority": "MEDIUM" if "urgent" not in keywords else "HIGH",
+            "priority": priority,
             "created_by": user_id,
             "created_at": datetime.utcnow()
         }
         
-        result = await self.db.issues.insert_one(issue_doc)
-        issue_id = str(result.inserted_id)
+        issue_id = str(await self._issue_writer.submit(issue_doc))
         
         # Audit log
         await self._log_audit(
@@ -497,7 +910,7 @@ class AIService:
             new_value={"keywords": keywords, "stt_id": stt_id}
         )
         
-        logger.info(f"[AI:STT] Issue auto-created: {issue_id}")
+        logger.info("[AI:STT] Issue auto-created: %s", issue_id)
         
         return issue_id
     
@@ -520,6 +933,34 @@ class AIService:
         - Store confidence
         - Allow manual override
         """
+        # A re-upload of the same image reuses the stored tagging
+        content_sha256 = await _offload_if_large(len(image_content), _sha256_hex, image_content)
+        existing = await self.db.vision_tags.find_one(
+            {
+                "organisation_id": organisation_id,
+                "content_sha256": content_sha256,
+                "project_id": project_id
+            },
+            projection={
+                "tags": 1, "suggested_code": 1, "description": 1, "confidence": 1,
+                "provider": 1, "manually_overridden": 1, "override_code": 1
+            }
+        )
+        if existing:
+            logger.info("[AI:VISION] Reused result for re-upload: %s", existing["_id"])
+            # Same shape as a fresh tagging; a manual override replaces the suggestion
+            suggested_code = existing.get("suggested_code")
+            if existing.get("manually_overridden"):
+                suggested_code = existing.get("override_code")
+            return {
+                "tag_id": str(existing["_id"]),
+                "tags": existing.get("tags", []),
+                "suggested_code": suggested_code,
+                "description": existing.get("description"),
+                "confidence": existing.get("confidence", 0),
+                "provider": existing.get("provider", "UNKNOWN")
+            }
+        
         # Run vision tagging
         result = await self.provider.run_vision_tag(image_content)
         
@@ -530,6 +971,7 @@ class AIService:
             "image_size": len(image_content),
             "tags": result.get("tags", []),
             "suggested_code": result.get("suggested_code"),
+            "description": result.get("description"),
             "confidence": result.get("confidence", 0),
             "provider": result.get("provider", "UNKNOWN"),
             "tagged_by": user_id,
@@ -537,11 +979,12 @@ class AIService:
             "manually_overridden": False,
             "override_code": None
         }
+        if tag_doc["provider"] != "MOCK":
+            tag_doc["content_sha256"] = content_sha256
         
-        db_result = await self.db.vision_tags.insert_one(tag_doc)
-        tag_id = str(db_result.inserted_id)
+        tag_id = str(await self._vision_writer.submit(tag_doc))
         
-        logger.info(f"[AI:VISION] Completed: {tag_id} suggested={result.get('suggested_code')}")
+        logger.info("[AI:VISION] Completed: %s suggested=%s", tag_id, result.get('suggested_code'))
         
         return {
             "tag_id": tag_id,
@@ -559,14 +1002,8 @@ class AIService:
         Manually override vision tag suggestion.
         Logs override event.
         """
-        tag_doc = await self.db.vision_tags.find_one({"_id": ObjectId(tag_id)})
-        
-        if not tag_doc:
-            raise ValueError(f"Vision tag {tag_id} not found")
-        
-        old_code = tag_doc.get("suggested_code")
-        
-        await self.db.vision_tags.update_one(
+        # Update and read the previous suggestion in one round trip
+        tag_doc = await self.db.vision_tags.find_one_and_update(
             {"_id": ObjectId(tag_id)},
             {
                 "$set": {
@@ -575,21 +1012,31 @@ class AIService:
                     "overridden_by": user_id,
                     "overridden_at": datetime.utcnow()
                 }
-            }
+            },
+            projection={"suggested_code": 1},
+            return_document=ReturnDocument.BEFORE
         )
         
-        # Audit log override
-        await self._log_audit(
-            organisation_id=organisation_id,
-            entity_type="VISION_TAG",
-            entity_id=tag_id,
-            action="MANUAL_OVERRIDE",
-            user_id=user_id,
-            old_value={"suggested_code": old_code},
-            new_value={"override_code": override_code}
-        )
+        if not tag_doc:
+            raise ValueError(f"Vision tag {tag_id} not found")
+        
+        old_code = tag_doc.get("suggested_code")
+        
+        if old_code == override_code:
+            # Override matches the suggestion; skip the no-op audit write
+            logger.debug("[AI:VISION] Override unchanged, audit skipped: %s", tag_id)
+        else:
+            await self._log_audit(
+                organisation_id=organisation_id,
+                entity_type="VISION_TAG",
+                entity_id=tag_id,
+                action="MANUAL_OVERRIDE",
+                user_id=user_id,
+                old_value={"suggested_code": old_code},
+                new_value={"override_code": override_code}
+            )
         
-        logger.info(f"[AI:VISION] Overridden: {tag_id} {old_code} -> {override_code}")
+        logger.info("[AI:VISION] Overridden: %s %s -> %s", tag_id, old_code, override_code)
     
     # =========================================================================
     # HELPER
@@ -605,7 +1052,7 @@ class AIService:
         old_value: Optional[Dict] = None,
         new_value: Optional[Dict] = None
     ):
-        """Log audit entry"""
+        """Log audit entry (queued for a batched insert)"""
         audit_doc = {
             "organisation_id": organisation_id,
             "module_name": "AI_SERVICE",
@@ -617,27 +1064,27 @@ class AIService:
             "user_id": user_id,
             "timestamp": datetime.utcnow()
         }
-        await self.db.audit_logs.insert_one(audit_doc)
+        self._audit_writer.put(audit_doc)
     
     async def create_indexes(self):
         """Create indexes for AI results"""
-        try:
-            await self.db.ocr_results.create_index(
-                [("organisation_id", 1), ("extracted_at", -1)],
-                name="ocr_lookup"
-            )
-            await self.db.stt_results.create_index(
-                [("organisation_id", 1), ("project_id", 1), ("transcribed_at", -1)],
-                name="stt_lookup"
-            )
-            await self.db.vision_tags.create_index(
-                [("organisation_id", 1), ("project_id", 1), ("tagged_at", -1)],
-                name="vision_tag_lookup"
-            )
-            await self.db.issues.create_index(
-                [("organisation_id", 1), ("project_id", 1), ("status", 1)],
-                name="issue_lookup"
-            )
+        # Index builds are independent, so issue the commands concurrently
+        specs = [
+            (self.db.ocr_results, [("organisation_id", 1), ("extracted_at", -1)], "ocr_lookup"),
+            (self.db.stt_results, [("organisation_id", 1), ("project_id", 1), ("transcribed_at", -1)], "stt_lookup"),
+            (self.db.vision_tags, [("organisation_id", 1), ("project_id", 1), ("tagged_at", -1)], "vision_tag_lookup"),
+            (self.db.ocr_results, [("organisation_id", 1), ("content_sha256", 1)], "ocr_content_dedupe"),
+            (self.db.vision_tags, [("organisation_id", 1), ("content_sha256", 1)], "vision_tag_content_dedupe"),
+            (self.db.issues, [("organisation_id", 1), ("project_id", 1), ("status", 1)], "issue_lookup"),
+        ]
+        results = await asyncio.gather(
+            *(collection.create_index(keys, name=name) for collection, keys, name in specs),
+            return_exceptions=True
+        )
+        failed = False
+        for (_, _, name), result in zip(specs, results):
+            if isinstance(result, Exception):
+                failed = True
+                logger.warning("AI index creation (%s): %s", name, result)
+        if not failed:
             logger.info("AI service indexes created")
-        except Exception as e:
-            logger.warning(f"AI index creation: {e}")
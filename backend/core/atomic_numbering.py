@@ -10,11 +10,19 @@ Provides:
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import datetime
+from collections import deque
+from typing import Optional, Dict, Tuple, Deque, Iterable, Set
 import logging
 import asyncio
+import os
+import random
+import socket
 
 logger = logging.getLogger(__name__)
 
+# Recorded on sequence documents so reserved blocks can be traced to a process
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}"
+
 
 class SequenceCollisionError(Exception):
     """Raised when sequence collision occurs after max retries"""
@@ -31,31 +39,55 @@ class AtomicDocumentNumbering:
     
     MAX_RETRIES = 5
     RETRY_DELAY_MS = 100  # Base delay in milliseconds
+    RETRY_MAX_DELAY_MS = 2000  # Backoff cap in milliseconds
+    
+    # Collections whose documents carry generated document numbers
+    NUMBERED_COLLECTIONS = ["work_orders", "payment_certificates"]
     
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(self, db: AsyncIOMotorDatabase, reservation_size: int = 1):
+        """
+        Args:
+            reservation_size: Sequence numbers reserved per database round trip
+                (HardenedFinancialEngine reads DOCUMENT_NUMBER_RESERVATION_SIZE).
+                1 (default) increments inside the caller's transaction and keeps
+                numbering gap-free. Larger values hand out numbers from an
+                in-process block; numbers left unused when the process stops
+                or a transaction aborts are skipped, so numbering can have gaps.
+        """
         self.db = db
+        self.reservation_size = reservation_size
+        self._reservations: Dict[Tuple[str, str], Deque[int]] = {}
+        self._reservation_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._pending_prewarms: Set[asyncio.Task] = set()
     
-    async def get_next_sequence(
+    def _retry_delay(self, attempt: int) -> float:
+        """
+        Capped exponential backoff with full jitter, in seconds.
+        
+        Randomising over the whole window keeps concurrent generators that
+        collided together from retrying in lockstep.
+        """
+        window_ms = min(self.RETRY_MAX_DELAY_MS, self.RETRY_DELAY_MS * (2 ** attempt))
+        return window_ms * random.random() / 1000
+    
+    async def _increment_sequence(
         self,
         organisation_id: str,
         prefix: str,
+        amount: int,
         session=None
     ) -> int:
-        """
-        Get next atomic sequence number.
-        
-        Uses findOneAndUpdate with $inc for thread-safe increment.
-        Returns the NEW sequence number after increment.
-        """
+        """Atomically advance the org+prefix sequence and return the new value"""
+        now = datetime.utcnow()
         result = await self.db.document_sequences.find_one_and_update(
             {
                 "organisation_id": organisation_id,
                 "prefix": prefix
             },
             {
-                "$inc": {"current_sequence": 1},
-                "$set": {"updated_at": datetime.utcnow()},
-                "$setOnInsert": {"created_at": datetime.utcnow()}
+                "$inc": {"current_sequence": amount},
+                "$set": {"updated_at": now, "last_reserved_by": PROCESS_ID},
+                "$setOnInsert": {"created_at": now}
             },
             upsert=True,
             return_document=True,  # Return document AFTER update
@@ -64,15 +96,128 @@ class AtomicDocumentNumbering:
         
         return result["current_sequence"]
     
-    async def generate_document_number(
+    async def get_next_sequence(
         self,
         organisation_id: str,
         prefix: str,
         session=None
+    ) -> int:
+        """
+        Get next atomic sequence number.
+        
+        Uses findOneAndUpdate with $inc for thread-safe increment.
+        Returns the NEW sequence number after increment.
+        
+        With reservation_size > 1 numbers are served from an in-process block
+        reserved outside any transaction (see __init__).
+        """
+        if self.reservation_size <= 1:
+            return await self._increment_sequence(organisation_id, prefix, 1, session)
+        
+        key = (organisation_id, prefix)
+        lock = self._reservation_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            pool = self._reservations.setdefault(key, deque())
+            if not pool:
+                await self._refill_reservation(key, pool)
+            return pool.popleft()
+    
+    async def _refill_reservation(self, key: Tuple[str, str], pool: Deque[int]):
+        """Reserve a fresh block for `key` into `pool` (caller holds the lock)"""
+        # No session: a rolled-back transaction must not return the
+        # block to the database while this process still holds it
+        last = await self._increment_sequence(key[0], key[1], self.reservation_size)
+        pool.extend(range(last - self.reservation_size + 1, last + 1))
+    
+    async def prewarm(
+        self,
+        organisation_id: str,
+        prefixes: Iterable[str] = ("WO", "PC")
+    ):
+        """
+        Reserve blocks ahead of time so the first numbers are served locally.
+        
+        Meant for moments that predict document creation, such as opening a
+        project. Pools that still hold numbers are left alone, and an empty
+        pool later refills on demand in get_next_sequence. Does nothing with
+        reservation_size 1, where every number comes from the caller's
+        transaction.
+        """
+        if self.reservation_size <= 1:
+            return
+        
+        async def warm(prefix: str):
+            key = (organisation_id, prefix)
+            lock = self._reservation_locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                pool = self._reservations.setdefault(key, deque())
+                if not pool:
+                    await self._refill_reservation(key, pool)
+        
+        await asyncio.gather(*(warm(prefix) for prefix in prefixes))
+    
+    def schedule_prewarm(
+        self,
+        organisation_id: str,
+        prefixes: Iterable[str] = ("WO", "PC")
+    ):
+        """
+        Run prewarm in the background so the triggering request (e.g. a
+        project open) does not wait on the reservation round trips.
+        """
+        if self.reservation_size <= 1:
+            return
+        
+        async def run():
+            try:
+                await self.prewarm(organisation_id, prefixes)
+            except Exception as e:
+                logger.warning(f"[NUMBERING] Prewarm failed for org {organisation_id}: {e}")
+        
+        # Keep a reference so the task is not garbage collected mid-flight
+        task = asyncio.create_task(run())
+        self._pending_prewarms.add(task)
+        task.add_done_callback(self._pending_prewarms.discard)
+    
+    async def document_number_exists(
+        self,
+        document_number: str,
+        collection: Optional[str] = None,
+        session=None
+    ) -> bool:
+        """
+        Check whether an issued document already carries this number.
+        
+        Includes the partial unique index filter so the probe can use that
+        index. Checks only `collection` when given, otherwise every numbered
+        collection.
+        """
+        collections = [collection] if collection else self.NUMBERED_COLLECTIONS
+        for name in collections:
+            existing = await self.db[name].find_one(
+                {"document_number": document_number, "sequence_number": {"$gt": 0}},
+                projection={"_id": 0, "document_number": 1},
+                session=session
+            )
+            if existing:
+                return True
+        return False
+    
+    async def generate_document_number(
+        self,
+        organisation_id: str,
+        prefix: str,
+        session=None,
+        collection: Optional[str] = None
     ) -> tuple:
         """
         Generate a unique document number with retry on collision.
         
+        Args:
+            collection: Collection the number will be written to. When given,
+                only that collection is probed for collisions (one round trip
+                instead of one per numbered collection).
+        
         Returns:
             tuple: (document_number, sequence_number)
             
@@ -86,20 +231,9 @@ class AtomicDocumentNumbering:
                 
                 # Verify uniqueness (belt and suspenders)
                 # This should rarely trigger due to atomic $inc
-                existing = await self.db.work_orders.find_one(
-                    {"document_number": document_number},
-                    session=session
-                )
-                
-                if not existing:
-                    existing = await self.db.payment_certificates.find_one(
-                        {"document_number": document_number},
-                        session=session
-                    )
-                
-                if existing:
+                if await self.document_number_exists(document_number, collection, session):
                     logger.warning(f"Document number collision: {document_number}, retry {attempt + 1}")
-                    await asyncio.sleep(self.RETRY_DELAY_MS * (attempt + 1) / 1000)
+                    await asyncio.sleep(self._retry_delay(attempt))
                     continue
                 
                 logger.info(f"Generated document number: {document_number}")
@@ -109,7 +243,7 @@ class AtomicDocumentNumbering:
                 logger.error(f"Sequence generation error: {str(e)}")
                 if attempt == self.MAX_RETRIES - 1:
                     raise
-                await asyncio.sleep(self.RETRY_DELAY_MS * (attempt + 1) / 1000)
+                await asyncio.sleep(self._retry_delay(attempt))
         
         raise SequenceCollisionError(
             f"Failed to generate unique document number after {self.MAX_RETRIES} attempts"
@@ -119,30 +253,33 @@ class AtomicDocumentNumbering:
         """
         Create unique indexes on document numbers.
         """
-        try:
-            # Work Orders - unique document number (exclude DRAFT)
-            await self.db.work_orders.create_index(
+        # One index per collection, so run the commands concurrently
+        results = await asyncio.gather(
+            # Work Orders - unique document number (drafts carry sequence_number 0)
+            self.db.work_orders.create_index(
                 [("document_number", 1)],
                 unique=True,
-                partialFilterExpression={"document_number": {"$ne": "DRAFT"}},
+                partialFilterExpression={"sequence_number": {"$gt": 0}},
                 name="unique_wo_document_number"
-            )
-            
-            # Payment Certificates - unique document number (exclude DRAFT)
-            await self.db.payment_certificates.create_index(
+            ),
+            # Payment Certificates - unique document number (drafts carry sequence_number 0)
+            self.db.payment_certificates.create_index(
                 [("document_number", 1)],
                 unique=True,
-                partialFilterExpression={"document_number": {"$ne": "DRAFT"}},
+                partialFilterExpression={"sequence_number": {"$gt": 0}},
                 name="unique_pc_document_number"
-            )
-            
+            ),
             # Sequence collection - unique org+prefix
-            await self.db.document_sequences.create_index(
+            self.db.document_sequences.create_index(
                 [("organisation_id", 1), ("prefix", 1)],
                 unique=True,
                 name="unique_sequence_key"
-            )
-            
-            logger.info("Created unique document number constraints")
-        except Exception as e:
+            ),
+            return_exceptions=True
+        )
+        
+        errors = [r for r in results if isinstance(r, Exception)]
+        for e in errors:
             logger.warning(f"Index creation result: {str(e)}")
+        if not errors:
+            logger.info("Created unique document number constraints")
@@ -9,7 +9,10 @@ Provides:
 """
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from datetime import datetime, date
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, date, timedelta
 from typing import Optional
 from bson import ObjectId
 import logging
@@ -67,9 +70,15 @@ class AttendanceDPREnforcement:
     """
     
     MIN_IMAGES_FOR_DPR = 4
+    ATTENDANCE_CACHE_TTL_SECONDS = 600
+    ATTENDANCE_CACHE_MAX_SIZE = 10_000
     
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
+        # Positive "attendance marked" results only; a miss may be marked
+        # at any moment, so negatives always go back to the database
+        # (supervisor_id, project_id, date) -> monotonic expiry
+        self._attendance_cache = OrderedDict()
     
     async def check_attendance_marked(
         self,
@@ -95,6 +104,15 @@ class AttendanceDPREnforcement:
         if check_date is None:
             check_date = datetime.utcnow().date()
         
+        cache_key = (supervisor_id, project_id, check_date.isoformat())
+        now = time.monotonic()
+        expires_at = self._attendance_cache.get(cache_key)
+        if expires_at is not None:
+            if expires_at > now:
+                self._attendance_cache.move_to_end(cache_key)
+                return True
+            del self._attendance_cache[cache_key]
+        
         # Query attendance for the specific date
         attendance = await self.db.attendance.find_one(
             {
@@ -102,6 +120,7 @@ class AttendanceDPREnforcement:
                 "project_id": project_id,
                 "attendance_date": check_date.isoformat()
             },
+            projection={"_id": 1},
             session=session
         )
         
@@ -112,6 +131,13 @@ class AttendanceDPREnforcement:
                 date=check_date.isoformat()
             )
         
+        # Inside a session the read may see this transaction's own
+        # uncommitted write, so only cache committed reads
+        if session is None:
+            self._attendance_cache[cache_key] = now + self.ATTENDANCE_CACHE_TTL_SECONDS
+            if len(self._attendance_cache) > self.ATTENDANCE_CACHE_MAX_SIZE:
+                self._attendance_cache.popitem(last=False)
+        
         return True
     
     async def validate_attendance_unique(
@@ -124,6 +150,9 @@ class AttendanceDPREnforcement:
         """
         Validate that attendance hasn't already been marked for the day.
         
+        Only for callers that need the answer before other work; inserts
+        rely on the unique_daily_attendance index instead of this read.
+        
         Raises:
             DuplicateAttendanceError if already marked
         """
@@ -136,6 +165,7 @@ class AttendanceDPREnforcement:
                 "project_id": project_id,
                 "attendance_date": check_date.isoformat()
             },
+            projection={"_id": 1},
             session=session
         )
         
@@ -166,33 +196,62 @@ class AttendanceDPREnforcement:
         if check_date is None:
             check_date = datetime.utcnow().date()
         
-        # Check attendance first
-        await self.check_attendance_marked(supervisor_id, project_id, check_date, session)
+        if session is None:
+            # Both lookups are independent reads, so overlap them. The
+            # attendance error still takes precedence over the image one.
+            attendance_result, image_count = await asyncio.gather(
+                self.check_attendance_marked(supervisor_id, project_id, check_date),
+                self._count_dpr_images(supervisor_id, project_id, check_date),
+                return_exceptions=True
+            )
+            if isinstance(attendance_result, BaseException):
+                raise attendance_result
+            if isinstance(image_count, BaseException):
+                raise image_count
+        else:
+            # A session cannot run concurrent operations, so stay serial
+            await self.check_attendance_marked(supervisor_id, project_id, check_date, session)
+            image_count = await self._count_dpr_images(
+                supervisor_id, project_id, check_date, session
+            )
         
-        # Count images for the day
-        start_of_day = datetime.combine(check_date, datetime.min.time())
-        end_of_day = datetime.combine(check_date, datetime.max.time())
+        if image_count < self.MIN_IMAGES_FOR_DPR:
+            raise DPRImageRequirementError(
+                required=self.MIN_IMAGES_FOR_DPR,
+                actual=image_count,
+                supervisor_id=supervisor_id,
+                project_id=project_id,
+                date=check_date.isoformat()
+            )
+    
+    async def _count_dpr_images(
+        self,
+        supervisor_id: str,
+        project_id: str,
+        check_date: date,
+        session=None
+    ) -> int:
+        """
+        Count the supervisor's images for the day, up to MIN_IMAGES_FOR_DPR.
+        """
+        start_of_day = datetime(check_date.year, check_date.month, check_date.day)
+        next_day = start_of_day + timedelta(days=1)
         
-        image_count = await self.db.images.count_documents(
+        # Only whether the minimum is met matters, so stop after
+        # MIN_IMAGES_FOR_DPR matches instead of counting the whole day
+        images = await self.db.images.find(
             {
                 "supervisor_id": supervisor_id,
                 "project_id": project_id,
                 "upload_timestamp": {
                     "$gte": start_of_day,
-                    "$lte": end_of_day
+                    "$lt": next_day
                 }
             },
+            projection={"_id": 1},
             session=session
-        )
-        
-        if image_count < self.MIN_IMAGES_FOR_DPR:
-            raise DPRImageRequirementError(
-                required=self.MIN_IMAGES_FOR_DPR,
-                actual=image_count,
-                supervisor_id=supervisor_id,
-                project_id=project_id,
-                date=check_date.isoformat()
-            )
+        ).limit(self.MIN_IMAGES_FOR_DPR).to_list(length=self.MIN_IMAGES_FOR_DPR)
+        return len(images)
     
     def validate_image_orientation(self, width: int, height: int) -> bool:
         """
@@ -210,6 +269,15 @@ class AttendanceDPREnforcement:
             )
         return True
     
+    async def create_indexes(self):
+        """
+        Create the attendance constraint and DPR image index concurrently.
+        """
+        await asyncio.gather(
+            self.create_attendance_constraint(),
+            self.create_dpr_image_index()
+        )
+    
     async def create_attendance_constraint(self):
         """
         Create unique constraint for one attendance per supervisor per project per day.
@@ -227,3 +295,20 @@ class AttendanceDPREnforcement:
             logger.info("Created unique attendance constraint")
         except Exception as e:
             logger.warning(f"Attendance index creation result: {str(e)}")
+    
+    async def create_dpr_image_index(self):
+        """
+        Create the index backing the DPR image requirement check.
+        """
+        try:
+            await self.db.images.create_index(
+                [
+                    ("supervisor_id", 1),
+                    ("project_id", 1),
+                    ("upload_timestamp", 1)
+                ],
+                name="dpr_image_lookup"
+            )
+            logger.info("Created DPR image lookup index")
+        except Exception as e:
+            logger.warning(f"DPR image index creation result: {str(e)}")
@@ -20,7 +20,10 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Callable
 from bson import ObjectId
 from decimal import Decimal
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import asyncio
+import hashlib
 import logging
 import traceback
 
@@ -54,10 +57,50 @@ class BackgroundJobEngine:
     MAX_RETRY_ATTEMPTS = 5
     BASE_RETRY_DELAY = 60  # seconds
     
+    # Jobs executed concurrently; further run requests wait in the queue
+    JOB_WORKER_COUNT = 4
+    # How long a RUNNING claim is honoured before another run may take over
+    JOB_LEASE_SECONDS = 3600
+    
+    # Documents per cursor batch when a job streams a collection
+    CURSOR_BATCH_SIZE = 500
+    # Documents per insert_many when a job buffers its writes
+    INSERT_BATCH_SIZE = 500
+    # Projects checked concurrently by the financial integrity job
+    INTEGRITY_CONCURRENCY = 16
+    
+    # Server-side prefilter for the financial integrity job. Mirrors the
+    # Decimal invariant checks; values that cannot be converted are passed
+    # through so Python still sees (and rejects) them.
+    _INVARIANT_CANDIDATE_EXPR = {
+        "$let": {
+            "vars": {
+                field: {"$convert": {"input": path, "to": "decimal", "onError": None, "onNull": 0}}
+                for field, path in (
+                    ("budget", "$budget.approved_budget_amount"),
+                    ("committed", "$committed_value"),
+                    ("certified", "$certified_value"),
+                    ("paid", "$paid_value"),
+                    ("retention", "$retention_held"),
+                )
+            },
+            "in": {"$or": [
+                {"$in": [None, ["$$budget", "$$committed", "$$certified", "$$paid", "$$retention"]]},
+                {"$and": [{"$gt": ["$$certified", "$$committed"]}, {"$gt": ["$$committed", 0]}]},
+                {"$gt": ["$$certified", "$$budget"]},
+                {"$gt": ["$$paid", "$$certified"]},
+                {"$lt": ["$$retention", 0]}
+            ]}
+        }
+    }
+    
     def __init__(self, client: AsyncIOMotorClient, db: AsyncIOMotorDatabase):
         self.client = client
         self.db = db
-        self._running_jobs = {}
+        # Fixed worker pool fed by run_job_async; started on first use so
+        # it binds to the running event loop
+        self._job_queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
     
     # =========================================================================
     # JOB SCHEDULING
@@ -69,17 +112,26 @@ class BackgroundJobEngine:
         params: Dict[str, Any],
         organisation_id: str,
         scheduled_by: Optional[str] = None,
-        run_at: Optional[datetime] = None
+        run_at: Optional[datetime] = None,
+        dedup_key: Optional[str] = None
     ) -> str:
-        """Schedule a job for execution"""
+        """
+        Schedule a job for execution.
+        
+        With a dedup_key the job id is derived from (job_type,
+        organisation_id, dedup_key), so scheduling the same key again
+        returns the existing job instead of queueing a duplicate. Include
+        whatever makes a run distinct (e.g. the date) in the key.
+        """
+        now = datetime.utcnow()
         job_doc = {
             "job_type": job_type,
             "params": params,
             "organisation_id": organisation_id,
             "status": JobStatus.PENDING,
             "scheduled_by": scheduled_by or "SYSTEM",
-            "scheduled_at": datetime.utcnow(),
-            "run_at": run_at or datetime.utcnow(),
+            "scheduled_at": now,
+            "run_at": run_at or now,
             "started_at": None,
             "completed_at": None,
             "retry_count": 0,
@@ -87,7 +139,18 @@ class BackgroundJobEngine:
             "result": None
         }
         
-        result = await self.db.background_jobs.insert_one(job_doc)
+        if dedup_key is not None:
+            digest = hashlib.sha1(
+                f"{job_type}:{organisation_id}:{dedup_key}".encode()
+            ).digest()
+            job_doc["_id"] = ObjectId(digest[:12])
+        
+        try:
+            result = await self.db.background_jobs.insert_one(job_doc)
+        except DuplicateKeyError:
+            job_id = str(job_doc["_id"])
+            logger.info(f"[JOB] Already scheduled: {job_id} type={job_type}")
+            return job_id
         job_id = str(result.inserted_id)
         
         logger.info(f"[JOB] Scheduled: {job_id} type={job_type}")
@@ -96,24 +159,68 @@ class BackgroundJobEngine:
     
     async def run_job_async(self, job_id: str):
         """Run a job asynchronously (non-blocking)"""
-        asyncio.create_task(self._execute_job(job_id))
+        self._ensure_workers()
+        self._job_queue.put_nowait(job_id)
         return {"status": "started", "job_id": job_id}
     
+    def _ensure_workers(self):
+        if not self._workers:
+            self._job_queue = asyncio.Queue()
+            self._workers = [
+                asyncio.create_task(self._job_worker())
+                for _ in range(self.JOB_WORKER_COUNT)
+            ]
+    
+    async def _job_worker(self):
+        """Execute queued jobs one at a time until a None sentinel arrives"""
+        while True:
+            job_id = await self._job_queue.get()
+            try:
+                if job_id is None:
+                    return
+                await self._execute_job(job_id)
+            except Exception as e:
+                logger.error(f"[JOB] Worker error for {job_id}: {e}")
+            finally:
+                self._job_queue.task_done()
+    
+    async def close(self):
+        """Let queued jobs finish and stop the workers (call on application shutdown)"""
+        if not self._workers:
+            return
+        for _ in self._workers:
+            self._job_queue.put_nowait(None)
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._job_queue = None
+    
     async def _execute_job(self, job_id: str):
         """Execute a job"""
+        job_oid = ObjectId(job_id)
         try:
-            job = await self.db.background_jobs.find_one({"_id": ObjectId(job_id)})
+            # Claim the job atomically in the shared database, so neither a
+            # repeated run request nor another replica can execute it twice.
+            # A RUNNING claim older than JOB_LEASE_SECONDS is treated as
+            # abandoned (e.g. the process died) and may be taken over.
+            now = datetime.utcnow()
+            job = await self.db.background_jobs.find_one_and_update(
+                {
+                    "_id": job_oid,
+                    "$or": [
+                        {"status": {"$in": [JobStatus.PENDING, JobStatus.RETRYING]}},
+                        {
+                            "status": JobStatus.RUNNING,
+                            "started_at": {"$lt": now - timedelta(seconds=self.JOB_LEASE_SECONDS)}
+                        }
+                    ]
+                },
+                {"$set": {"status": JobStatus.RUNNING, "started_at": now}}
+            )
             
             if not job:
-                logger.error(f"[JOB] Not found: {job_id}")
+                logger.info(f"[JOB] Not found or not runnable: {job_id}")
                 return
             
-            # Update status to running
-            await self.db.background_jobs.update_one(
-                {"_id": ObjectId(job_id)},
-                {"$set": {"status": JobStatus.RUNNING, "started_at": datetime.utcnow()}}
-            )
-            
             # Execute based on job type
             job_type = job["job_type"]
             params = job["params"]
@@ -137,7 +244,7 @@ class BackgroundJobEngine:
             
             # Update status to completed
             await self.db.background_jobs.update_one(
-                {"_id": ObjectId(job_id)},
+                {"_id": job_oid},
                 {
                     "$set": {
                         "status": JobStatus.COMPLETED,
@@ -154,39 +261,34 @@ class BackgroundJobEngine:
             logger.error(f"[JOB] Failed: {job_id} - {error_msg}")
             logger.error(traceback.format_exc())
             
-            # Check retry count
-            job = await self.db.background_jobs.find_one({"_id": ObjectId(job_id)})
-            retry_count = job.get("retry_count", 0)
+            # Decide retry vs. final failure server-side: one pipeline update
+            # applies either outcome and returns only the prior retry_count
+            now = datetime.utcnow()
+            retry_count = {"$ifNull": ["$retry_count", 0]}
+            can_retry = {"$lt": [retry_count, self.MAX_RETRY_ATTEMPTS]}
+            # Exponential backoff, in milliseconds for date arithmetic
+            backoff_ms = {"$multiply": [self.BASE_RETRY_DELAY * 1000, {"$pow": [2, retry_count]}]}
             
-            if retry_count < self.MAX_RETRY_ATTEMPTS:
-                # Schedule retry with exponential backoff
-                delay = self.BASE_RETRY_DELAY * (2 ** retry_count)
-                
-                await self.db.background_jobs.update_one(
-                    {"_id": ObjectId(job_id)},
-                    {
-                        "$set": {
-                            "status": JobStatus.RETRYING,
-                            "error_message": error_msg,
-                            "run_at": datetime.utcnow() + timedelta(seconds=delay)
-                        },
-                        "$inc": {"retry_count": 1}
-                    }
-                )
-                
-                logger.info(f"[JOB] Scheduled retry {retry_count + 1} for {job_id} in {delay}s")
-            else:
-                # Max retries exceeded
-                await self.db.background_jobs.update_one(
-                    {"_id": ObjectId(job_id)},
-                    {
-                        "$set": {
-                            "status": JobStatus.FAILED,
-                            "completed_at": datetime.utcnow(),
-                            "error_message": error_msg
-                        }
-                    }
-                )
+            job = await self.db.background_jobs.find_one_and_update(
+                {"_id": job_oid},
+                [{"$set": {
+                    "error_message": {"$literal": error_msg},
+                    "status": {"$cond": [can_retry, JobStatus.RETRYING, JobStatus.FAILED]},
+                    "run_at": {"$cond": [can_retry, {"$add": [now, backoff_ms]}, "$run_at"]},
+                    "completed_at": {"$cond": [can_retry, "$completed_at", now]},
+                    "retry_count": {"$cond": [can_retry, {"$add": [retry_count, 1]}, retry_count]}
+                }}],
+                projection={"retry_count": 1},
+                return_document=ReturnDocument.BEFORE
+            )
+            
+            if job is None:
+                return
+            
+            previous_retries = job.get("retry_count", 0)
+            if previous_retries < self.MAX_RETRY_ATTEMPTS:
+                delay = self.BASE_RETRY_DELAY * (2 ** previous_retries)
+                logger.info(f"[JOB] Scheduled retry {previous_retries + 1} for {job_id} in {delay}s")
     
     # =========================================================================
     # JOB 1: FINANCIAL INTEGRITY
@@ -201,100 +303,49 @@ class BackgroundJobEngine:
         Recompute invariants across all projects.
         Create Alert if violation detected.
         """
-        from core.financial_precision import to_decimal
-        
-        violations = []
         projects_checked = 0
+        # One detection time for every alert and timeline entry of this run
+        detected_at = datetime.utcnow()
         
-        # Get all projects for organisation
-        projects = await self.db.projects.find(
-            {"organisation_id": organisation_id}
-        ).to_list(length=None)
+        # Alerts and timeline entries are written in batches
+        alert_buffer: List[Dict] = []
+        timeline_buffer: List[Dict] = []
         
-        for project in projects:
-            project_id = str(project["_id"])
-            projects_checked += 1
-            
-            # Get all financial states for project
-            states = await self.db.derived_financial_state.find(
-                {"project_id": project_id}
-            ).to_list(length=None)
-            
-            for state in states:
-                code_id = state.get("code_id")
-                
-                # Get budget
-                budget = await self.db.project_budgets.find_one(
-                    {"project_id": project_id, "code_id": code_id}
+        # Projects are independent, so check up to INTEGRITY_CONCURRENCY of
+        # them at once; the semaphore also bounds how far the project
+        # cursor runs ahead of the checks
+        semaphore = asyncio.Semaphore(self.INTEGRITY_CONCURRENCY)
+        
+        async def check(project_id: str) -> List[Dict]:
+            try:
+                return await self._check_project_integrity(
+                    organisation_id, project_id, detected_at, alert_buffer, timeline_buffer
                 )
-                
-                if not budget:
-                    continue
-                
-                approved_budget = to_decimal(budget.get("approved_budget_amount", 0))
-                committed = to_decimal(state.get("committed_value", 0))
-                certified = to_decimal(state.get("certified_value", 0))
-                paid = to_decimal(state.get("paid_value", 0))
-                retention = to_decimal(state.get("retention_held", 0))
-                
-                # Check invariants
-                violation_details = []
-                
-                if certified > committed and committed > 0:
-                    violation_details.append({
-                        "type": "CERTIFIED_EXCEEDS_COMMITTED",
-                        "certified": float(certified),
-                        "committed": float(committed)
-                    })
-                
-                if certified > approved_budget:
-                    violation_details.append({
-                        "type": "CERTIFIED_EXCEEDS_BUDGET",
-                        "certified": float(certified),
-                        "budget": float(approved_budget)
-                    })
-                
-                if paid > certified:
-                    violation_details.append({
-                        "type": "PAID_EXCEEDS_CERTIFIED",
-                        "paid": float(paid),
-                        "certified": float(certified)
-                    })
-                
-                if retention < 0:
-                    violation_details.append({
-                        "type": "NEGATIVE_RETENTION",
-                        "retention": float(retention)
-                    })
-                
-                if violation_details:
-                    # Create alert
-                    alert_doc = {
-                        "organisation_id": organisation_id,
-                        "project_id": project_id,
-                        "code_id": code_id,
-                        "alert_type": "FINANCIAL_INTEGRITY_VIOLATION",
-                        "severity": "HIGH",
-                        "violations": violation_details,
-                        "detected_at": datetime.utcnow(),
-                        "resolved": False
-                    }
-                    await self.db.alerts.insert_one(alert_doc)
-                    
-                    violations.append({
-                        "project_id": project_id,
-                        "code_id": code_id,
-                        "violations": violation_details
-                    })
-                    
-                    # Log to timeline
-                    await self._log_timeline(
-                        organisation_id=organisation_id,
-                        project_id=project_id,
-                        event_type="INTEGRITY_VIOLATION",
-                        message=f"Financial integrity violation detected for code {code_id}",
-                        data={"violations": violation_details}
-                    )
+            finally:
+                semaphore.release()
+        
+        # Stream projects instead of materialising them all
+        projects = self.db.projects.find(
+            {"organisation_id": organisation_id},
+            {"_id": 1}
+        ).batch_size(self.CURSOR_BATCH_SIZE)
+        
+        tasks = []
+        try:
+            async for project in projects:
+                await semaphore.acquire()
+                tasks.append(asyncio.create_task(check(str(project["_id"]))))
+                projects_checked += 1
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        await self._flush_integrity_records(alert_buffer, timeline_buffer)
+        
+        # Report violations in project order regardless of completion order
+        violations = [violation for result in results for violation in result]
         
         return {
             "projects_checked": projects_checked,
@@ -302,6 +353,119 @@ class BackgroundJobEngine:
             "violations": violations
         }
     
+    async def _check_project_integrity(
+        self,
+        organisation_id: str,
+        project_id: str,
+        detected_at: datetime,
+        alert_buffer: List[Dict],
+        timeline_buffer: List[Dict]
+    ) -> List[Dict]:
+        """Check one project's financial states, buffering alerts for violations"""
+        from core.financial_precision import to_decimal
+        
+        violations = []
+        
+        # Join each financial state to its budget server-side; states
+        # without a budget are dropped by the $unwind
+        states = self.db.derived_financial_state.aggregate(
+            [
+                {"$match": {"project_id": project_id}},
+                {"$lookup": {
+                    "from": "project_budgets",
+                    "let": {"pid": "$project_id", "cid": "$code_id"},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$and": [
+                            {"$eq": ["$project_id", "$$pid"]},
+                            {"$eq": ["$code_id", "$$cid"]}
+                        ]}}},
+                        {"$limit": 1},
+                        {"$project": {"_id": 0, "approved_budget_amount": 1}}
+                    ],
+                    "as": "budget"
+                }},
+                {"$unwind": "$budget"},
+                # Only rows that may break an invariant reach Python
+                {"$match": {"$expr": self._INVARIANT_CANDIDATE_EXPR}}
+            ],
+            batchSize=self.CURSOR_BATCH_SIZE
+        )
+        
+        async for state in states:
+            code_id = state.get("code_id")
+            budget = state["budget"]
+            
+            approved_budget = to_decimal(budget.get("approved_budget_amount", 0))
+            committed = to_decimal(state.get("committed_value", 0))
+            certified = to_decimal(state.get("certified_value", 0))
+            paid = to_decimal(state.get("paid_value", 0))
+            retention = to_decimal(state.get("retention_held", 0))
+            
+            # Check invariants
+            violation_details = []
+            
+            if certified > committed and committed > 0:
+                violation_details.append({
+                    "type": "CERTIFIED_EXCEEDS_COMMITTED",
+                    "certified": float(certified),
+                    "committed": float(committed)
+                })
+            
+            if certified > approved_budget:
+                violation_details.append({
+                    "type": "CERTIFIED_EXCEEDS_BUDGET",
+                    "certified": float(certified),
+                    "budget": float(approved_budget)
+                })
+            
+            if paid > certified:
+                violation_details.append({
+                    "type": "PAID_EXCEEDS_CERTIFIED",
+                    "paid": float(paid),
+                    "certified": float(certified)
+                })
+            
+            if retention < 0:
+                violation_details.append({
+                    "type": "NEGATIVE_RETENTION",
+                    "retention": float(retention)
+                })
+            
+            if violation_details:
+                # Create alert
+                alert_doc = {
+                    "organisation_id": organisation_id,
+                    "project_id": project_id,
+                    "code_id": code_id,
+                    "alert_type": "FINANCIAL_INTEGRITY_VIOLATION",
+                    "severity": "HIGH",
+                    "violations": violation_details,
+                    "detected_at": detected_at,
+                    "resolved": False
+                }
+                alert_buffer.append(alert_doc)
+                
+                violations.append({
+                    "project_id": project_id,
+                    "code_id": code_id,
+                    "violations": violation_details
+                })
+                
+                # Log to timeline
+                timeline_buffer.append(self._timeline_doc(
+                    organisation_id=organisation_id,
+                    project_id=project_id,
+                    event_type="INTEGRITY_VIOLATION",
+                    message=f"Financial integrity violation detected for code {code_id}",
+                    data={"violations": violation_details},
+                    timestamp=detected_at
+                ))
+                
+                if len(alert_buffer) >= self.INSERT_BATCH_SIZE:
+                    await self._flush_integrity_records(alert_buffer, timeline_buffer)
+        
+        return violations
+    
     # =========================================================================
     # JOB 2: MEDIA PURGE
     # =========================================================================
@@ -318,33 +482,52 @@ class BackgroundJobEngine:
         retention_days = params.get("retention_days", self.DEFAULT_MEDIA_RETENTION)
         cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
         
-        # Get snapshot-linked image IDs (protected)
+        # Get snapshot-linked image IDs (protected): every list under a
+        # data_json key containing "image". Extracted and de-duplicated
+        # server-side so the rest of each snapshot never leaves Mongo.
         snapshot_images = set()
-        snapshots = await self.db.snapshots.find(
-            {"organisation_id": organisation_id},
-            {"data_json": 1}
-        ).to_list(length=None)
-        
-        for snapshot in snapshots:
-            data = snapshot.get("data_json", {})
-            if isinstance(data, dict):
-                for key, value in data.items():
-                    if "image" in key.lower() and isinstance(value, list):
-                        snapshot_images.update(value)
-        
-        # Find and delete old images (excluding protected)
-        deleted_count = 0
-        images = await self.db.dpr_images.find({
+        image_ids = self.db.snapshots.aggregate(
+            [
+                {"$match": {
+                    "organisation_id": organisation_id,
+                    "data_json": {"$type": "object"}
+                }},
+                {"$project": {
+                    "_id": 0,
+                    "lists": {"$filter": {
+                        "input": {"$objectToArray": "$data_json"},
+                        "cond": {"$and": [
+                            {"$regexMatch": {"input": "$$this.k", "regex": "image", "options": "i"}},
+                            {"$isArray": "$$this.v"}
+                        ]}
+                    }}
+                }},
+                {"$unwind": "$lists"},
+                {"$unwind": "$lists.v"},
+                {"$group": {"_id": "$lists.v"}}
+            ],
+            batchSize=self.CURSOR_BATCH_SIZE
+        )
+        
+        async for image_id in image_ids:
+            snapshot_images.add(image_id["_id"])
+        
+        # Snapshots reference images by id string; match _id both as stored
+        # and as ObjectId so the exclusion works server-side
+        protected_ids = list(snapshot_images)
+        protected_ids.extend(
+            ObjectId(image_id) for image_id in snapshot_images
+            if isinstance(image_id, str) and ObjectId.is_valid(image_id)
+        )
+        
+        # Delete old images (excluding protected) in one command
+        result = await self.db.dpr_images.delete_many({
             "organisation_id": organisation_id,
-            "uploaded_at": {"$lt": cutoff_date}
-        }).to_list(length=None)
-        
-        for img in images:
-            img_id = str(img["_id"])
-            if img_id not in snapshot_images:
-                await self.db.dpr_images.delete_one({"_id": img["_id"]})
-                deleted_count += 1
-                # TODO: Delete actual file from storage
+            "uploaded_at": {"$lt": cutoff_date},
+            "_id": {"$nin": protected_ids}
+        })
+        deleted_count = result.deleted_count
+        # TODO: Delete actual files from storage
         
         logger.info(f"[PURGE] Media: {deleted_count} images deleted")
         
@@ -394,27 +577,25 @@ class BackgroundJobEngine:
         
         # Don't delete PDFs linked to snapshots
         snapshot_pdfs = set()
-        snapshots = await self.db.snapshots.find(
-            {"organisation_id": organisation_id, "pdf_url": {"$ne": None}},
-            {"pdf_url": 1}
-        ).to_list(length=None)
-        
-        for snapshot in snapshots:
+        # Covered by snapshot_pdf_url: the filter implies its partial filter
+        # and only indexed fields are returned
+        snapshots = self.db.snapshots.find(
+            {"organisation_id": organisation_id, "pdf_url": {"$type": "string"}},
+            {"_id": 0, "pdf_url": 1}
+        ).batch_size(self.CURSOR_BATCH_SIZE)
+        
+        async for snapshot in snapshots:
             if snapshot.get("pdf_url"):
                 snapshot_pdfs.add(snapshot["pdf_url"])
         
-        # Find and delete old PDFs
-        deleted_count = 0
-        pdfs = await self.db.generated_pdfs.find({
+        # Delete old PDFs (excluding protected) in one command
+        result = await self.db.generated_pdfs.delete_many({
             "organisation_id": organisation_id,
-            "created_at": {"$lt": cutoff_date}
-        }).to_list(length=None)
-        
-        for pdf in pdfs:
-            if pdf.get("url") not in snapshot_pdfs:
-                await self.db.generated_pdfs.delete_one({"_id": pdf["_id"]})
-                deleted_count += 1
-                # TODO: Delete actual file from storage
+            "created_at": {"$lt": cutoff_date},
+            "url": {"$nin": list(snapshot_pdfs)}
+        })
+        deleted_count = result.deleted_count
+        # TODO: Delete actual files from storage
         
         logger.info(f"[PURGE] PDF: {deleted_count} files deleted")
         
@@ -434,33 +615,23 @@ class BackgroundJobEngine:
         params: Dict
     ) -> Dict:
         """Retry failed uploads with exponential backoff"""
-        retried = 0
-        succeeded = 0
-        failed = 0
-        
-        # Find failed uploads
-        failed_uploads = await self.db.upload_queue.find({
-            "organisation_id": organisation_id,
-            "status": "FAILED",
-            "retry_count": {"$lt": self.MAX_RETRY_ATTEMPTS}
-        }).to_list(length=None)
-        
-        for upload in failed_uploads:
-            retried += 1
-            try:
-                # TODO: Implement actual upload retry logic
-                # For now, just mark as retried
-                await self.db.upload_queue.update_one(
-                    {"_id": upload["_id"]},
-                    {
-                        "$set": {"status": "PENDING", "last_retry_at": datetime.utcnow()},
-                        "$inc": {"retry_count": 1}
-                    }
-                )
-                succeeded += 1
-            except Exception as e:
-                failed += 1
-                logger.error(f"[RETRY] Upload {upload['_id']} failed: {e}")
+        # Every eligible upload gets the same requeue update, so apply it
+        # server-side in one command instead of fetching and updating each
+        # TODO: Implement actual upload retry logic
+        result = await self.db.upload_queue.update_many(
+            {
+                "organisation_id": organisation_id,
+                "status": "FAILED",
+                "retry_count": {"$lt": self.MAX_RETRY_ATTEMPTS}
+            },
+            {
+                "$set": {"status": "PENDING", "last_retry_at": datetime.utcnow()},
+                "$inc": {"retry_count": 1}
+            }
+        )
+        retried = result.matched_count
+        succeeded = result.modified_count
+        failed = retried - succeeded
         
         logger.info(f"[RETRY] Drive: {retried} retried, {succeeded} succeeded, {failed} failed")
         
@@ -480,32 +651,23 @@ class BackgroundJobEngine:
         params: Dict
     ) -> Dict:
         """Retry failed compression tasks"""
-        retried = 0
-        succeeded = 0
-        failed = 0
-        
-        # Find failed compression tasks
-        failed_tasks = await self.db.compression_queue.find({
-            "organisation_id": organisation_id,
-            "status": "FAILED",
-            "retry_count": {"$lt": self.MAX_RETRY_ATTEMPTS}
-        }).to_list(length=None)
-        
-        for task in failed_tasks:
-            retried += 1
-            try:
-                # TODO: Implement actual compression retry logic
-                await self.db.compression_queue.update_one(
-                    {"_id": task["_id"]},
-                    {
-                        "$set": {"status": "PENDING", "last_retry_at": datetime.utcnow()},
-                        "$inc": {"retry_count": 1}
-                    }
-                )
-                succeeded += 1
-            except Exception as e:
-                failed += 1
-                logger.error(f"[RETRY] Compression {task['_id']} failed: {e}")
+        # Every eligible task gets the same requeue update, so apply it
+        # server-side in one command instead of fetching and updating each
+        # TODO: Implement actual compression retry logic
+        result = await self.db.compression_queue.update_many(
+            {
+                "organisation_id": organisation_id,
+                "status": "FAILED",
+                "retry_count": {"$lt": self.MAX_RETRY_ATTEMPTS}
+            },
+            {
+                "$set": {"status": "PENDING", "last_retry_at": datetime.utcnow()},
+                "$inc": {"retry_count": 1}
+            }
+        )
+        retried = result.matched_count
+        succeeded = result.modified_count
+        failed = retried - succeeded
         
         logger.info(f"[RETRY] Compression: {retried} retried, {succeeded} succeeded, {failed} failed")
         
@@ -519,24 +681,36 @@ class BackgroundJobEngine:
     # HELPERS
     # =========================================================================
     
-    async def _log_timeline(
+    def _timeline_doc(
         self,
         organisation_id: str,
         project_id: str,
         event_type: str,
         message: str,
-        data: Optional[Dict] = None
-    ):
-        """Log event to timeline"""
-        timeline_doc = {
+        data: Optional[Dict] = None,
+        timestamp: Optional[datetime] = None
+    ) -> Dict:
+        """Build a timeline entry"""
+        return {
             "organisation_id": organisation_id,
             "project_id": project_id,
             "event_type": event_type,
             "message": message,
             "data": data,
-            "timestamp": datetime.utcnow()
+            "timestamp": timestamp or datetime.utcnow()
         }
-        await self.db.timeline.insert_one(timeline_doc)
+    
+    async def _flush_integrity_records(self, alerts: List[Dict], timeline: List[Dict]):
+        """Insert buffered alerts and timeline entries, then empty the buffers"""
+        # Detach the batches before awaiting so entries appended by
+        # concurrent project checks meanwhile land in the next flush
+        alert_batch, timeline_batch = alerts[:], timeline[:]
+        alerts.clear()
+        timeline.clear()
+        if alert_batch:
+            await self.db.alerts.insert_many(alert_batch, ordered=False)
+        if timeline_batch:
+            await self.db.timeline.insert_many(timeline_batch, ordered=False)
     
     async def get_job_status(self, job_id: str) -> Dict:
         """Get job status"""
@@ -577,6 +751,25 @@ class BackgroundJobEngine:
                 [("organisation_id", 1), ("project_id", 1), ("timestamp", -1)],
                 name="timeline_lookup"
             )
+            await self.db.snapshots.create_index(
+                [("organisation_id", 1), ("pdf_url", 1)],
+                partialFilterExpression={"pdf_url": {"$type": "string"}},
+                name="snapshot_pdf_url"
+            )
             logger.info("Background job indexes created")
         except Exception as e:
             logger.warning(f"Job index creation: {e}")
+        
+        # Runnable jobs only, so the pending-job poll never walks finished
+        # jobs. $in in a partial filter needs MongoDB 6.0+; on older servers
+        # this fails on its own and the poll keeps using job_queue_lookup.
+        try:
+            await self.db.background_jobs.create_index(
+                [("organisation_id", 1), ("run_at", 1)],
+                partialFilterExpression={
+                    "status": {"$in": [JobStatus.PENDING, JobStatus.RETRYING]}
+                },
+                name="job_runnable"
+            )
+        except Exception as e:
+            logger.warning(f"Runnable job index creation: {e}")
@@ -16,10 +16,13 @@ ONLY adds enforcement layer.
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from decimal import Decimal
 from datetime import datetime
-from bson import ObjectId, Decimal128
+from bson import Decimal128
 from fastapi import HTTPException, status
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+import asyncio
 import logging
+import os
+import threading
 import uuid
 
 from core.financial_determinism import (
@@ -28,15 +31,79 @@ from core.financial_determinism import (
     OperationType,
     to_decimal,
     to_decimal128,
+    to_object_id,
     domain_events
 )
 from core.hardened_financial_engine import HardenedFinancialEngine
-from core.financial_precision import calculate_wo_values, calculate_pc_values, to_float, round_financial
+from core.financial_precision import (
+    calculate_wo_values,
+    calculate_pc_values,
+    to_float,
+    round_financial,
+    NegativeValueError
+)
 from core.policy_service import PolicyService
 
 logger = logging.getLogger(__name__)
 
 
+# =============================================================================
+# OPERATION IDS
+# =============================================================================
+
+_OPERATION_ID_POOL_SIZE = 256
+_operation_id_lock = threading.Lock()
+_operation_id_entropy = b""
+_operation_id_offset = 0
+
+
+def _reset_operation_id_pool():
+    """Drop buffered entropy so a forked worker never reuses its parent's ids"""
+    global _operation_id_lock, _operation_id_entropy, _operation_id_offset
+    _operation_id_lock = threading.Lock()
+    _operation_id_entropy = b""
+    _operation_id_offset = 0
+
+
+def _next_operation_id() -> str:
+    """
+    Generate a random (version 4) operation_id.
+    
+    Entropy is drawn from os.urandom in blocks of _OPERATION_ID_POOL_SIZE
+    ids, so one syscall serves many requests instead of one per uuid4().
+    """
+    global _operation_id_entropy, _operation_id_offset
+    with _operation_id_lock:
+        if _operation_id_offset >= len(_operation_id_entropy):
+            _operation_id_entropy = os.urandom(16 * _OPERATION_ID_POOL_SIZE)
+            _operation_id_offset = 0
+        raw = _operation_id_entropy[_operation_id_offset:_operation_id_offset + 16]
+        _operation_id_offset += 16
+    return str(uuid.UUID(bytes=raw, version=4))
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_operation_id_pool)
+
+
+def _failed_result(operation_id: str, error: Exception) -> Dict[str, Any]:
+    """bulk_mutate result for an operation that was rejected or rolled back"""
+    if isinstance(error, HTTPException):
+        return {
+            "status": "failed",
+            "operation_id": operation_id,
+            "status_code": error.status_code,
+            "detail": error.detail
+        }
+    # Unexpected errors (e.g. a write conflict) are logged, not echoed back
+    return {
+        "status": "failed",
+        "operation_id": operation_id,
+        "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+        "detail": "Mutation failed; it can be retried with the same operation_id"
+    }
+
+
 # =============================================================================
 # EXCEPTIONS
 # =============================================================================
@@ -62,18 +129,43 @@ class DeterministicFinancialService:
     - Invariant validation inside transaction
     - Domain event emission after commit
     - Policy enforcement via PolicyService (Phase 4D)
+    
+    Mutations overlap their reads and bulk_mutate runs aggregates in
+    parallel, so the client should keep a roomy pool, e.g.
+    AsyncIOMotorClient(uri, maxPoolSize=200, minPoolSize=20).
     """
     
+    # Below this, concurrent mutations start queueing for connections
+    MIN_RECOMMENDED_POOL_SIZE = 50
+    
     def __init__(self, client: AsyncIOMotorClient, db: AsyncIOMotorDatabase):
         self.client = client
         self.db = db
         self.aggregate_manager = FinancialAggregateManager(client, db)
         self.hardened_engine = HardenedFinancialEngine(client, db)
         self.policy = PolicyService(db)  # Phase 4D: Policy Service
+        self._check_pool_size()
+    
+    def _check_pool_size(self):
+        """Warn when the Mongo connection pool is too small for fan-out."""
+        try:
+            max_pool_size = self.client.options.pool_options.max_pool_size
+        except AttributeError:
+            return
+        
+        if max_pool_size is not None and max_pool_size < self.MIN_RECOMMENDED_POOL_SIZE:
+            logger.warning(
+                f"[DETERMINISM] MongoDB maxPoolSize={max_pool_size} is below the recommended "
+                f"{self.MIN_RECOMMENDED_POOL_SIZE}; concurrent mutations may queue for connections"
+            )
     
     async def initialize(self):
         """Initialize determinism layer (create indexes)"""
-        await self.aggregate_manager.create_indexes()
+        # Determinism and hardening indexes live on different collections
+        await asyncio.gather(
+            self.aggregate_manager.create_indexes(),
+            self.hardened_engine.create_indexes()
+        )
         logger.info("[DETERMINISM] Service initialized")
     
     # =========================================================================
@@ -99,57 +191,63 @@ class DeterministicFinancialService:
         F) Record mutation
         G) Emit domain event after commit
         """
-        # A) Generate operation_id if not provided
-        op_id = operation_id or str(uuid.uuid4())
-        
-        # B) Check idempotency
-        if await self.aggregate_manager.check_idempotency(op_id):
-            return {
-                "status": "skipped",
-                "reason": "idempotent_duplicate",
-                "operation_id": op_id
-            }
+        return await self._execute_single(
+            self._prepare_issue_work_order,
+            operation_id,
+            wo_id=wo_id,
+            organisation_id=organisation_id,
+            user_id=user_id
+        )
+    
+    async def _prepare_issue_work_order(
+        self,
+        operation_id: str,
+        wo_id: str,
+        organisation_id: str,
+        user_id: str
+    ) -> Dict[str, Any]:
+        """Read the WO and build its WO_ISSUE mutation entry."""
+        # Fetch WO details for locking
+        wo = await self.db.work_orders.find_one(
+            {"_id": to_object_id(wo_id)},
+            {"project_id": 1, "code_id": 1, "base_amount": 1}
+        )
         
-        # Get WO details for locking
-        wo = await self.db.work_orders.find_one({"_id": ObjectId(wo_id)})
         if not wo:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Work Order not found"
             )
         
-        project_id = wo["project_id"]
-        code_id = wo["code_id"]
         base_amount = to_decimal(wo.get("base_amount", 0))
         
-        # Define mutation function
-        async def mutation_fn(aggregate, session):
+        # Document number is assigned by the engine during the issue
+        issued = {}
+        
+        # Entity writes, run inside the mutation transaction
+        async def apply_fn(session):
             # Call existing hardened engine issue
-            await self.hardened_engine.issue_work_order(
+            issued.update(await self.hardened_engine.issue_work_order(
                 wo_id=wo_id,
                 organisation_id=organisation_id,
-                user_id=user_id
-            )
-            
-            # Return delta for aggregate update
-            return {
+                user_id=user_id,
+                session=session
+            ))
+        
+        return {
+            "operation_id": operation_id,
+            "project_id": wo["project_id"],
+            "code_id": wo["code_id"],
+            "entity_type": EntityType.WORK_ORDER,
+            "entity_id": wo_id,
+            "operation_type": OperationType.WO_ISSUE,
+            "delta": {
                 "committed_value": base_amount  # Add WO amount to committed
-            }
-        
-        # Execute with deterministic wrapper
-        result = await self.aggregate_manager.execute_financial_mutation(
-            operation_id=op_id,
-            project_id=project_id,
-            code_id=code_id,
-            entity_type=EntityType.WORK_ORDER,
-            entity_id=wo_id,
-            operation_type=OperationType.WO_ISSUE,
-            mutation_fn=mutation_fn,
-            event_type="WORK_ORDER_ISSUED",
-            event_payload_fn=lambda agg: {"wo_id": wo_id, "document_number": result.get("document_number")}
-        )
-        
-        return result
+            },
+            "apply_fn": apply_fn,
+            "event_type": "WORK_ORDER_ISSUED",
+            "event_payload_fn": lambda agg: {"wo_id": wo_id, "document_number": issued.get("document_number")}
+        }
     
     # =========================================================================
     # WORK ORDER REVISE (with deterministic wrapper)
@@ -166,59 +264,79 @@ class DeterministicFinancialService:
         operation_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Revise Work Order with deterministic guarantees."""
-        op_id = operation_id or str(uuid.uuid4())
-        
-        if await self.aggregate_manager.check_idempotency(op_id):
-            return {
-                "status": "skipped",
-                "reason": "idempotent_duplicate",
-                "operation_id": op_id
+        return await self._execute_single(
+            self._prepare_revise_work_order,
+            operation_id,
+            wo_id=wo_id,
+            organisation_id=organisation_id,
+            user_id=user_id,
+            rate=rate,
+            quantity=quantity,
+            retention_percentage=retention_percentage
+        )
+    
+    async def _prepare_revise_work_order(
+        self,
+        operation_id: str,
+        wo_id: str,
+        organisation_id: str,
+        user_id: str,
+        rate: Optional[float] = None,
+        quantity: Optional[float] = None,
+        retention_percentage: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Read the current WO and build its WO_REVISE mutation entry."""
+        wo = await self.db.work_orders.find_one(
+            {"_id": to_object_id(wo_id)},
+            {
+                "project_id": 1, "code_id": 1, "base_amount": 1,
+                "rate": 1, "quantity": 1, "retention_percentage": 1
             }
+        )
         
-        # Get current WO
-        wo = await self.db.work_orders.find_one({"_id": ObjectId(wo_id)})
         if not wo:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Work Order not found"
             )
         
-        project_id = wo["project_id"]
-        code_id = wo["code_id"]
-        old_base_amount = to_decimal(wo.get("base_amount", 0))
-        
-        # Calculate new amount
-        new_rate = rate if rate is not None else wo["rate"]
-        new_quantity = quantity if quantity is not None else wo["quantity"]
-        new_retention = retention_percentage if retention_percentage is not None else wo["retention_percentage"]
-        wo_values = calculate_wo_values(new_rate, new_quantity, new_retention)
-        new_base_amount = to_decimal(wo_values.get("base_amount", 0))
-        
-        delta_committed = new_base_amount - old_base_amount
+        if rate is None and quantity is None and retention_percentage is None:
+            # No-op revision (e.g. a retry): base_amount cannot change
+            delta_committed = Decimal('0')
+        else:
+            old_base_amount = to_decimal(wo.get("base_amount", 0))
+            
+            # Calculate new amount
+            new_rate = rate if rate is not None else wo["rate"]
+            new_quantity = quantity if quantity is not None else wo["quantity"]
+            new_retention = retention_percentage if retention_percentage is not None else wo["retention_percentage"]
+            wo_values = calculate_wo_values(new_rate, new_quantity, new_retention)
+            new_base_amount = to_decimal(wo_values.get("base_amount", 0))
+            
+            delta_committed = new_base_amount - old_base_amount
         
-        async def mutation_fn(aggregate, session):
+        async def apply_fn(session):
             await self.hardened_engine.revise_work_order(
                 wo_id=wo_id,
                 organisation_id=organisation_id,
                 user_id=user_id,
                 rate=rate,
                 quantity=quantity,
-                retention_percentage=retention_percentage
+                retention_percentage=retention_percentage,
+                session=session
             )
-            return {"committed_value": delta_committed}
         
-        result = await self.aggregate_manager.execute_financial_mutation(
-            operation_id=op_id,
-            project_id=project_id,
-            code_id=code_id,
-            entity_type=EntityType.WORK_ORDER,
-            entity_id=wo_id,
-            operation_type=OperationType.WO_REVISE,
-            mutation_fn=mutation_fn,
-            event_type="WORK_ORDER_REVISED"
-        )
-        
-        return result
+        return {
+            "operation_id": operation_id,
+            "project_id": wo["project_id"],
+            "code_id": wo["code_id"],
+            "entity_type": EntityType.WORK_ORDER,
+            "entity_id": wo_id,
+            "operation_type": OperationType.WO_REVISE,
+            "delta": {"committed_value": delta_committed},
+            "apply_fn": apply_fn,
+            "event_type": "WORK_ORDER_REVISED"
+        }
     
     # =========================================================================
     # PC CERTIFICATION (with deterministic wrapper)
@@ -232,51 +350,62 @@ class DeterministicFinancialService:
         operation_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Certify Payment Certificate with deterministic guarantees."""
-        op_id = operation_id or str(uuid.uuid4())
-        
-        if await self.aggregate_manager.check_idempotency(op_id):
-            return {
-                "status": "skipped",
-                "reason": "idempotent_duplicate",
-                "operation_id": op_id
+        return await self._execute_single(
+            self._prepare_certify_payment_certificate,
+            operation_id,
+            pc_id=pc_id,
+            organisation_id=organisation_id,
+            user_id=user_id
+        )
+    
+    async def _prepare_certify_payment_certificate(
+        self,
+        operation_id: str,
+        pc_id: str,
+        organisation_id: str,
+        user_id: str
+    ) -> Dict[str, Any]:
+        """Read the PC and build its PC_CERTIFY mutation entry."""
+        pc = await self.db.payment_certificates.find_one(
+            {"_id": to_object_id(pc_id)},
+            {
+                "project_id": 1, "code_id": 1,
+                "current_bill_amount": 1, "retention_current": 1
             }
+        )
         
-        pc = await self.db.payment_certificates.find_one({"_id": ObjectId(pc_id)})
         if not pc:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Payment Certificate not found"
             )
         
-        project_id = pc["project_id"]
-        code_id = pc["code_id"]
         bill_amount = to_decimal(pc.get("current_bill_amount", 0))
         retention_current = to_decimal(pc.get("retention_current", 0))
         
-        async def mutation_fn(aggregate, session):
+        async def apply_fn(session):
             await self.hardened_engine.certify_payment_certificate(
                 pc_id=pc_id,
                 organisation_id=organisation_id,
-                user_id=user_id
+                user_id=user_id,
+                session=session
             )
-            return {
+        
+        return {
+            "operation_id": operation_id,
+            "project_id": pc["project_id"],
+            "code_id": pc["code_id"],
+            "entity_type": EntityType.PAYMENT_CERTIFICATE,
+            "entity_id": pc_id,
+            "operation_type": OperationType.PC_CERTIFY,
+            "delta": {
                 "certified_value": bill_amount,
                 "retention_cumulative": retention_current,
                 "retention_held": retention_current
-            }
-        
-        result = await self.aggregate_manager.execute_financial_mutation(
-            operation_id=op_id,
-            project_id=project_id,
-            code_id=code_id,
-            entity_type=EntityType.PAYMENT_CERTIFICATE,
-            entity_id=pc_id,
-            operation_type=OperationType.PC_CERTIFY,
-            mutation_fn=mutation_fn,
-            event_type="PC_CERTIFIED"
-        )
-        
-        return result
+            },
+            "apply_fn": apply_fn,
+            "event_type": "PC_CERTIFIED"
+        }
     
     # =========================================================================
     # PC REVISION (with deterministic wrapper)
@@ -292,69 +421,94 @@ class DeterministicFinancialService:
         operation_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Revise Payment Certificate with deterministic guarantees."""
-        op_id = operation_id or str(uuid.uuid4())
-        
-        if await self.aggregate_manager.check_idempotency(op_id):
-            return {
-                "status": "skipped",
-                "reason": "idempotent_duplicate",
-                "operation_id": op_id
+        return await self._execute_single(
+            self._prepare_revise_payment_certificate,
+            operation_id,
+            pc_id=pc_id,
+            organisation_id=organisation_id,
+            user_id=user_id,
+            current_bill_amount=current_bill_amount,
+            retention_percentage=retention_percentage
+        )
+    
+    async def _prepare_revise_payment_certificate(
+        self,
+        operation_id: str,
+        pc_id: str,
+        organisation_id: str,
+        user_id: str,
+        current_bill_amount: Optional[float] = None,
+        retention_percentage: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Read the current PC and build its PC_REVISE mutation entry."""
+        pc = await self.db.payment_certificates.find_one(
+            {"_id": to_object_id(pc_id)},
+            {
+                "project_id": 1, "code_id": 1,
+                "current_bill_amount": 1, "retention_current": 1,
+                "retention_percentage": 1, "cumulative_previous_certified": 1,
+                "cgst_percentage": 1, "sgst_percentage": 1
             }
+        )
         
-        pc = await self.db.payment_certificates.find_one({"_id": ObjectId(pc_id)})
         if not pc:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Payment Certificate not found"
             )
         
-        project_id = pc["project_id"]
-        code_id = pc["code_id"]
         old_bill = to_decimal(pc.get("current_bill_amount", 0))
         old_retention = to_decimal(pc.get("retention_current", 0))
         
-        new_bill = to_decimal(current_bill_amount) if current_bill_amount else old_bill
+        # Same "is not None" rule as the hardened engine, so an explicit 0 is
+        # validated (and rejected) rather than silently treated as "unchanged"
+        new_bill = old_bill if current_bill_amount is None else to_decimal(current_bill_amount)
         new_retention_pct = retention_percentage if retention_percentage is not None else pc.get("retention_percentage", 0)
         
-        # Calculate new retention
-        pc_values = calculate_pc_values(
-            float(new_bill),
-            float(pc.get("cumulative_previous_certified", 0)),
-            new_retention_pct,
-            pc.get("cgst_percentage", 0),
-            pc.get("sgst_percentage", 0)
-        )
-        new_retention = to_decimal(pc_values.get("retention_current", 0))
+        # Calculate new retention (calculate_pc_values takes Decimals directly)
+        try:
+            pc_values = calculate_pc_values(
+                new_bill,
+                pc.get("cumulative_previous_certified", 0),
+                new_retention_pct,
+                pc.get("cgst_percentage", 0),
+                pc.get("sgst_percentage", 0)
+            )
+        except NegativeValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        new_retention = to_decimal(pc_values["retention_current"])
         
         delta_certified = new_bill - old_bill
         delta_retention = new_retention - old_retention
         
-        async def mutation_fn(aggregate, session):
+        async def apply_fn(session):
             await self.hardened_engine.revise_payment_certificate(
                 pc_id=pc_id,
                 organisation_id=organisation_id,
                 user_id=user_id,
                 current_bill_amount=current_bill_amount,
-                retention_percentage=retention_percentage
+                retention_percentage=retention_percentage,
+                session=session
             )
-            return {
+        
+        return {
+            "operation_id": operation_id,
+            "project_id": pc["project_id"],
+            "code_id": pc["code_id"],
+            "entity_type": EntityType.PAYMENT_CERTIFICATE,
+            "entity_id": pc_id,
+            "operation_type": OperationType.PC_REVISE,
+            "delta": {
                 "certified_value": delta_certified,
                 "retention_cumulative": delta_retention,
                 "retention_held": delta_retention
-            }
-        
-        result = await self.aggregate_manager.execute_financial_mutation(
-            operation_id=op_id,
-            project_id=project_id,
-            code_id=code_id,
-            entity_type=EntityType.PAYMENT_CERTIFICATE,
-            entity_id=pc_id,
-            operation_type=OperationType.PC_REVISE,
-            mutation_fn=mutation_fn,
-            event_type="PC_REVISED"
-        )
-        
-        return result
+            },
+            "apply_fn": apply_fn,
+            "event_type": "PC_REVISED"
+        }
     
     # =========================================================================
     # PAYMENT ENTRY (with deterministic wrapper)
@@ -371,49 +525,63 @@ class DeterministicFinancialService:
         operation_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Create Payment with deterministic guarantees."""
-        op_id = operation_id or str(uuid.uuid4())
-        
-        if await self.aggregate_manager.check_idempotency(op_id):
-            return {
-                "status": "skipped",
-                "reason": "idempotent_duplicate",
-                "operation_id": op_id
-            }
+        return await self._execute_single(
+            self._prepare_create_payment,
+            operation_id,
+            pc_id=pc_id,
+            payment_amount=payment_amount,
+            payment_date=payment_date,
+            payment_reference=payment_reference,
+            organisation_id=organisation_id,
+            user_id=user_id
+        )
+    
+    async def _prepare_create_payment(
+        self,
+        operation_id: str,
+        pc_id: str,
+        payment_amount: float,
+        payment_date: datetime,
+        payment_reference: str,
+        organisation_id: str,
+        user_id: str
+    ) -> Dict[str, Any]:
+        """Read the parent PC and build its PAYMENT_CREATE mutation entry."""
+        pc = await self.db.payment_certificates.find_one(
+            {"_id": to_object_id(pc_id)},
+            {"project_id": 1, "code_id": 1}
+        )
         
-        pc = await self.db.payment_certificates.find_one({"_id": ObjectId(pc_id)})
         if not pc:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Payment Certificate not found"
             )
         
-        project_id = pc["project_id"]
-        code_id = pc["code_id"]
         amount = to_decimal(payment_amount)
         
-        async def mutation_fn(aggregate, session):
-            await self.hardened_engine.create_payment(
+        async def apply_fn(session):
+            await self.hardened_engine.record_payment(
                 pc_id=pc_id,
                 payment_amount=payment_amount,
                 payment_date=payment_date,
                 payment_reference=payment_reference,
                 organisation_id=organisation_id,
-                user_id=user_id
+                user_id=user_id,
+                session=session
             )
-            return {"paid_value": amount}
-        
-        result = await self.aggregate_manager.execute_financial_mutation(
-            operation_id=op_id,
-            project_id=project_id,
-            code_id=code_id,
-            entity_type=EntityType.PAYMENT,
-            entity_id=pc_id,  # Reference PC as the parent entity
-            operation_type=OperationType.PAYMENT_CREATE,
-            mutation_fn=mutation_fn,
-            event_type="PAYMENT_CREATED"
-        )
         
-        return result
+        return {
+            "operation_id": operation_id,
+            "project_id": pc["project_id"],
+            "code_id": pc["code_id"],
+            "entity_type": EntityType.PAYMENT,
+            "entity_id": pc_id,  # Reference PC as the parent entity
+            "operation_type": OperationType.PAYMENT_CREATE,
+            "delta": {"paid_value": amount},
+            "apply_fn": apply_fn,
+            "event_type": "PAYMENT_CREATED"
+        }
     
     # =========================================================================
     # RETENTION RELEASE (with deterministic wrapper)
@@ -431,44 +599,56 @@ class DeterministicFinancialService:
         operation_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Create Retention Release with deterministic guarantees."""
-        op_id = operation_id or str(uuid.uuid4())
-        
-        if await self.aggregate_manager.check_idempotency(op_id):
-            return {
-                "status": "skipped",
-                "reason": "idempotent_duplicate",
-                "operation_id": op_id
-            }
-        
+        return await self._execute_single(
+            self._prepare_create_retention_release,
+            operation_id,
+            project_id=project_id,
+            code_id=code_id,
+            vendor_id=vendor_id,
+            release_amount=release_amount,
+            release_date=release_date,
+            organisation_id=organisation_id,
+            user_id=user_id
+        )
+    
+    async def _prepare_create_retention_release(
+        self,
+        operation_id: str,
+        project_id: str,
+        code_id: str,
+        vendor_id: str,
+        release_amount: float,
+        release_date: datetime,
+        organisation_id: str,
+        user_id: str
+    ) -> Dict[str, Any]:
+        """Build the RETENTION_RELEASE mutation entry (no reads needed)."""
         amount = to_decimal(release_amount)
         
-        async def mutation_fn(aggregate, session):
-            await self.hardened_engine.create_retention_release(
+        async def apply_fn(session):
+            await self.hardened_engine.release_retention(
                 project_id=project_id,
                 code_id=code_id,
                 vendor_id=vendor_id,
                 release_amount=release_amount,
                 release_date=release_date,
                 organisation_id=organisation_id,
-                user_id=user_id
+                user_id=user_id,
+                session=session
             )
-            return {"retention_held": -amount}  # Decrease retention held
-        
-        # Create entity ID for tracking
-        entity_id = f"{project_id}_{code_id}_{vendor_id}"
         
-        result = await self.aggregate_manager.execute_financial_mutation(
-            operation_id=op_id,
-            project_id=project_id,
-            code_id=code_id,
-            entity_type=EntityType.RETENTION_RELEASE,
-            entity_id=entity_id,
-            operation_type=OperationType.RETENTION_RELEASE,
-            mutation_fn=mutation_fn,
-            event_type="RETENTION_RELEASED"
-        )
-        
-        return result
+        return {
+            "operation_id": operation_id,
+            "project_id": project_id,
+            "code_id": code_id,
+            "entity_type": EntityType.RETENTION_RELEASE,
+            # Create entity ID for tracking
+            "entity_id": f"{project_id}_{code_id}_{vendor_id}",
+            "operation_type": OperationType.RETENTION_RELEASE,
+            "delta": {"retention_held": -amount},  # Decrease retention held
+            "apply_fn": apply_fn,
+            "event_type": "RETENTION_RELEASED"
+        }
     
     # =========================================================================
     # BUDGET UPDATE (with deterministic wrapper)
@@ -488,20 +668,30 @@ class DeterministicFinancialService:
         
         Phase 4E: If new budget < certified_value → block with BudgetReductionError.
         """
-        op_id = operation_id or str(uuid.uuid4())
-        
-        if await self.aggregate_manager.check_idempotency(op_id):
-            return {
-                "status": "skipped",
-                "reason": "idempotent_duplicate",
-                "operation_id": op_id
-            }
-        
-        # Get current budget
-        budget = await self.db.project_budgets.find_one({
-            "project_id": project_id,
-            "code_id": code_id
-        })
+        return await self._execute_single(
+            self._prepare_update_budget,
+            operation_id,
+            project_id=project_id,
+            code_id=code_id,
+            approved_budget_amount=approved_budget_amount,
+            organisation_id=organisation_id,
+            user_id=user_id
+        )
+    
+    async def _prepare_update_budget(
+        self,
+        operation_id: str,
+        project_id: str,
+        code_id: str,
+        approved_budget_amount: float,
+        organisation_id: str,
+        user_id: str
+    ) -> Dict[str, Any]:
+        """Read the current budget and build its BUDGET_UPDATE mutation entry."""
+        budget = await self.db.project_budgets.find_one(
+            {"project_id": project_id, "code_id": code_id},
+            {"approved_budget_amount": 1}
+        )
         
         old_amount = to_decimal(budget.get("approved_budget_amount", 0)) if budget else Decimal('0')
         new_amount = to_decimal(approved_budget_amount)
@@ -510,10 +700,10 @@ class DeterministicFinancialService:
         # Phase 4E: Check if budget reduction would violate certified_value constraint
         if new_amount < old_amount:
             # Get current aggregate to check certified_value
-            aggregate = await self.db.financial_aggregates.find_one({
-                "project_id": project_id,
-                "code_id": code_id
-            })
+            aggregate = await self.db.financial_aggregates.find_one(
+                {"project_id": project_id, "code_id": code_id},
+                {"certified_value": 1}
+            )
             
             if aggregate:
                 certified_value = to_decimal(aggregate.get("certified_value", 0))
@@ -533,7 +723,7 @@ class DeterministicFinancialService:
                         }
                     )
         
-        async def mutation_fn(aggregate, session):
+        async def apply_fn(session):
             # Update budget in database
             await self.db.project_budgets.update_one(
                 {"project_id": project_id, "code_id": code_id},
@@ -547,31 +737,187 @@ class DeterministicFinancialService:
                 upsert=True,
                 session=session
             )
-            
-            # Also update the aggregate's approved_budget directly
-            await self.db.financial_aggregates.update_one(
-                {"project_id": project_id, "code_id": code_id},
-                {"$set": {"approved_budget": to_decimal128(new_amount)}},
-                session=session
-            )
-            
-            return {"approved_budget": delta}
         
-        entity_id = f"{project_id}_{code_id}"
+        return {
+            "operation_id": operation_id,
+            "project_id": project_id,
+            "code_id": code_id,
+            "entity_type": EntityType.BUDGET,
+            "entity_id": f"{project_id}_{code_id}",
+            "operation_type": OperationType.BUDGET_UPDATE,
+            "delta": {"approved_budget": delta},
+            "apply_fn": apply_fn,
+            "event_type": "BUDGET_UPDATED"
+        }
+
+    # =========================================================================
+    # MUTATION EXECUTION
+    # =========================================================================
+
+    async def _execute_single(self, prepare, operation_id: Optional[str], **params) -> Dict[str, Any]:
+        """
+        Run one mutation: check idempotency while prepare() reads the entity
+        and computes the delta, then execute it on the fast path.
+        """
+        op_id = operation_id or _next_operation_id()
         
-        result = await self.aggregate_manager.execute_financial_mutation(
-            operation_id=op_id,
-            project_id=project_id,
-            code_id=code_id,
-            entity_type=EntityType.BUDGET,
-            entity_id=entity_id,
-            operation_type=OperationType.BUDGET_UPDATE,
-            mutation_fn=mutation_fn,
-            event_type="BUDGET_UPDATED"
+        already_applied, mutation = await asyncio.gather(
+            self.aggregate_manager.check_idempotency(op_id),
+            prepare(op_id, **params),
+            return_exceptions=True
         )
+        if isinstance(already_applied, BaseException):
+            raise already_applied
+        # An applied operation is skipped even if it would now fail validation
+        if already_applied:
+            return {
+                "status": "skipped",
+                "reason": "idempotent_duplicate",
+                "operation_id": op_id
+            }
+        if isinstance(mutation, BaseException):
+            raise mutation
         
-        return result
-    
+        return await self.aggregate_manager.execute_financial_mutation_fast(**mutation)
+
+    # Operations accepted by bulk_mutate; each has a _prepare_<name> builder
+    BULK_OPERATIONS = (
+        "issue_work_order",
+        "revise_work_order",
+        "certify_payment_certificate",
+        "revise_payment_certificate",
+        "create_payment",
+        "create_retention_release",
+        "update_budget",
+    )
+
+    async def bulk_mutate(self, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Apply a batch of mutations, returning one result per operation in order.
+
+        Each entry is {"operation": <method name>, "params": {...}} where params
+        are the keyword arguments of that method (operation_id optional).
+
+        - Idempotency for the whole batch is resolved with a single query
+        - Operations are grouped by FinancialAggregate; each group commits
+          through execute_financial_mutations in one transaction (one lock,
+          one aggregate update, one bulk mutation-log write)
+        - A group is all-or-nothing: if any operation in it is rejected,
+          every operation in the group reports "failed"
+        - Failures never abort the request: every operation gets a result
+          carrying its (possibly generated) operation_id, so a client can
+          retry just the failed ones without re-applying committed groups
+        - An entity touched twice in a group starts a new transaction, whose
+          operations are prepared again from the committed state
+        - Distinct aggregates are processed concurrently
+        """
+        pending = []
+        for op in operations:
+            name = op.get("operation")
+            if name not in self.BULK_OPERATIONS:
+                raise ValueError(f"Unsupported bulk operation: {name}")
+            params = dict(op.get("params") or {})
+            params["operation_id"] = params.get("operation_id") or _next_operation_id()
+            pending.append((name, params))
+
+        applied = await self.aggregate_manager.check_idempotency_many(
+            [params["operation_id"] for _, params in pending]
+        )
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(pending)
+        to_prepare = []
+        for index, (name, params) in enumerate(pending):
+            if params["operation_id"] in applied:
+                results[index] = {
+                    "status": "skipped",
+                    "reason": "idempotent_duplicate",
+                    "operation_id": params["operation_id"]
+                }
+            else:
+                to_prepare.append((index, name, params))
+
+        groups: Dict[tuple, list] = {}
+        for index, name, params, mutation in await self._prepare_bulk(to_prepare, results):
+            key = (mutation["project_id"], mutation["code_id"])
+            groups.setdefault(key, []).append((index, name, params, mutation))
+
+        async def run_batch(project_id, code_id, batch):
+            try:
+                outcomes = await self.aggregate_manager.execute_financial_mutations(
+                    project_id, code_id, [mutation for _, _, _, mutation in batch]
+                )
+            except Exception as e:
+                if not isinstance(e, HTTPException):
+                    logger.exception(
+                        f"[BULK] Batch failed for project={project_id}, code={code_id}: {e}"
+                    )
+                for index, _, params, _ in batch:
+                    results[index] = _failed_result(params["operation_id"], e)
+                return
+            for (index, _, _, _), outcome in zip(batch, outcomes):
+                results[index] = outcome
+
+        async def run_group(project_id, code_id, items):
+            batch = []
+            batch_entities = set()
+            committed_entities = set()
+            for index, name, params, mutation in items:
+                if mutation["entity_id"] in batch_entities:
+                    # Its delta was computed from the pre-batch state
+                    await run_batch(project_id, code_id, batch)
+                    committed_entities |= batch_entities
+                    batch, batch_entities = [], set()
+                if mutation["entity_id"] in committed_entities:
+                    prepared = await self._prepare_bulk([(index, name, params)], results)
+                    if not prepared:
+                        continue
+                    mutation = prepared[0][3]
+                batch.append((index, name, params, mutation))
+                batch_entities.add(mutation["entity_id"])
+            if batch:
+                await run_batch(project_id, code_id, batch)
+
+        outcomes = await asyncio.gather(
+            *(run_group(*key, items) for key, items in groups.items()),
+            return_exceptions=True
+        )
+        for items, outcome in zip(groups.values(), outcomes):
+            if not isinstance(outcome, Exception):
+                continue
+            logger.exception(f"[BULK] Group failed: {outcome}", exc_info=outcome)
+            for index, _, params, _ in items:
+                if results[index] is None:
+                    results[index] = _failed_result(params["operation_id"], outcome)
+
+        return results
+
+    async def _prepare_bulk(self, items, results) -> List[tuple]:
+        """
+        Build mutation entries for (index, name, params) items concurrently.
+        Rejected operations are recorded as failed in results and dropped.
+        """
+        async def prepare(name, params):
+            params = dict(params)
+            operation_id = params.pop("operation_id")
+            return await getattr(self, f"_prepare_{name}")(operation_id, **params)
+
+        outcomes = await asyncio.gather(
+            *(prepare(name, params) for _, name, params in items),
+            return_exceptions=True
+        )
+
+        prepared = []
+        for (index, name, params), outcome in zip(items, outcomes):
+            if isinstance(outcome, Exception):
+                if not isinstance(outcome, HTTPException):
+                    logger.exception(f"[BULK] Preparing {name} failed: {outcome}", exc_info=outcome)
+                results[index] = _failed_result(params["operation_id"], outcome)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                prepared.append((index, name, params, outcome))
+        return prepared
+
     # =========================================================================
     # AGGREGATE QUERY (read-only)
     # =========================================================================
@@ -582,24 +928,32 @@ class DeterministicFinancialService:
         code_id: str
     ) -> Optional[Dict[str, Any]]:
         """Get current financial aggregate state."""
-        aggregate = await self.db.financial_aggregates.find_one({
-            "project_id": project_id,
-            "code_id": code_id
-        })
-        
-        if aggregate:
-            # Convert Decimal128 to float for API response
-            return {
-                "project_id": aggregate["project_id"],
-                "code_id": aggregate["code_id"],
-                "approved_budget": float(to_decimal(aggregate.get("approved_budget", 0))),
-                "committed_value": float(to_decimal(aggregate.get("committed_value", 0))),
-                "certified_value": float(to_decimal(aggregate.get("certified_value", 0))),
-                "paid_value": float(to_decimal(aggregate.get("paid_value", 0))),
-                "retention_cumulative": float(to_decimal(aggregate.get("retention_cumulative", 0))),
-                "retention_held": float(to_decimal(aggregate.get("retention_held", 0))),
-                "version": aggregate.get("version", 1),
-                "last_reconciled_at": aggregate.get("last_reconciled_at")
-            }
+        # Decimal128 -> double conversion happens server-side, so only the
+        # response fields cross the wire and no Decimals are built here
+        def amount(field):
+            return {"$ifNull": [{"$toDouble": f"${field}"}, 0.0]}
+        
+        aggregates = await self.db.financial_aggregates.aggregate([
+            {"$match": {"project_id": project_id, "code_id": code_id}},
+            {"$limit": 1},
+            {"$project": {
+                "_id": 0,
+                "project_id": 1,
+                "code_id": 1,
+                "approved_budget": amount("approved_budget"),
+                "committed_value": amount("committed_value"),
+                "certified_value": amount("certified_value"),
+                "paid_value": amount("paid_value"),
+                "retention_cumulative": amount("retention_cumulative"),
+                "retention_held": amount("retention_held"),
+                "version": {"$ifNull": ["$version", 1]},
+                "last_reconciled_at": 1
+            }}
+        ]).to_list(1)
+        
+        if aggregates:
+            aggregate = aggregates[0]
+            aggregate.setdefault("last_reconciled_at", None)
+            return aggregate
         
         return None
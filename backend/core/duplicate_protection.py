@@ -70,7 +70,10 @@ class DuplicateInvoiceProtection:
             from bson import ObjectId
             query["_id"] = {"$ne": ObjectId(exclude_pc_id)}
         
-        existing = await self.db.payment_certificates.find_one(query, session=session)
+        # Only the _id is reported back, so skip decoding the rest of the PC
+        existing = await self.db.payment_certificates.find_one(
+            query, {"_id": 1}, session=session
+        )
         
         if existing:
             raise DuplicateInvoiceError(
@@ -101,7 +104,9 @@ class DuplicateInvoiceProtection:
                 unique=True,
                 partialFilterExpression={
                     "status": {"$in": ["Certified", "Partially Paid", "Fully Paid"]},
-                    "invoice_number": {"$exists": True, "$ne": None}
+                    # $ne is not allowed in partial filters; $type also
+                    # excludes missing and null invoice numbers
+                    "invoice_number": {"$type": "string"}
                 },
                 name="unique_certified_invoice"
             )
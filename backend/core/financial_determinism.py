@@ -13,12 +13,17 @@ This module provides the enforcement layer WITHOUT modifying existing formulas.
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timedelta
 from bson import ObjectId, Decimal128
 from fastapi import HTTPException, status
-from typing import Optional, Dict, Any, Callable, Awaitable
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from typing import Optional, Dict, Any, Callable, Awaitable, List, Set
 from enum import Enum
+from functools import lru_cache
+from bisect import bisect_right
 import logging
+import struct
 import uuid
 
 logger = logging.getLogger(__name__)
@@ -28,26 +33,114 @@ logger = logging.getLogger(__name__)
 # DECIMAL UTILITIES
 # =============================================================================
 
+# Financial precision: 2 decimal places (built once, used on every write)
+QUANTIZE_PATTERN = Decimal('0.01')
+
+
+_ZERO = Decimal('0')
+
+# Exact-type converters for the common inputs; one dict lookup instead of
+# walking the isinstance chain on every aggregate field
+_TO_DECIMAL = {
+    Decimal: lambda value: value,
+    Decimal128: lambda value: value.to_decimal(),
+    type(None): lambda value: _ZERO,
+    int: Decimal,
+    str: Decimal,
+    float: lambda value: Decimal(str(value)),
+}
+
+
 def to_decimal(value) -> Decimal:
     """Convert any numeric value to Decimal"""
+    convert = _TO_DECIMAL.get(type(value))
+    if convert is not None:
+        return convert(value)
+    # Subclasses and other numerics
     if isinstance(value, Decimal):
         return value
     if isinstance(value, Decimal128):
         return value.to_decimal()
-    if value is None:
-        return Decimal('0')
     return Decimal(str(value))
 
 
 def to_decimal128(value) -> Decimal128:
     """Convert to Decimal128 for MongoDB storage"""
-    decimal_value = to_decimal(value).quantize(Decimal('0.01'))
+    decimal_value = to_decimal(value).quantize(QUANTIZE_PATTERN)
     return Decimal128(decimal_value)
 
 
 def round_financial(value: Decimal) -> Decimal:
     """Round to 2 decimal places for financial precision"""
-    return value.quantize(Decimal('0.01'))
+    return value.quantize(QUANTIZE_PATTERN)
+
+
+# Decimal128 is IEEE 754-2008 BID: sign bit, 14-bit biased exponent and a
+# 113-bit coefficient (unless both combination bits are set)
+_UNPACK_BID = struct.Struct('<QQ').unpack
+_BID_COMBINATION_MASK = 0x6000000000000000
+_BID_EXPONENT_BIAS = 6176
+
+
+def to_cents(value) -> int:
+    """
+    Convert a monetary value to integer cents (2 dp, as stored).
+    
+    Decimal128 values with at most 2 decimal places are decoded straight
+    from their BID bits, without allocating a Decimal.
+    """
+    if type(value) is Decimal128:
+        low, high = _UNPACK_BID(value.bid)
+        if high & _BID_COMBINATION_MASK != _BID_COMBINATION_MASK:
+            exponent = ((high >> 49) & 0x3FFF) - _BID_EXPONENT_BIAS
+            if exponent >= -2:
+                cents = (((high & 0x1FFFFFFFFFFFF) << 64) | low) * 10 ** (exponent + 2)
+                return -cents if high >> 63 else cents
+    elif type(value) is int:
+        return value * 100
+    return int(to_decimal(value).quantize(QUANTIZE_PATTERN).scaleb(2))
+
+
+def from_cents(cents: int) -> Decimal:
+    """Convert integer cents back to a 2 dp Decimal"""
+    return Decimal(cents).scaleb(-2)
+
+
+@lru_cache(maxsize=4096)
+def to_object_id(value: str) -> ObjectId:
+    """Parse a hex id into an ObjectId, memoised for hot entity ids"""
+    return ObjectId(value)
+
+
+# =============================================================================
+# FINANCIAL INVARIANTS
+# =============================================================================
+
+# (rule, lower_field, upper_field, message): lower ≤ upper must hold;
+# a lower_field of None stands for zero
+FINANCIAL_INVARIANTS = (
+    ("CERTIFIED_LE_COMMITTED", "certified_value", "committed_value",
+     "Certified value ({certified_value}) cannot exceed committed value ({committed_value})"),
+    ("CERTIFIED_LE_BUDGET", "certified_value", "approved_budget",
+     "Certified value ({certified_value}) cannot exceed approved budget ({approved_budget})"),
+    ("PAID_LE_CERTIFIED", "paid_value", "certified_value",
+     "Paid value ({paid_value}) cannot exceed certified value ({certified_value})"),
+    ("RETENTION_NON_NEGATIVE", None, "retention_held",
+     "Retention held ({retention_held}) cannot be negative"),
+)
+
+
+@lru_cache(maxsize=64)
+def invariants_for_fields(fields: frozenset) -> tuple:
+    """
+    Invariants a delta on the given fields can break. Only a handful of
+    field sets occur (one per operation type), so this is effectively a
+    per-operation validator table built on first use.
+    """
+    return tuple(
+        invariant for invariant in FINANCIAL_INVARIANTS
+        if invariant[1] in fields or invariant[2] in fields
+    )
 
 
 # =============================================================================
@@ -83,6 +176,13 @@ class IdempotentSkipError(Exception):
         super().__init__(f"Operation {operation_id} already applied")
 
 
+class OperationInProgressError(Exception):
+    """Operation claimed by another in-flight request"""
+    def __init__(self, operation_id: str):
+        self.operation_id = operation_id
+        super().__init__(f"Operation {operation_id} is already in progress")
+
+
 class FinancialValidationError(Exception):
     """Financial invariant validation failed"""
     def __init__(self, message: str, details: Dict[str, Any] = None):
@@ -115,6 +215,11 @@ class PeriodLockedError(Exception):
 # DOMAIN EVENTS
 # =============================================================================
 
+# Bound once: queue_event runs for every committed mutation
+_uuid4 = uuid.uuid4
+_utcnow = datetime.utcnow
+
+
 class DomainEventEmitter:
     """
     Emit domain events AFTER successful DB commit only.
@@ -133,14 +238,18 @@ class DomainEventEmitter:
     
     def __init__(self):
         self._pending_events: list = []
-        self._handlers: Dict[str, list] = {}
+        # Handlers are split by kind at registration so emission needn't
+        # re-inspect them: sync ones run inline, async ones concurrently
+        self._sync_handlers: Dict[str, list] = {}
+        self._async_handlers: Dict[str, list] = {}
         self._committed: bool = False  # Track if we're post-commit
     
     def register_handler(self, event_type: str, handler: Callable):
         """Register a handler for an event type"""
-        if event_type not in self._handlers:
-            self._handlers[event_type] = []
-        self._handlers[event_type].append(handler)
+        if asyncio.iscoroutinefunction(handler):
+            self._async_handlers.setdefault(event_type, []).append(handler)
+        else:
+            self._sync_handlers.setdefault(event_type, []).append(handler)
     
     def queue_event(self, event_type: str, payload: Dict[str, Any]):
         """
@@ -149,12 +258,13 @@ class DomainEventEmitter:
         IMPORTANT: This captures event data but does NOT dispatch.
         Dispatch only happens via emit_pending() after transaction commits.
         """
+        queued_at = _utcnow()
         event = {
-            "event_id": str(uuid.uuid4()),
+            "event_id": _uuid4().hex,
             "event_type": event_type,
             "payload": payload.copy(),  # Deep copy to capture state at queue time
-            "timestamp": datetime.utcnow().isoformat(),
-            "queued_at": datetime.utcnow()
+            "timestamp": queued_at.isoformat(),
+            "queued_at": queued_at
         }
         self._pending_events.append(event)
         logger.debug(f"[DOMAIN_EVENT] Queued: {event_type} - {event['event_id']}")
@@ -182,25 +292,34 @@ class DomainEventEmitter:
         
         for event in events_to_emit:
             event_type = event["event_type"]
-            handlers = self._handlers.get(event_type, [])
             
             # Mark emission time
-            event["emitted_at"] = datetime.utcnow().isoformat()
+            event["emitted_at"] = _utcnow().isoformat()
             
-            for handler in handlers:
+            # Log but don't re-raise - event emission failures
+            # should not affect the already-committed transaction
+            for handler in self._sync_handlers.get(event_type, ()):
                 try:
-                    if asyncio.iscoroutinefunction(handler):
-                        await handler(event)
-                    else:
-                        handler(event)
+                    handler(event)
                 except Exception as e:
-                    # Log but don't re-raise - event emission failures
-                    # should not affect the already-committed transaction
                     logger.error(
                         f"[DOMAIN_EVENT] Handler error for {event_type}: {str(e)}",
                         exc_info=True
                     )
             
+            async_handlers = self._async_handlers.get(event_type)
+            if async_handlers:
+                results = await asyncio.gather(
+                    *(handler(event) for handler in async_handlers),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.error(
+                            f"[DOMAIN_EVENT] Handler error for {event_type}: {str(result)}",
+                            exc_info=result
+                        )
+            
             logger.info(f"[DOMAIN_EVENT] Emitted: {event_type} - {event['event_id']}")
         
         self._committed = False
@@ -245,9 +364,28 @@ class FinancialAggregateManager:
     COLLECTION_AGGREGATE = "financial_aggregates"
     COLLECTION_MUTATION_LOG = "mutation_operation_logs"
     
+    # An unapplied claim older than this is treated as abandoned (crashed
+    # worker) and may be taken over by a retry of the same operation_id
+    CLAIM_LEASE_SECONDS = 300
+    
+    # Locked accounting periods change rarely; they are cached in-process
+    # and re-read at most this often (or on invalidate_period_cache)
+    PERIOD_CACHE_TTL_SECONDS = 60
+    
     def __init__(self, client: AsyncIOMotorClient, db: AsyncIOMotorDatabase):
         self.client = client
         self.db = db
+        
+        # Locked periods sorted by start_date, with parallel lists of start
+        # dates (for bisect) and running max end_date (for overlaps)
+        self._period_cache: List[Dict[str, Any]] = []
+        self._period_starts: List[datetime] = []
+        self._period_max_ends: List[datetime] = []
+        self._period_cache_expires_at = datetime.min
+        self._period_cache_lock = asyncio.Lock()
+        
+        # Set once create_indexes has built the index the idempotency probes hint
+        self._idempotency_index_ready = False
     
     # =========================================================================
     # INDEX CREATION
@@ -255,25 +393,31 @@ class FinancialAggregateManager:
     
     async def create_indexes(self):
         """Create required indexes for financial determinism"""
-        # FinancialAggregate unique constraint
-        await self.db[self.COLLECTION_AGGREGATE].create_index(
-            [("project_id", 1), ("code_id", 1)],
-            unique=True,
-            name="idx_aggregate_project_code_unique"
-        )
-        
-        # MutationOperationLog unique constraint on Operation_ID
-        await self.db[self.COLLECTION_MUTATION_LOG].create_index(
-            [("operation_id", 1)],
-            unique=True,
-            name="idx_mutation_operation_id_unique"
-        )
-        
-        # Index for querying mutations by entity
-        await self.db[self.COLLECTION_MUTATION_LOG].create_index(
-            [("entity_type", 1), ("entity_id", 1)],
-            name="idx_mutation_entity"
+        await asyncio.gather(
+            # FinancialAggregate unique constraint
+            self.db[self.COLLECTION_AGGREGATE].create_index(
+                [("project_id", 1), ("code_id", 1)],
+                unique=True,
+                name="idx_aggregate_project_code_unique"
+            ),
+            # MutationOperationLog unique constraint on Operation_ID
+            self.db[self.COLLECTION_MUTATION_LOG].create_index(
+                [("operation_id", 1)],
+                unique=True,
+                name="idx_mutation_operation_id_unique"
+            ),
+            # Lets idempotency probes be answered from the index alone
+            self.db[self.COLLECTION_MUTATION_LOG].create_index(
+                [("operation_id", 1), ("applied_flag", 1)],
+                name="idx_mutation_operation_applied"
+            ),
+            # Index for querying mutations by entity
+            self.db[self.COLLECTION_MUTATION_LOG].create_index(
+                [("entity_type", 1), ("entity_id", 1)],
+                name="idx_mutation_entity"
+            )
         )
+        self._idempotency_index_ready = True
         
         logger.info("[DETERMINISM] Created financial determinism indexes")
     
@@ -281,6 +425,12 @@ class FinancialAggregateManager:
     # IDEMPOTENCY CHECK
     # =========================================================================
     
+    def _idempotency_hint(self) -> Dict[str, Any]:
+        """find() kwargs pinning the covering idempotency index once it exists"""
+        if self._idempotency_index_ready:
+            return {"hint": "idx_mutation_operation_applied"}
+        return {}
+    
     async def check_idempotency(
         self,
         operation_id: str,
@@ -290,16 +440,119 @@ class FinancialAggregateManager:
         Check if operation was already applied.
         Returns True if operation exists and is applied (should skip).
         """
-        existing = await self.db[self.COLLECTION_MUTATION_LOG].find_one(
-            {"operation_id": operation_id},
-            session=session
+        # Covered by idx_mutation_operation_applied: served from the index.
+        # The hint pins it over the unique operation_id index, and is only
+        # given once the index exists (a hint on a missing index fails)
+        applied = await self.db[self.COLLECTION_MUTATION_LOG].find_one(
+            {"operation_id": operation_id, "applied_flag": True},
+            {"_id": 0, "applied_flag": 1},
+            session=session,
+            **self._idempotency_hint()
         )
         
-        if existing and existing.get("applied_flag", False):
+        if applied:
             logger.info(f"[IDEMPOTENT] Skipping already applied operation: {operation_id}")
             return True
         
         return False
+
+    async def check_idempotency_many(
+        self,
+        operation_ids: List[str],
+        session=None
+    ) -> Set[str]:
+        """
+        Check a batch of operations in one query.
+        Returns the subset of operation_ids already applied (should skip).
+        """
+        if not operation_ids:
+            return set()
+
+        # Covered by idx_mutation_operation_applied, as in check_idempotency
+        cursor = self.db[self.COLLECTION_MUTATION_LOG].find(
+            {"operation_id": {"$in": list(operation_ids)}, "applied_flag": True},
+            {"_id": 0, "operation_id": 1},
+            session=session,
+            **self._idempotency_hint()
+        )
+        applied = {doc["operation_id"] async for doc in cursor}
+
+        if applied:
+            logger.info(f"[IDEMPOTENT] Skipping {len(applied)} already applied operations")
+
+        return applied
+
+    async def try_claim_operation(
+        self,
+        operation_id: str,
+        entity_type: EntityType,
+        entity_id: str,
+        operation_type: OperationType,
+        session=None
+    ) -> bool:
+        """
+        Claim operation_id before mutating.
+        
+        The insert doubles as idempotency check and lock: the unique
+        operation_id index lets exactly one concurrent submit through.
+        Returns False if the operation was already applied (should skip).
+        Raises OperationInProgressError while another request holds it.
+        """
+        now = datetime.utcnow()
+        log = self.db[self.COLLECTION_MUTATION_LOG]
+        
+        try:
+            await log.insert_one(
+                {
+                    "operation_id": operation_id,
+                    "entity_type": entity_type.value,
+                    "entity_id": entity_id,
+                    "operation_type": operation_type.value,
+                    "applied_flag": False,
+                    "claimed_at": now
+                },
+                session=session
+            )
+            return True
+        except DuplicateKeyError:
+            pass
+        
+        # Take over a claim abandoned by a crashed request
+        stale = await log.find_one_and_update(
+            {
+                "operation_id": operation_id,
+                "applied_flag": False,
+                "claimed_at": {"$lt": now - timedelta(seconds=self.CLAIM_LEASE_SECONDS)}
+            },
+            {"$set": {"claimed_at": now}},
+            projection={"_id": 1},
+            session=session
+        )
+        if stale:
+            return True
+        
+        existing = await log.find_one(
+            {"operation_id": operation_id},
+            {"applied_flag": 1},
+            session=session
+        )
+        if existing is None or not existing.get("applied_flag", False):
+            raise OperationInProgressError(operation_id)
+        
+        logger.info(f"[IDEMPOTENT] Skipping already applied operation: {operation_id}")
+        return False
+    
+    async def release_operation_claim(self, operation_id: str):
+        """
+        Drop an unapplied claim so the operation can be retried.
+        Best-effort: a claim left behind expires after CLAIM_LEASE_SECONDS.
+        """
+        try:
+            await self.db[self.COLLECTION_MUTATION_LOG].delete_one(
+                {"operation_id": operation_id, "applied_flag": False}
+            )
+        except Exception as e:
+            logger.warning(f"[IDEMPOTENT] Failed to release claim {operation_id}: {str(e)}")
     
     async def record_mutation(
         self,
@@ -326,6 +579,41 @@ class FinancialAggregateManager:
             session=session
         )
     
+    async def record_mutations_bulk(
+        self,
+        mutations: List[Dict[str, Any]],
+        session=None
+    ):
+        """
+        Record several mutation operations as applied in one round-trip.
+        Each entry needs operation_id, entity_type, entity_id and operation_type.
+        """
+        if not mutations:
+            return
+        
+        created_at = datetime.utcnow()
+        await self.db[self.COLLECTION_MUTATION_LOG].bulk_write(
+            [
+                UpdateOne(
+                    {"operation_id": mutation["operation_id"]},
+                    {
+                        "$set": {
+                            "operation_id": mutation["operation_id"],
+                            "entity_type": mutation["entity_type"].value,
+                            "entity_id": mutation["entity_id"],
+                            "operation_type": mutation["operation_type"].value,
+                            "applied_flag": True,
+                            "created_at": created_at
+                        }
+                    },
+                    upsert=True
+                )
+                for mutation in mutations
+            ],
+            ordered=False,
+            session=session
+        )
+    
     # =========================================================================
     # AGGREGATE LOCKING & RETRIEVAL
     # =========================================================================
@@ -340,25 +628,11 @@ class FinancialAggregateManager:
         Get or create FinancialAggregate with default values.
         Uses upsert to atomically create if not exists.
         """
-        default_aggregate = {
-            "project_id": project_id,
-            "code_id": code_id,
-            "approved_budget": to_decimal128(Decimal('0')),
-            "committed_value": to_decimal128(Decimal('0')),
-            "certified_value": to_decimal128(Decimal('0')),
-            "paid_value": to_decimal128(Decimal('0')),
-            "retention_cumulative": to_decimal128(Decimal('0')),
-            "retention_held": to_decimal128(Decimal('0')),
-            "version": 1,
-            "last_reconciled_at": datetime.utcnow(),
-            "created_at": datetime.utcnow()
-        }
-        
         # Upsert with $setOnInsert for initial values
         result = await self.db[self.COLLECTION_AGGREGATE].find_one_and_update(
             {"project_id": project_id, "code_id": code_id},
             {
-                "$setOnInsert": default_aggregate
+                "$setOnInsert": self._default_aggregate(project_id, code_id, datetime.utcnow())
             },
             upsert=True,
             return_document=True,
@@ -367,6 +641,23 @@ class FinancialAggregateManager:
         
         return result
     
+    @staticmethod
+    def _default_aggregate(project_id: str, code_id: str, now: datetime) -> Dict[str, Any]:
+        """Initial FinancialAggregate fields (lock fields excluded)."""
+        return {
+            "project_id": project_id,
+            "code_id": code_id,
+            "approved_budget": to_decimal128(Decimal('0')),
+            "committed_value": to_decimal128(Decimal('0')),
+            "certified_value": to_decimal128(Decimal('0')),
+            "paid_value": to_decimal128(Decimal('0')),
+            "retention_cumulative": to_decimal128(Decimal('0')),
+            "retention_held": to_decimal128(Decimal('0')),
+            "version": 1,
+            "last_reconciled_at": now,
+            "created_at": now
+        }
+    
     async def lock_aggregate_for_update(
         self,
         project_id: str,
@@ -381,49 +672,48 @@ class FinancialAggregateManager:
         1. findOneAndUpdate with version check
         2. Increment a lock_sequence to detect concurrent modifications
         
+        Without expected_version this is a single upsert that also creates
+        the aggregate on first use. With expected_version, a miss is
+        disambiguated with one find_one.
+        
         Returns the locked document or raises LockAcquisitionError.
         """
+        now = datetime.utcnow()
         query = {"project_id": project_id, "code_id": code_id}
+        lock_update = {
+            "$inc": {"lock_sequence": 1},
+            "$set": {"locked_at": now}
+        }
         
         if expected_version is not None:
-            query["version"] = expected_version
+            result = await self.db[self.COLLECTION_AGGREGATE].find_one_and_update(
+                {**query, "version": expected_version},
+                lock_update,
+                return_document=True,
+                session=session
+            )
+            if result is not None:
+                return result
+            
+            existing = await self.db[self.COLLECTION_AGGREGATE].find_one(
+                query, {"_id": 1}, session=session
+            )
+            if existing is not None:
+                # Version mismatch - concurrent modification
+                raise LockAcquisitionError(project_id, code_id)
         
-        # Atomically increment lock_sequence to "claim" the lock
-        result = await self.db[self.COLLECTION_AGGREGATE].find_one_and_update(
+        # Atomically increment lock_sequence to "claim" the lock,
+        # creating the aggregate on first use
+        return await self.db[self.COLLECTION_AGGREGATE].find_one_and_update(
             query,
             {
-                "$inc": {"lock_sequence": 1},
-                "$set": {"locked_at": datetime.utcnow()}
+                **lock_update,
+                "$setOnInsert": self._default_aggregate(project_id, code_id, now)
             },
+            upsert=True,
             return_document=True,
             session=session
         )
-        
-        if result is None:
-            # Either doesn't exist or version mismatch
-            existing = await self.db[self.COLLECTION_AGGREGATE].find_one(
-                {"project_id": project_id, "code_id": code_id},
-                session=session
-            )
-            
-            if existing is None:
-                # Create new aggregate
-                result = await self.get_or_create_aggregate(project_id, code_id, session)
-                # Try locking again
-                result = await self.db[self.COLLECTION_AGGREGATE].find_one_and_update(
-                    {"project_id": project_id, "code_id": code_id},
-                    {
-                        "$inc": {"lock_sequence": 1},
-                        "$set": {"locked_at": datetime.utcnow()}
-                    },
-                    return_document=True,
-                    session=session
-                )
-            else:
-                # Version mismatch - concurrent modification
-                raise LockAcquisitionError(project_id, code_id)
-        
-        return result
     
     # =========================================================================
     # INVARIANT VALIDATION
@@ -432,7 +722,8 @@ class FinancialAggregateManager:
     def validate_financial_invariants(
         self,
         aggregate: Dict[str, Any],
-        delta: Dict[str, Decimal] = None
+        delta: Dict[str, Decimal] = None,
+        fields: Optional[Set[str]] = None
     ):
         """
         Validate financial invariants on aggregate (with optional delta applied).
@@ -442,58 +733,40 @@ class FinancialAggregateManager:
         - Certified_Value ≤ Approved_Budget
         - Paid_Value ≤ Certified_Value
         - Retention_Held ≥ 0
+        
+        Only invariants touching the changed fields (non-zero delta keys, or
+        `fields` when given) are checked; with neither, all of them are.
         """
-        # Get current values
-        approved_budget = to_decimal(aggregate.get("approved_budget", 0))
-        committed_value = to_decimal(aggregate.get("committed_value", 0))
-        certified_value = to_decimal(aggregate.get("certified_value", 0))
-        paid_value = to_decimal(aggregate.get("paid_value", 0))
-        retention_held = to_decimal(aggregate.get("retention_held", 0))
-        
-        # Apply delta if provided
-        if delta:
-            approved_budget += delta.get("approved_budget", Decimal('0'))
-            committed_value += delta.get("committed_value", Decimal('0'))
-            certified_value += delta.get("certified_value", Decimal('0'))
-            paid_value += delta.get("paid_value", Decimal('0'))
-            retention_held += delta.get("retention_held", Decimal('0'))
+        if fields is None and delta:
+            fields = {key for key, value in delta.items() if value}
+        invariants = (
+            FINANCIAL_INVARIANTS if fields is None
+            else invariants_for_fields(frozenset(fields))
+        )
         
+        # Compare in integer cents; Decimals are only built for violations
+        cents: Dict[Optional[str], int] = {None: 0}
         violations = []
         
-        # Invariant 1: Certified_Value ≤ Committed_Value
-        if certified_value > committed_value:
-            violations.append({
-                "rule": "CERTIFIED_LE_COMMITTED",
-                "message": f"Certified value ({certified_value}) cannot exceed committed value ({committed_value})",
-                "certified_value": float(certified_value),
-                "committed_value": float(committed_value)
-            })
-        
-        # Invariant 2: Certified_Value ≤ Approved_Budget
-        if certified_value > approved_budget:
-            violations.append({
-                "rule": "CERTIFIED_LE_BUDGET",
-                "message": f"Certified value ({certified_value}) cannot exceed approved budget ({approved_budget})",
-                "certified_value": float(certified_value),
-                "approved_budget": float(approved_budget)
-            })
-        
-        # Invariant 3: Paid_Value ≤ Certified_Value
-        if paid_value > certified_value:
-            violations.append({
-                "rule": "PAID_LE_CERTIFIED",
-                "message": f"Paid value ({paid_value}) cannot exceed certified value ({certified_value})",
-                "paid_value": float(paid_value),
-                "certified_value": float(certified_value)
-            })
-        
-        # Invariant 4: Retention_Held ≥ 0
-        if retention_held < Decimal('0'):
-            violations.append({
-                "rule": "RETENTION_NON_NEGATIVE",
-                "message": f"Retention held ({retention_held}) cannot be negative",
-                "retention_held": float(retention_held)
-            })
+        for rule, lower_field, upper_field, message in invariants:
+            for field in (lower_field, upper_field):
+                if field not in cents:
+                    value = to_cents(aggregate.get(field, 0))
+                    if delta:
+                        value += to_cents(delta.get(field, 0))
+                    cents[field] = value
+            
+            if cents[lower_field] > cents[upper_field]:
+                values = {
+                    field: from_cents(cents[field])
+                    for field in (lower_field, upper_field)
+                    if field is not None
+                }
+                violations.append({
+                    "rule": rule,
+                    "message": message.format(**values),
+                    **{field: float(value) for field, value in values.items()}
+                })
         
         if violations:
             raise FinancialValidationError(
@@ -546,6 +819,128 @@ class FinancialAggregateManager:
         
         return result
     
+    async def apply_deltas(
+        self,
+        project_id: str,
+        code_id: str,
+        deltas: Dict[str, Decimal],
+        current_version: int,
+        session=None
+    ) -> Dict[str, Any]:
+        """
+        Apply value deltas to the aggregate server-side and increment version.
+        
+        $inc on Decimal128 does the arithmetic in MongoDB, so only the
+        changed fields are sent and no totals are rebuilt client-side.
+        Uses version check for optimistic locking.
+        """
+        inc_updates = {
+            key: to_decimal128(value)
+            for key, value in deltas.items()
+            if value
+        }
+        inc_updates["version"] = 1
+        
+        result = await self.db[self.COLLECTION_AGGREGATE].find_one_and_update(
+            {
+                "project_id": project_id,
+                "code_id": code_id,
+                "version": current_version
+            },
+            {
+                "$inc": inc_updates,
+                "$set": {"last_reconciled_at": datetime.utcnow()}
+            },
+            return_document=True,
+            session=session
+        )
+        
+        if result is None:
+            raise LockAcquisitionError(project_id, code_id)
+        
+        return result
+    
+    @staticmethod
+    def _invariant_filter(deltas: Dict[str, Decimal]) -> Dict[str, Any]:
+        """
+        Build an $expr filter that only matches when the aggregate still
+        satisfies the invariants the deltas can affect.
+        """
+        zero = to_decimal128(Decimal('0'))
+        
+        def after(field: Optional[str]) -> Any:
+            if field is None:
+                return zero
+            return {"$add": [
+                {"$ifNull": [f"${field}", zero]},
+                to_decimal128(deltas.get(field, Decimal('0')))
+            ]}
+        
+        invariants = invariants_for_fields(
+            frozenset(key for key, value in deltas.items() if value)
+        )
+        if not invariants:
+            return {}
+        
+        return {"$expr": {"$and": [
+            {"$lte": [after(lower_field), after(upper_field)]}
+            for _, lower_field, upper_field, _ in invariants
+        ]}}
+    
+    async def apply_deltas_guarded(
+        self,
+        project_id: str,
+        code_id: str,
+        deltas: Dict[str, Decimal],
+        session=None
+    ) -> Dict[str, Any]:
+        """
+        Lock, validate and update the aggregate in one findOneAndUpdate.
+        
+        For deltas known before the transaction starts: the invariants are
+        enforced by the filter, so no prior lock read is needed. On a miss
+        the aggregate is re-read once to raise the same FinancialValidationError
+        as the slow path (creating the aggregate first if it doesn't exist).
+        """
+        query = {"project_id": project_id, "code_id": code_id}
+        inc_updates = {
+            key: to_decimal128(value)
+            for key, value in deltas.items()
+            if value
+        }
+        inc_updates["version"] = 1
+        inc_updates["lock_sequence"] = 1
+        
+        for _ in range(2):
+            now = datetime.utcnow()
+            result = await self.db[self.COLLECTION_AGGREGATE].find_one_and_update(
+                {**query, **self._invariant_filter(deltas)},
+                {
+                    "$inc": inc_updates,
+                    "$set": {"locked_at": now, "last_reconciled_at": now}
+                },
+                return_document=True,
+                session=session
+            )
+            if result is not None:
+                # Post-condition check against the returned document
+                self.validate_financial_invariants(
+                    result, fields={key for key, value in deltas.items() if value}
+                )
+                return result
+            
+            existing = await self.db[self.COLLECTION_AGGREGATE].find_one(query, session=session)
+            if existing is None:
+                await self.get_or_create_aggregate(project_id, code_id, session)
+                continue
+            
+            # Raises FinancialValidationError with the violation details
+            self.validate_financial_invariants(existing, deltas)
+            break
+        
+        # Filter missed but the re-read passes - concurrent modification
+        raise LockAcquisitionError(project_id, code_id)
+    
     # =========================================================================
     # ACCOUNTING PERIOD ENFORCEMENT (Phase 4B)
     # =========================================================================
@@ -559,9 +954,12 @@ class FinancialAggregateManager:
         Check if mutation_date falls inside a locked accounting period.
         Raises PeriodLockedError if locked.
         
+        Locked periods are read from an in-process cache refreshed every
+        PERIOD_CACHE_TTL_SECONDS, so the check costs no round trip.
+        
         Args:
             mutation_date: The date of the financial mutation
-            session: MongoDB session for transaction
+            session: Unused; kept for call-site compatibility
         
         Raises:
             PeriodLockedError: If mutation_date is in a locked period
@@ -573,14 +971,17 @@ class FinancialAggregateManager:
             check_date = datetime.combine(mutation_date, datetime.min.time())
         
         # Find any locked period that contains this date
-        locked_period = await self.db.accounting_periods.find_one(
-            {
-                "start_date": {"$lte": check_date},
-                "end_date": {"$gte": check_date},
-                "locked_flag": True
-            },
-            session=session
-        )
+        await self._refresh_period_cache()
+        locked_period = None
+        index = bisect_right(self._period_starts, check_date)
+        # Walk back over periods starting on/before check_date until none
+        # of the earlier ones can still reach it
+        for i in range(index - 1, -1, -1):
+            if self._period_max_ends[i] < check_date:
+                break
+            if self._period_cache[i]["end_date"] >= check_date:
+                locked_period = self._period_cache[i]
+                break
         
         if locked_period:
             logger.warning(
@@ -593,6 +994,38 @@ class FinancialAggregateManager:
                 period_end=locked_period["end_date"]
             )
     
+    async def _refresh_period_cache(self):
+        """Reload locked accounting periods if the cached copy has expired."""
+        if _utcnow() < self._period_cache_expires_at:
+            return
+        
+        async with self._period_cache_lock:
+            # Another coroutine may have refreshed while we waited
+            now = _utcnow()
+            if now < self._period_cache_expires_at:
+                return
+            
+            periods = await self.db.accounting_periods.find(
+                {"locked_flag": True},
+                {"_id": 0, "start_date": 1, "end_date": 1}
+            ).sort("start_date", 1).to_list(None)
+            
+            max_ends = []
+            max_end = None
+            for period in periods:
+                if max_end is None or period["end_date"] > max_end:
+                    max_end = period["end_date"]
+                max_ends.append(max_end)
+            
+            self._period_cache = periods
+            self._period_starts = [period["start_date"] for period in periods]
+            self._period_max_ends = max_ends
+            self._period_cache_expires_at = now + timedelta(seconds=self.PERIOD_CACHE_TTL_SECONDS)
+    
+    def invalidate_period_cache(self):
+        """Force the next period check to reload; call after locking/unlocking a period."""
+        self._period_cache_expires_at = datetime.min
+    
     # =========================================================================
     # PROJECTION UPDATE TRIGGER (Phase 6B)
     # =========================================================================
@@ -611,19 +1044,21 @@ class FinancialAggregateManager:
         
         Failures are logged but don't affect mutation result.
         """
+        operation = operation_type.value
+        
         try:
             # Store projection update record for async processing
             await self.db.projection_updates.insert_one({
                 "project_id": project_id,
                 "code_id": code_id,
-                "operation_type": operation_type.value,
+                "operation_type": operation,
                 "triggered_at": datetime.utcnow(),
                 "status": "pending"
             })
             
             logger.info(
                 f"[PROJECTION] Update triggered: project={project_id}, "
-                f"code={code_id}, operation={operation_type.value}"
+                f"code={code_id}, operation={operation}"
             )
             
             # Optionally: Inline projection refresh for critical paths
@@ -643,7 +1078,7 @@ class FinancialAggregateManager:
                         "type": "financial_summary",
                         "data": summary,
                         "updated_at": datetime.utcnow(),
-                        "triggered_by": operation_type.value
+                        "triggered_by": operation
                     }
                 },
                 upsert=True
@@ -672,6 +1107,48 @@ class FinancialAggregateManager:
     # TRANSACTIONAL MUTATION WRAPPER
     # =========================================================================
     
+    async def _run_mutation(
+        self,
+        mutation: Dict[str, Any],
+        aggregate: Dict[str, Any],
+        session
+    ) -> Dict[str, Decimal]:
+        """Run one mutation entry inside the transaction and return its delta."""
+        if "delta" in mutation:
+            if mutation.get("apply_fn"):
+                await mutation["apply_fn"](session)
+            return mutation["delta"]
+        return await mutation["mutation_fn"](aggregate, session)
+    
+    async def _lock_and_apply(
+        self,
+        project_id: str,
+        code_id: str,
+        mutations: List[Dict[str, Any]],
+        session
+    ) -> Dict[str, Any]:
+        """Slow path for mutations whose delta depends on the locked aggregate."""
+        # C) Lock aggregate row
+        aggregate = await self.lock_aggregate_for_update(
+            project_id, code_id, session=session
+        )
+        
+        current_version = aggregate.get("version", 1)
+        
+        # D) Execute mutation functions, summing their deltas
+        delta: Dict[str, Decimal] = {}
+        for mutation in mutations:
+            for key, change in (await self._run_mutation(mutation, aggregate, session)).items():
+                delta[key] = delta.get(key, Decimal('0')) + change
+        
+        # E) Validate invariants with delta
+        self.validate_financial_invariants(aggregate, delta)
+        
+        # F) Apply deltas to the aggregate (server-side $inc)
+        return await self.apply_deltas(
+            project_id, code_id, delta, current_version, session
+        )
+    
     async def execute_financial_mutation(
         self,
         operation_id: str,
@@ -689,7 +1166,7 @@ class FinancialAggregateManager:
         Execute a financial mutation with full determinism guarantees.
         
         Steps:
-        A) Check idempotency - skip if already applied
+        A) Claim operation_id - skip if already applied
         A.1) Check accounting period lock (Phase 4B)
         B) Start transaction
         C) Lock aggregate row
@@ -715,75 +1192,171 @@ class FinancialAggregateManager:
         Returns:
             Result dict with mutation outcome
         """
+        results = await self.execute_financial_mutations(
+            project_id,
+            code_id,
+            [{
+                "operation_id": operation_id,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "operation_type": operation_type,
+                "mutation_fn": mutation_fn,
+                "mutation_date": mutation_date,
+                "event_type": event_type,
+                "event_payload_fn": event_payload_fn,
+            }]
+        )
+        return results[0]
+    
+    async def execute_financial_mutation_fast(
+        self,
+        operation_id: str,
+        project_id: str,
+        code_id: str,
+        entity_type: EntityType,
+        entity_id: str,
+        operation_type: OperationType,
+        delta: Dict[str, Decimal],
+        apply_fn: Optional[Callable[[Any], Awaitable[Any]]] = None,
+        mutation_date: Optional[datetime] = None,
+        event_type: str = None,
+        event_payload_fn: Callable[[Dict[str, Any]], Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a financial mutation whose delta is known up front.
+        
+        Steps C-F collapse into apply_deltas_guarded: one findOneAndUpdate
+        that locks, checks invariants in its filter and applies the $inc.
+        apply_fn(session) then performs the entity writes in the same
+        transaction. Use execute_financial_mutation when the delta depends
+        on the locked aggregate.
+        """
+        results = await self.execute_financial_mutations(
+            project_id,
+            code_id,
+            [{
+                "operation_id": operation_id,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "operation_type": operation_type,
+                "delta": delta,
+                "apply_fn": apply_fn,
+                "mutation_date": mutation_date,
+                "event_type": event_type,
+                "event_payload_fn": event_payload_fn,
+            }]
+        )
+        return results[0]
+    
+    async def execute_financial_mutations(
+        self,
+        project_id: str,
+        code_id: str,
+        mutations: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute several mutations on one FinancialAggregate in a single transaction.
+        
+        Each entry carries the keyword arguments of execute_financial_mutation
+        or execute_financial_mutation_fast (minus project_id/code_id). When
+        every entry has a precomputed delta the fast path is taken. Steps are
+        the same, except that:
+        - the aggregate is locked once and every mutation_fn runs under it
+        - invariants are validated once, against the summed delta
+        - the aggregate is updated once and all mutation logs are recorded
+          with one bulk write
+        
+        The group is all-or-nothing: any failure rolls back every mutation
+        in it. Already-applied operations are skipped individually.
+        
+        Returns:
+            One result dict per mutation, in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(mutations)
+        claimed: List[int] = []
+        committed = False
+        
         async with await self.client.start_session() as session:
             try:
-                # A) Check idempotency BEFORE transaction
-                if await self.check_idempotency(operation_id, session):
-                    return {
-                        "status": "skipped",
-                        "reason": "idempotent_duplicate",
-                        "operation_id": operation_id
-                    }
+                # A) Claim operation_ids BEFORE transaction (check + lock in one write)
+                for index, mutation in enumerate(mutations):
+                    if await self.try_claim_operation(
+                        mutation["operation_id"],
+                        mutation["entity_type"],
+                        mutation["entity_id"],
+                        mutation["operation_type"],
+                        session
+                    ):
+                        claimed.append(index)
+                    else:
+                        results[index] = {
+                            "status": "skipped",
+                            "reason": "idempotent_duplicate",
+                            "operation_id": mutation["operation_id"]
+                        }
+                
+                if not claimed:
+                    return results
                 
                 # A.1) Phase 4B: Check accounting period lock
-                check_date = mutation_date or datetime.utcnow()
-                await self.check_accounting_period_lock(check_date, session)
+                now = datetime.utcnow()
+                check_dates = {mutations[index].get("mutation_date") or now for index in claimed}
+                for check_date in check_dates:
+                    await self.check_accounting_period_lock(check_date, session)
                 
                 async with session.start_transaction():
-                    # C) Lock aggregate row
-                    aggregate = await self.lock_aggregate_for_update(
-                        project_id, code_id, session=session
-                    )
-                    
-                    current_version = aggregate.get("version", 1)
-                    
-                    # D) Execute mutation function
-                    delta = await mutation_fn(aggregate, session)
-                    
-                    # E) Validate invariants with delta
-                    self.validate_financial_invariants(aggregate, delta)
-                    
-                    # F) Update aggregate with new values
-                    new_values = {}
-                    for key in ["approved_budget", "committed_value", "certified_value", 
-                               "paid_value", "retention_cumulative", "retention_held"]:
-                        current = to_decimal(aggregate.get(key, 0))
-                        change = delta.get(key, Decimal('0'))
-                        new_values[key] = current + change
-                    
-                    updated_aggregate = await self.update_aggregate(
-                        project_id, code_id, new_values, current_version, session
-                    )
+                    if all("delta" in mutations[index] for index in claimed):
+                        # C-F) Fast path: lock, validate and update in one write
+                        delta = {}
+                        for index in claimed:
+                            for key, change in mutations[index]["delta"].items():
+                                delta[key] = delta.get(key, Decimal('0')) + change
+                        updated_aggregate = await self.apply_deltas_guarded(
+                            project_id, code_id, delta, session
+                        )
+                        for index in claimed:
+                            await self._run_mutation(mutations[index], updated_aggregate, session)
+                    else:
+                        updated_aggregate = await self._lock_and_apply(
+                            project_id, code_id, [mutations[index] for index in claimed], session
+                        )
+                    new_version = updated_aggregate.get("version")
                     
-                    # G) Record mutation
-                    await self.record_mutation(
-                        operation_id, entity_type, entity_id, operation_type, session
+                    # G) Record mutations
+                    await self.record_mutations_bulk(
+                        [mutations[index] for index in claimed], session
                     )
                     
-                    # Queue domain event (payload captured now, dispatch AFTER commit)
-                    # Phase 5A: Event is queued with copied payload inside transaction,
+                    # Queue domain events (payload captured now, dispatch AFTER commit)
+                    # Phase 5A: Events are queued with copied payload inside transaction,
                     # but emit_pending() is called OUTSIDE transaction block below
-                    if event_type:
+                    for index in claimed:
+                        mutation = mutations[index]
+                        if not mutation.get("event_type"):
+                            continue
                         payload = {
-                            "operation_id": operation_id,
+                            "operation_id": mutation["operation_id"],
                             "project_id": project_id,
                             "code_id": code_id,
-                            "entity_type": entity_type.value,
-                            "entity_id": entity_id,
-                            "operation_type": operation_type.value,
-                            "new_version": updated_aggregate.get("version"),
+                            "entity_type": mutation["entity_type"].value,
+                            "entity_id": mutation["entity_id"],
+                            "operation_type": mutation["operation_type"].value,
+                            "new_version": new_version,
                         }
-                        if event_payload_fn:
-                            payload.update(event_payload_fn(updated_aggregate))
-                        domain_events.queue_event(event_type, payload)
+                        if mutation.get("event_payload_fn"):
+                            payload.update(mutation["event_payload_fn"](updated_aggregate))
+                        domain_events.queue_event(mutation["event_type"], payload)
                     
                     logger.info(
-                        f"[DETERMINISM] Mutation committed: {operation_type.value} "
-                        f"project={project_id}, code={code_id}, version={updated_aggregate.get('version')}"
+                        f"[DETERMINISM] Mutation committed: "
+                        f"{', '.join(mutations[index]['operation_type'].value for index in claimed)} "
+                        f"project={project_id}, code={code_id}, version={new_version}"
                     )
                     
                     # Transaction commits here (end of 'async with session.start_transaction()')
                 
+                committed = True
+                
                 # =========================================================
                 # Phase 5A: DOMAIN EVENT DISPATCH - OUTSIDE TRANSACTION
                 # =========================================================
@@ -800,27 +1373,43 @@ class FinancialAggregateManager:
                 # Trigger read model refresh for affected project after commit.
                 # This ensures projections reflect the latest committed state.
                 # Runs asynchronously - failures don't affect mutation result.
-                await self._trigger_projection_update(project_id, code_id, operation_type)
+                # One refresh covers the whole group.
+                await self._trigger_projection_update(
+                    project_id, code_id, mutations[claimed[-1]]["operation_type"]
+                )
                 
-                return {
-                    "status": "success",
-                    "operation_id": operation_id,
-                    "entity_id": entity_id,
-                    "new_version": updated_aggregate.get("version"),
-                    "aggregate": {
-                        "committed_value": float(to_decimal(updated_aggregate.get("committed_value", 0))),
-                        "certified_value": float(to_decimal(updated_aggregate.get("certified_value", 0))),
-                        "paid_value": float(to_decimal(updated_aggregate.get("paid_value", 0))),
-                        "retention_held": float(to_decimal(updated_aggregate.get("retention_held", 0))),
-                    }
+                aggregate_summary = {
+                    "committed_value": float(to_decimal(updated_aggregate.get("committed_value", 0))),
+                    "certified_value": float(to_decimal(updated_aggregate.get("certified_value", 0))),
+                    "paid_value": float(to_decimal(updated_aggregate.get("paid_value", 0))),
+                    "retention_held": float(to_decimal(updated_aggregate.get("retention_held", 0))),
                 }
+                for index in claimed:
+                    results[index] = {
+                        "status": "success",
+                        "operation_id": mutations[index]["operation_id"],
+                        "entity_id": mutations[index]["entity_id"],
+                        "new_version": new_version,
+                        "aggregate": dict(aggregate_summary)
+                    }
+                
+                return results
                 
             except IdempotentSkipError as e:
-                return {
-                    "status": "skipped",
-                    "reason": "idempotent_duplicate",
-                    "operation_id": e.operation_id
-                }
+                for index, mutation in enumerate(mutations):
+                    if mutation["operation_id"] == e.operation_id:
+                        results[index] = {
+                            "status": "skipped",
+                            "reason": "idempotent_duplicate",
+                            "operation_id": e.operation_id
+                        }
+                return results
+            except OperationInProgressError as e:
+                logger.warning(f"[IDEMPOTENT] Operation in progress: {e.operation_id}")
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Operation is already being processed. Please retry."
+                )
             except PeriodLockedError as e:
                 domain_events.clear_pending()
                 logger.error(f"[PERIOD_LOCK] Mutation blocked: {str(e)}")
@@ -852,6 +1441,11 @@ class FinancialAggregateManager:
                 domain_events.clear_pending()
                 logger.error(f"[DETERMINISM] Mutation error: {str(e)}")
                 raise
+            finally:
+                # The aborted transaction left the claims unapplied; free them
+                if not committed:
+                    for index in claimed:
+                        await self.release_operation_claim(mutations[index]["operation_id"])
 
 
 # =============================================================================
@@ -11,6 +11,9 @@ For each FinancialAggregate:
 5. Compare with stored aggregate values
 6. Log mismatches (NO auto-fix)
 
+Steps 1-4 run as a single server-side aggregation that groups each base
+table by (project_id, code_id), so base documents never reach Python.
+
 Usage:
     job = FinancialIntegrityJob(db)
     report = await job.run()
@@ -23,6 +26,8 @@ from bson import Decimal128
 from typing import Dict, Any, List, Optional
 import logging
 
+from core.financial_determinism import to_cents
+
 logger = logging.getLogger(__name__)
 
 
@@ -62,6 +67,19 @@ class FinancialIntegrityJob:
     
     # Tolerance for floating point comparison (0.01 = 1 cent)
     TOLERANCE = Decimal('0.01')
+    TOLERANCE_CENTS = 1
+    
+    # Reconciliation rows fetched per cursor batch
+    CURSOR_BATCH_SIZE = 1000
+    
+    # Per-key sums produced by the reconciliation pipeline
+    CALCULATED_FIELDS = (
+        "committed_value",
+        "certified_value",
+        "paid_value",
+        "retention_cumulative",
+        "retention_released",
+    )
     
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
@@ -83,11 +101,16 @@ class FinancialIntegrityJob:
         
         logger.info("[INTEGRITY_JOB] Starting financial integrity check...")
         
-        # Get all financial aggregates
-        cursor = self.db.financial_aggregates.find({})
+        # One pipeline groups every base table server-side and joins the
+        # sums onto their aggregates; only one row per aggregate is streamed
+        cursor = self.db.financial_aggregates.aggregate(
+            self._reconciliation_pipeline(),
+            allowDiskUse=True,
+            batchSize=self.CURSOR_BATCH_SIZE
+        )
         
-        async for aggregate in cursor:
-            await self._check_aggregate(aggregate)
+        async for row in cursor:
+            self._check_aggregate(row["aggregate"], self._calculated_values(row))
         
         end_time = datetime.utcnow()
         duration_ms = (end_time - start_time).total_seconds() * 1000
@@ -116,16 +139,17 @@ class FinancialIntegrityJob:
         
         return report
     
-    async def _check_aggregate(self, aggregate: Dict[str, Any]):
-        """Check a single aggregate against base tables."""
+    def _check_aggregate(
+        self,
+        aggregate: Dict[str, Any],
+        calculated: Dict[str, Decimal]
+    ):
+        """Check a single aggregate against its recalculated values."""
         self.checked_count += 1
         
         project_id = aggregate.get("project_id")
         code_id = aggregate.get("code_id")
         
-        # Recalculate from base tables
-        calculated = await self._recalculate_values(project_id, code_id)
-        
         # Compare with stored values
         discrepancies = self._compare_values(aggregate, calculated)
         
@@ -150,167 +174,89 @@ class FinancialIntegrityJob:
                     f"diff={d['difference']}"
                 )
     
-    async def _recalculate_values(
-        self,
-        project_id: str,
-        code_id: str
-    ) -> Dict[str, Decimal]:
+    @staticmethod
+    def _grouped_sums(
+        collection: str,
+        match: Dict[str, Any],
+        sums: Dict[str, str]
+    ) -> Dict[str, Any]:
         """
-        Recalculate aggregate values from base tables.
-        
-        Returns:
-            Dict with recalculated values
+        $unionWith stage summing `sums` ({output_field: source_field}) per
+        (project_id, code_id) over the matching rows of a base table.
         """
-        # Calculate committed_value from work_orders (Issued/Revised status)
-        committed_value = await self._sum_work_orders(project_id, code_id)
-        
-        # Calculate certified_value from payment_certificates (Certified+ status)
-        certified_value = await self._sum_certified_pcs(project_id, code_id)
-        
-        # Calculate paid_value from payments
-        paid_value = await self._sum_payments(project_id, code_id)
-        
-        # Calculate retention values from payment_certificates
-        retention_cumulative, retention_held = await self._sum_retention(project_id, code_id)
-        
-        return {
-            "committed_value": round_financial(committed_value),
-            "certified_value": round_financial(certified_value),
-            "paid_value": round_financial(paid_value),
-            "retention_cumulative": round_financial(retention_cumulative),
-            "retention_held": round_financial(retention_held)
-        }
-    
-    async def _sum_work_orders(self, project_id: str, code_id: str) -> Decimal:
-        """Sum base_amount from active work orders."""
-        pipeline = [
-            {
-                "$match": {
-                    "project_id": project_id,
-                    "code_id": code_id,
-                    "status": {"$in": ["Issued", "Revised"]}
-                }
-            },
-            {
-                "$group": {
-                    "_id": None,
-                    "total": {"$sum": "$base_amount"}
-                }
+        pipeline = []
+        if match:
+            pipeline.append({"$match": match})
+        pipeline.append({
+            "$group": {
+                "_id": {"project_id": "$project_id", "code_id": "$code_id"},
+                **{field: {"$sum": f"${source}"} for field, source in sums.items()}
             }
-        ]
-        
-        result = await self.db.work_orders.aggregate(pipeline).to_list(1)
-        
-        if result and result[0].get("total"):
-            return to_decimal(result[0]["total"])
-        return Decimal('0')
+        })
+        return {"$unionWith": {"coll": collection, "pipeline": pipeline}}
     
-    async def _sum_certified_pcs(self, project_id: str, code_id: str) -> Decimal:
-        """Sum current_bill_amount from certified payment certificates."""
-        pipeline = [
-            {
-                "$match": {
-                    "project_id": project_id,
-                    "code_id": code_id,
-                    "status": {"$in": ["Certified", "Partially Paid", "Fully Paid"]}
-                }
-            },
-            {
-                "$group": {
-                    "_id": None,
-                    "total": {"$sum": "$current_bill_amount"}
-                }
-            }
-        ]
+    def _reconciliation_pipeline(self) -> List[Dict[str, Any]]:
+        """
+        Build the aggregation run on financial_aggregates.
         
-        result = await self.db.payment_certificates.aggregate(pipeline).to_list(1)
+        Each aggregate is re-keyed by (project_id, code_id), the grouped
+        base-table sums are unioned in, and a final $group folds them into
+        one row per key. Keys without an aggregate are dropped.
+        """
+        certified_statuses = ["Certified", "Partially Paid", "Fully Paid"]
         
-        if result and result[0].get("total"):
-            return to_decimal(result[0]["total"])
-        return Decimal('0')
-    
-    async def _sum_payments(self, project_id: str, code_id: str) -> Decimal:
-        """Sum payment_amount from payments."""
-        pipeline = [
+        return [
             {
-                "$match": {
-                    "project_id": project_id,
-                    "code_id": code_id
+                "$project": {
+                    "_id": {"project_id": "$project_id", "code_id": "$code_id"},
+                    "aggregate": "$$ROOT"
                 }
             },
+            # Calculate committed_value from work_orders (Issued/Revised status)
+            self._grouped_sums(
+                "work_orders",
+                {"status": {"$in": ["Issued", "Revised"]}},
+                {"committed_value": "base_amount"}
+            ),
+            # Calculate certified_value and retention from payment_certificates (Certified+ status)
+            self._grouped_sums(
+                "payment_certificates",
+                {"status": {"$in": certified_statuses}},
+                {"certified_value": "current_bill_amount", "retention_cumulative": "retention_current"}
+            ),
+            # Calculate paid_value from payments
+            self._grouped_sums("payments", {}, {"paid_value": "payment_amount"}),
+            # Sum retention releases
+            self._grouped_sums("retention_releases", {}, {"retention_released": "release_amount"}),
             {
                 "$group": {
-                    "_id": None,
-                    "total": {"$sum": "$payment_amount"}
+                    "_id": "$_id",
+                    "aggregate": {"$max": "$aggregate"},
+                    **{
+                        field: {"$sum": f"${field}"}
+                        for field in self.CALCULATED_FIELDS
+                    }
                 }
-            }
+            },
+            {"$match": {"aggregate": {"$ne": None}}}
         ]
-        
-        result = await self.db.payments.aggregate(pipeline).to_list(1)
-        
-        if result and result[0].get("total"):
-            return to_decimal(result[0]["total"])
-        return Decimal('0')
     
-    async def _sum_retention(
-        self,
-        project_id: str,
-        code_id: str
-    ) -> tuple[Decimal, Decimal]:
+    def _calculated_values(self, row: Dict[str, Any]) -> Dict[str, Decimal]:
         """
-        Calculate retention values.
+        Turn a reconciliation row into recalculated aggregate values.
         
-        Returns:
-            (retention_cumulative, retention_held)
-            - retention_cumulative: Total retention deducted from all PCs
-            - retention_held: Cumulative minus any releases
+        retention_held is retention_cumulative minus any releases.
         """
-        # Sum retention from certified PCs
-        pipeline = [
-            {
-                "$match": {
-                    "project_id": project_id,
-                    "code_id": code_id,
-                    "status": {"$in": ["Certified", "Partially Paid", "Fully Paid"]}
-                }
-            },
-            {
-                "$group": {
-                    "_id": None,
-                    "total": {"$sum": "$retention_current"}
-                }
-            }
-        ]
-        
-        result = await self.db.payment_certificates.aggregate(pipeline).to_list(1)
-        retention_cumulative = Decimal('0')
-        if result and result[0].get("total"):
-            retention_cumulative = to_decimal(result[0]["total"])
-        
-        # Sum retention releases
-        release_pipeline = [
-            {
-                "$match": {
-                    "project_id": project_id,
-                    "code_id": code_id
-                }
-            },
-            {
-                "$group": {
-                    "_id": None,
-                    "total": {"$sum": "$release_amount"}
-                }
-            }
-        ]
-        
-        release_result = await self.db.retention_releases.aggregate(release_pipeline).to_list(1)
-        total_released = Decimal('0')
-        if release_result and release_result[0].get("total"):
-            total_released = to_decimal(release_result[0]["total"])
+        retention_cumulative = to_decimal(row.get("retention_cumulative"))
+        retention_held = retention_cumulative - to_decimal(row.get("retention_released"))
         
-        retention_held = retention_cumulative - total_released
-        
-        return retention_cumulative, retention_held
+        return {
+            "committed_value": round_financial(to_decimal(row.get("committed_value"))),
+            "certified_value": round_financial(to_decimal(row.get("certified_value"))),
+            "paid_value": round_financial(to_decimal(row.get("paid_value"))),
+            "retention_cumulative": round_financial(retention_cumulative),
+            "retention_held": round_financial(retention_held)
+        }
     
     def _compare_values(
         self,
@@ -334,17 +280,18 @@ class FinancialIntegrityJob:
         ]
         
         for field in fields_to_check:
-            stored = round_financial(to_decimal(aggregate.get(field, 0)))
-            calc = calculated.get(field, Decimal('0'))
-            
-            diff = abs(stored - calc)
+            # Compare in integer cents; Decimals are only built for mismatches
+            stored_cents = to_cents(aggregate.get(field, 0))
+            calc_cents = to_cents(calculated.get(field, 0))
             
-            if diff > self.TOLERANCE:
+            if abs(stored_cents - calc_cents) > self.TOLERANCE_CENTS:
+                stored = round_financial(to_decimal(aggregate.get(field, 0)))
+                calc = calculated.get(field, Decimal('0'))
                 discrepancies.append({
                     "field": field,
                     "stored": float(stored),
                     "calculated": float(calc),
-                    "difference": float(diff)
+                    "difference": float(abs(stored - calc))
                 })
         
         return discrepancies
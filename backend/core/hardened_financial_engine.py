@@ -20,9 +20,12 @@ from decimal import Decimal
 from datetime import datetime
 from bson import ObjectId, Decimal128
 from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError
 from typing import Optional, Dict, Any, List, Union
 import logging
 import asyncio
+import os
+from contextlib import asynccontextmanager
 
 from core.financial_precision import (
     to_decimal, round_financial, to_float,
@@ -75,12 +78,18 @@ class HardenedFinancialEngine:
     - Policy enforcement via PolicyService (Phase 4D)
     """
     
+    # Sequence numbers reserved per round trip (see AtomicDocumentNumbering);
+    # 1 keeps document numbering gap-free
+    DOCUMENT_NUMBER_RESERVATION_SIZE = int(os.environ.get("DOCUMENT_NUMBER_RESERVATION_SIZE", "1"))
+    
     def __init__(self, client: AsyncIOMotorClient, db: AsyncIOMotorDatabase):
         self.client = client
         self.db = db
         self.invariant_validator = FinancialInvariantValidator(db)
         self.duplicate_protection = DuplicateInvoiceProtection(db)
-        self.document_numbering = AtomicDocumentNumbering(db)
+        self.document_numbering = AtomicDocumentNumbering(
+            db, reservation_size=self.DOCUMENT_NUMBER_RESERVATION_SIZE
+        )
         self.policy = PolicyService(db)  # Phase 4D: Policy Service
         
         # Phase 3B: Initialize state machines
@@ -100,6 +109,24 @@ class HardenedFinancialEngine:
             )
         return self._state_machines
     
+    @asynccontextmanager
+    async def _session_scope(self, session=None):
+        """Yield the caller's session if given, else a fresh one we own."""
+        if session is not None:
+            yield session
+            return
+        async with await self.client.start_session() as own_session:
+            yield own_session
+    
+    @asynccontextmanager
+    async def _transaction_scope(self, session):
+        """Start a transaction unless the session is already inside one."""
+        if session.in_transaction:
+            yield
+            return
+        async with session.start_transaction():
+            yield
+    
     # =========================================================================
     # SECTION 1: DECIMAL PRECISION RECALCULATION ENGINE
     # =========================================================================
@@ -246,7 +273,8 @@ class HardenedFinancialEngine:
         self,
         wo_id: str,
         organisation_id: str,
-        user_id: str
+        user_id: str,
+        session=None
     ) -> Dict[str, Any]:
         """
         Issue a Work Order (transition from Draft to Issued).
@@ -258,8 +286,8 @@ class HardenedFinancialEngine:
         """
         from core.state_machine import InvalidTransitionError, GuardConditionError, TransitionHandlerError
         
-        async with await self.client.start_session() as session:
-            async with session.start_transaction():
+        async with self._session_scope(session) as session:
+            async with self._transaction_scope(session):
                 try:
                     # Get the work order
                     wo = await self.db.work_orders.find_one(
@@ -365,7 +393,8 @@ class HardenedFinancialEngine:
         user_id: str,
         rate: Optional[float] = None,
         quantity: Optional[float] = None,
-        retention_percentage: Optional[float] = None
+        retention_percentage: Optional[float] = None,
+        session=None
     ) -> Dict[str, Any]:
         """
         Revise a Work Order (transition from Issued to Revised).
@@ -377,8 +406,8 @@ class HardenedFinancialEngine:
         """
         from core.state_machine import InvalidTransitionError, GuardConditionError, TransitionHandlerError
         
-        async with await self.client.start_session() as session:
-            async with session.start_transaction():
+        async with self._session_scope(session) as session:
+            async with self._transaction_scope(session):
                 try:
                     wo = await self.db.work_orders.find_one(
                         {"_id": ObjectId(wo_id)},
@@ -484,7 +513,8 @@ class HardenedFinancialEngine:
         pc_id: str,
         organisation_id: str,
         user_id: str,
-        invoice_number: Optional[str] = None
+        invoice_number: Optional[str] = None,
+        session=None
     ) -> Dict[str, Any]:
         """
         Certify a Payment Certificate (transition from Draft to Certified).
@@ -497,8 +527,8 @@ class HardenedFinancialEngine:
         """
         from core.state_machine import InvalidTransitionError, GuardConditionError, TransitionHandlerError
         
-        async with await self.client.start_session() as session:
-            async with session.start_transaction():
+        async with self._session_scope(session) as session:
+            async with self._transaction_scope(session):
                 try:
                     pc = await self.db.payment_certificates.find_one(
                         {"_id": ObjectId(pc_id)},
@@ -544,11 +574,23 @@ class HardenedFinancialEngine:
                     
                     # Update invoice number if provided (state machine handles rest)
                     if invoice_number:
-                        await self.db.payment_certificates.update_one(
-                            {"_id": ObjectId(pc_id)},
-                            {"$set": {"invoice_number": invoice_number}},
-                            session=session
-                        )
+                        try:
+                            await self.db.payment_certificates.update_one(
+                                {"_id": ObjectId(pc_id)},
+                                {"$set": {"invoice_number": invoice_number}},
+                                session=session
+                            )
+                        except DuplicateKeyError:
+                            # unique_certified_invoice caught a concurrent
+                            # certification that slipped past the pre-check
+                            logger.warning(
+                                f"[DUPLICATE INVOICE] Vendor={pc['vendor_id']}, "
+                                f"Project={pc['project_id']}, Invoice={invoice_number}"
+                            )
+                            raise HTTPException(
+                                status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Duplicate invoice detected: {invoice_number}"
+                            )
                     
                     # Log audit
                     handler_result = result.get("handler_result", {})
@@ -619,7 +661,8 @@ class HardenedFinancialEngine:
         organisation_id: str,
         user_id: str,
         current_bill_amount: Optional[float] = None,
-        retention_percentage: Optional[float] = None
+        retention_percentage: Optional[float] = None,
+        session=None
     ) -> Dict[str, Any]:
         """
         Revise a Payment Certificate.
@@ -628,8 +671,8 @@ class HardenedFinancialEngine:
         SECTION 1: Uses Decimal precision.
         SECTION 3: Validates invariants before commit.
         """
-        async with await self.client.start_session() as session:
-            async with session.start_transaction():
+        async with self._session_scope(session) as session:
+            async with self._transaction_scope(session):
                 try:
                     pc = await self.db.payment_certificates.find_one(
                         {"_id": ObjectId(pc_id)},
@@ -766,7 +809,8 @@ class HardenedFinancialEngine:
         user_id: str,
         payment_amount: float,
         payment_date: datetime,
-        payment_reference: str
+        payment_reference: str,
+        session=None
     ) -> Dict[str, Any]:
         """
         Record a payment against a Payment Certificate.
@@ -778,8 +822,8 @@ class HardenedFinancialEngine:
         """
         from core.state_machine import InvalidTransitionError, GuardConditionError, TransitionHandlerError
         
-        async with await self.client.start_session() as session:
-            async with session.start_transaction():
+        async with self._session_scope(session) as session:
+            async with self._transaction_scope(session):
                 try:
                     pc = await self.db.payment_certificates.find_one(
                         {"_id": ObjectId(pc_id)},
@@ -940,7 +984,8 @@ class HardenedFinancialEngine:
         vendor_id: str,
         user_id: str,
         release_amount: float,
-        release_date: datetime
+        release_date: datetime,
+        session=None
     ) -> Dict[str, Any]:
         """
         Release retained amount.
@@ -949,8 +994,8 @@ class HardenedFinancialEngine:
         SECTION 1: Uses Decimal precision.
         SECTION 3: Validates retention_held >= 0 after release.
         """
-        async with await self.client.start_session() as session:
-            async with session.start_transaction():
+        async with self._session_scope(session) as session:
+            async with self._transaction_scope(session):
                 try:
                     # Validate positive amount
                     try:
@@ -1359,10 +1404,11 @@ class HardenedFinancialEngine:
     
     async def create_indexes(self):
         """Create all required indexes for data integrity"""
-        # Duplicate invoice protection index
-        await self.duplicate_protection.create_unique_constraint_index()
-        
-        # Document number unique indexes
-        await self.document_numbering.create_unique_constraints()
+        await asyncio.gather(
+            # Duplicate invoice protection index
+            self.duplicate_protection.create_unique_constraint_index(),
+            # Document number unique indexes
+            self.document_numbering.create_unique_constraints()
+        )
         
         logger.info("All hardening indexes created")
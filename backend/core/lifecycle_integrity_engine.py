@@ -16,6 +16,7 @@ from datetime import datetime, date
 from typing import Optional, Dict, Any, List
 from bson import ObjectId, Decimal128
 from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError
 import copy
 import json
 import logging
@@ -199,6 +200,9 @@ class LifecycleIntegrityEngine:
     def __init__(self, client: AsyncIOMotorClient, db: AsyncIOMotorDatabase):
         self.client = client
         self.db = db
+        # Set once unique_daily_attendance is confirmed; until then
+        # create_attendance keeps its read-before-insert duplicate check
+        self._attendance_index_ready = False
     
     # =========================================================================
     # SECTION 1: VERSION TABLES
@@ -522,19 +526,6 @@ class LifecycleIntegrityEngine:
         
         date_str = attendance_date.isoformat()
         
-        # Check for duplicate
-        existing = await self.db.attendance.find_one(
-            {
-                "supervisor_id": supervisor_id,
-                "project_id": project_id,
-                "attendance_date": date_str
-            },
-            session=session
-        )
-        
-        if existing:
-            raise DuplicateAttendanceError(supervisor_id, project_id, date_str)
-        
         attendance_doc = {
             "supervisor_id": supervisor_id,
             "project_id": project_id,
@@ -545,7 +536,27 @@ class LifecycleIntegrityEngine:
             "created_at": datetime.utcnow()
         }
         
-        result = await self.db.attendance.insert_one(attendance_doc, session=session)
+        # unique_daily_attendance rejects the duplicate atomically, so no
+        # read-before-insert (which would also race with a concurrent mark)
+        # once the index is known to exist
+        if not self._attendance_index_ready:
+            existing = await self.db.attendance.find_one(
+                {
+                    "supervisor_id": supervisor_id,
+                    "project_id": project_id,
+                    "attendance_date": date_str
+                },
+                {"_id": 1},
+                session=session
+            )
+            
+            if existing:
+                raise DuplicateAttendanceError(supervisor_id, project_id, date_str)
+        
+        try:
+            result = await self.db.attendance.insert_one(attendance_doc, session=session)
+        except DuplicateKeyError:
+            raise DuplicateAttendanceError(supervisor_id, project_id, date_str)
         attendance_id = str(result.inserted_id)
         
         # Audit log
@@ -884,6 +895,7 @@ class LifecycleIntegrityEngine:
                 unique=True,
                 name="unique_daily_attendance"
             )
+            self._attendance_index_ready = True
             logger.info("Created: unique_daily_attendance index")
         except Exception as e:
             logger.warning(f"Attendance index: {e}")
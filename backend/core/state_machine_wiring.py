@@ -84,7 +84,8 @@ def create_work_order_state_machine(
         doc_number, sequence = await document_numbering.generate_document_number(
             organisation_id=organisation_id,
             prefix=entity.get("prefix", "WO"),
-            session=session
+            session=session,
+            collection="work_orders"
         )
         
         # Update document
@@ -306,7 +307,8 @@ def create_payment_certificate_state_machine(
         doc_number, sequence = await document_numbering.generate_document_number(
             organisation_id=organisation_id,
             prefix="PC",
-            session=session
+            session=session,
+            collection="payment_certificates"
         )
         
         # Update document
@@ -26,6 +26,7 @@ They EXTEND existing functionality with hardening.
 
 from fastapi import APIRouter, HTTPException, status, Depends
 from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import ValidationError
 from bson import ObjectId, Decimal128
 from datetime import datetime, date
 from typing import Optional, List, Dict, Any
@@ -41,7 +42,9 @@ from permissions import PermissionChecker
 from phase2_models import (
     WorkOrderCreate, WorkOrderIssue, WorkOrderRevise,
     PaymentCertificateCreate, PaymentCertificateCertify, PaymentCertificateRevise,
-    PaymentCreate, RetentionReleaseCreate, VendorCreate, BudgetUpdate
+    PaymentCreate, RetentionReleaseCreate, VendorCreate, BudgetUpdate,
+    BulkMutationRequest, BulkWorkOrderIssue, BulkWorkOrderRevise,
+    BulkPaymentCertificateCertify, BulkPaymentCertificateRevise, BulkBudgetUpdate
 )
 from core.hardened_financial_engine import HardenedFinancialEngine
 from core.deterministic_service import DeterministicFinancialService
@@ -1089,6 +1092,92 @@ async def modify_budget(
     return result
 
 
+# ============================================
+# BULK FINANCIAL MUTATIONS
+# ============================================
+
+# Params model per bulk operation, matching the corresponding single route
+BULK_OPERATION_MODELS = {
+    "issue_work_order": BulkWorkOrderIssue,
+    "revise_work_order": BulkWorkOrderRevise,
+    "certify_payment_certificate": BulkPaymentCertificateCertify,
+    "revise_payment_certificate": BulkPaymentCertificateRevise,
+    "create_payment": PaymentCreate,
+    "create_retention_release": RetentionReleaseCreate,
+    "update_budget": BulkBudgetUpdate,
+}
+
+
+@hardened_router.post("/financial-mutations/bulk")
+async def bulk_financial_mutations(
+    bulk_data: BulkMutationRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Apply a batch of financial mutations.
+    
+    Operations on the same FinancialAggregate commit together in one
+    transaction; distinct aggregates run concurrently.
+    Returns one result per operation, in submission order.
+    
+    Each operation's params are validated with the request model of the
+    matching single route; update_budget takes budget_id like
+    PUT /budgets/{budget_id}/modify.
+    
+    DETERMINISM: Each operation accepts operation_id for idempotency.
+    """
+    user = await permission_checker.get_authenticated_user(current_user)
+    await permission_checker.check_admin_role(user)
+    
+    operations = []
+    for index, op in enumerate(bulk_data.operations):
+        model = BULK_OPERATION_MODELS.get(op.operation)
+        if model is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported bulk operation: {op.operation}"
+            )
+        try:
+            params = model(**op.params).dict()
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"operations[{index}] ({op.operation}): {e}"
+            )
+        # Acting user always comes from the token, never the payload
+        params["organisation_id"] = user["organisation_id"]
+        params["user_id"] = user["user_id"]
+        operations.append({"operation": op.operation, "params": params})
+    
+    # Budget updates address an existing budget, as the single route does
+    budget_ids = {
+        op["params"]["budget_id"] for op in operations
+        if op["operation"] == "update_budget"
+    }
+    if budget_ids:
+        budgets = {}
+        valid_ids = [ObjectId(budget_id) for budget_id in budget_ids if ObjectId.is_valid(budget_id)]
+        async for budget in db.project_budgets.find(
+            {"_id": {"$in": valid_ids}}, {"project_id": 1, "code_id": 1}
+        ):
+            budgets[str(budget["_id"])] = budget
+        
+        missing = sorted(budget_ids - budgets.keys())
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Budget not found: {', '.join(missing)}"
+            )
+        
+        for op in operations:
+            if op["operation"] == "update_budget":
+                budget = budgets[op["params"].pop("budget_id")]
+                op["params"]["project_id"] = budget["project_id"]
+                op["params"]["code_id"] = budget.get("code_id", "DEFAULT")
+    
+    return await deterministic_service.bulk_mutate(operations)
+
+
 # ============================================
 # FINANCIAL AGGREGATE ENDPOINTS (NEW)
 # ============================================
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from bson import ObjectId
 
@@ -231,3 +231,29 @@ class DocumentSequence(BaseModel):
 class BudgetUpdate(BaseModel):
     operation_id: Optional[str] = None  # UUID for idempotency - auto-generated if not provided
     approved_budget_amount: float
+
+# ============================================
+# BULK MUTATION MODELS (grouped per FinancialAggregate)
+# ============================================
+class BulkMutationOperation(BaseModel):
+    operation: str  # DeterministicFinancialService method, e.g. "create_payment"
+    params: Dict[str, Any] = Field(default_factory=dict)  # Validated against the operation's params model
+
+# Bulk params: the single route's body plus the ids it takes from its path
+class BulkWorkOrderIssue(WorkOrderIssue):
+    wo_id: str
+
+class BulkWorkOrderRevise(WorkOrderRevise):
+    wo_id: str
+
+class BulkPaymentCertificateCertify(PaymentCertificateCertify):
+    pc_id: str
+
+class BulkPaymentCertificateRevise(PaymentCertificateRevise):
+    pc_id: str
+
+class BulkBudgetUpdate(BudgetUpdate):
+    budget_id: str
+
+class BulkMutationRequest(BaseModel):
+    operations: List[BulkMutationOperation]
@@ -23,6 +23,7 @@ import sys
 sys.path.append(str(Path(__file__).parent))
 
 from auth import hash_password
+from audit_service import AuditService
 
 # Load environment
 ROOT_DIR = Path(__file__).parent
@@ -97,7 +98,7 @@ async def seed_database():
             print("   ⚠️  Admin user already exists. Skipping...")
             admin_id = str(existing_admin["_id"])
         else:
-            hashed_pw = hash_password(admin_password)
+            hashed_pw = await hash_password(admin_password)
             
             admin_data = {
                 "organisation_id": organisation_id,
@@ -158,7 +159,7 @@ async def seed_database():
         if existing_supervisor:
             print("   ⚠️  Supervisor user already exists. Skipping...")
         else:
-            hashed_pw = hash_password(supervisor_password)
+            hashed_pw = await hash_password(supervisor_password)
             
             supervisor_data = {
                 "organisation_id": organisation_id,
@@ -269,7 +270,7 @@ async def seed_database():
         
         # Audit logs indexes
         await db.audit_logs.create_index([("organisation_id", 1), ("timestamp", -1)])
-        await db.audit_logs.create_index([("entity_type", 1), ("entity_id", 1)])
+        await AuditService(db).create_indexes()
         
         print("   ✅ Indexes created")
         
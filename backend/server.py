@@ -3,6 +3,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 from bson import ObjectId, Decimal128
 import os
 import logging
@@ -27,7 +28,8 @@ from models import (
 )
 from auth import (
     hash_password, verify_password, create_access_token, create_refresh_token,
-    decode_refresh_token, get_current_user
+    decode_refresh_token, get_current_user,
+    set_token_version_loader, set_cached_token_version
 )
 from audit_service import AuditService
 from financial_service import FinancialRecalculationService
@@ -126,7 +128,7 @@ async def register_user(user_data: UserCreate):
     role = "Admin" if user_count == 0 else user_data.role
     
     # Hash password
-    hashed_pw = hash_password(user_data.password)
+    hashed_pw = await hash_password(user_data.password)
     
     # Create user
     user_dict = {
@@ -145,7 +147,7 @@ async def register_user(user_data: UserCreate):
     user_id = str(result.inserted_id)
     
     # Audit log
-    await audit_service.log_action(
+    audit_service.log_action_background(
         organisation_id=organisation_id,
         module_name="USER_MANAGEMENT",
         entity_type="USER",
@@ -179,7 +181,7 @@ async def login(login_data: LoginRequest):
         )
     
     # Verify password
-    if not verify_password(login_data.password, user["hashed_password"]):
+    if not await verify_password(login_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -198,7 +200,8 @@ async def login(login_data: LoginRequest):
         "user_id": user_id,
         "email": user["email"],
         "role": user["role"],
-        "organisation_id": user["organisation_id"]
+        "organisation_id": user["organisation_id"],
+        "ver": user.get("sso_jwt_version", 0)
     }
     
     access_token = create_access_token(data=token_data)
@@ -211,7 +214,7 @@ async def login(login_data: LoginRequest):
     refresh_token_doc = {
         "jti": refresh_payload["jti"],
         "user_id": user_id,
-        "token_hash": hash_password(refresh_token),  # Store hashed
+        "token_hash": await hash_password(refresh_token),  # Store hashed
         "expires_at": datetime.utcfromtimestamp(refresh_payload["exp"]),
         "is_revoked": False,
         "created_at": datetime.utcnow()
@@ -288,7 +291,8 @@ async def refresh_access_token(request: RefreshTokenRequest):
             "user_id": user_id,
             "email": user["email"],
             "role": user["role"],
-            "organisation_id": user["organisation_id"]
+            "organisation_id": user["organisation_id"],
+            "ver": user.get("sso_jwt_version", 0)
         }
         
         new_access_token = create_access_token(data=token_data)
@@ -300,7 +304,7 @@ async def refresh_access_token(request: RefreshTokenRequest):
         new_refresh_token_doc = {
             "jti": new_refresh_payload["jti"],
             "user_id": user_id,
-            "token_hash": hash_password(new_refresh_token),
+            "token_hash": await hash_password(new_refresh_token),
             "expires_at": datetime.utcfromtimestamp(new_refresh_payload["exp"]),
             "is_revoked": False,
             "created_at": datetime.utcnow()
@@ -338,6 +342,51 @@ async def refresh_access_token(request: RefreshTokenRequest):
         )
 
 
+@api_router.post("/auth/logout-all")
+async def logout_all_devices(current_user: dict = Depends(get_current_user)):
+    """
+    Revoke every session of the current user.
+    
+    Bumps the user's sso_jwt_version so all previously issued access tokens
+    fail validation, and revokes all outstanding refresh tokens.
+    """
+    user_id = current_user["user_id"]
+    
+    user = await db.users.find_one_and_update(
+        {"_id": ObjectId(user_id)},
+        {"$inc": {"sso_jwt_version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        projection={"sso_jwt_version": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    
+    set_cached_token_version(user_id, user["sso_jwt_version"])
+    
+    await db.refresh_tokens.update_many(
+        {"user_id": user_id, "is_revoked": False},
+        {"$set": {"is_revoked": True}}
+    )
+    
+    return {"status": "success", "message": "All sessions revoked"}
+
+
+async def load_token_version(user_id: str) -> Optional[int]:
+    """Read a user's current sso_jwt_version for access token revocation checks"""
+    try:
+        user = await db.users.find_one({"_id": ObjectId(user_id)}, {"sso_jwt_version": 1})
+    except Exception:
+        return None
+    if not user:
+        return None
+    return user.get("sso_jwt_version", 0)
+
+set_token_version_loader(load_token_version)
+
+
 # ============================================
 # USER MANAGEMENT ENDPOINTS
 # ============================================
@@ -444,7 +493,7 @@ async def update_user(
     )
     
     # Audit log
-    await audit_service.log_action(
+    audit_service.log_action_background(
         organisation_id=user["organisation_id"],
         module_name="USER_MANAGEMENT",
         entity_type="USER",
@@ -525,7 +574,7 @@ async def create_project(
     project_id = str(result.inserted_id)
     
     # Audit log
-    await audit_service.log_action(
+    audit_service.log_action_background(
         organisation_id=user["organisation_id"],
         module_name="PROJECT_MANAGEMENT",
         entity_type="PROJECT",
@@ -608,6 +657,12 @@ async def get_project(
             detail="Project not found"
         )
     
+    # Opening a project predicts WO/PC issue: reserve document numbers ahead
+    # (no-op unless DOCUMENT_NUMBER_RESERVATION_SIZE > 1)
+    deterministic_service.hardened_engine.document_numbering.schedule_prewarm(
+        user["organisation_id"]
+    )
+    
     project["project_id"] = str(project.pop("_id"))
     return project
 
@@ -643,7 +698,7 @@ async def update_project(
     )
     
     # Audit log
-    await audit_service.log_action(
+    audit_service.log_action_background(
         organisation_id=user["organisation_id"],
         module_name="PROJECT_MANAGEMENT",
         entity_type="PROJECT",
@@ -696,7 +751,7 @@ async def create_code(
     code_id = str(result.inserted_id)
     
     # Audit log
-    await audit_service.log_action(
+    audit_service.log_action_background(
         organisation_id=user["organisation_id"],
         module_name="CODE_MASTER",
         entity_type="CODE",
@@ -794,7 +849,7 @@ async def update_code(
     )
     
     # Audit log
-    await audit_service.log_action(
+    audit_service.log_action_background(
         organisation_id=user["organisation_id"],
         module_name="CODE_MASTER",
         entity_type="CODE",
@@ -836,7 +891,7 @@ async def delete_code(
     await db.code_master.delete_one({"_id": code_id})
     
     # Audit log
-    await audit_service.log_action(
+    audit_service.log_action_background(
         organisation_id=user["organisation_id"],
         module_name="CODE_MASTER",
         entity_type="CODE",
@@ -909,7 +964,7 @@ async def create_budget(
     )
     
     # Audit log (after transaction commit)
-    await audit_service.log_action(
+    audit_service.log_action_background(
         organisation_id=user["organisation_id"],
         module_name="BUDGET_MANAGEMENT",
         entity_type="BUDGET",
@@ -1073,7 +1128,7 @@ async def create_mapping(
     map_id = str(result.inserted_id)
     
     # Audit log
-    await audit_service.log_action(
+    audit_service.log_action_background(
         organisation_id=user["organisation_id"],
         module_name="ACCESS_CONTROL",
         entity_type="USER_PROJECT_MAP",
@@ -1134,7 +1189,7 @@ async def delete_mapping(
     await db.user_project_map.delete_one({"_id": ObjectId(map_id)})
     
     # Audit log
-    await audit_service.log_action(
+    audit_service.log_action_background(
         organisation_id=user["organisation_id"],
         module_name="ACCESS_CONTROL",
         entity_type="USER_PROJECT_MAP",
@@ -1157,9 +1212,10 @@ async def get_audit_logs(
     entity_id: Optional[str] = None,
     project_id: Optional[str] = None,
     limit: int = 100,
+    summary: bool = False,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get audit logs (Admin only)"""
+    """Get audit logs (Admin only). Pass summary=true to omit old/new value payloads."""
     user = await permission_checker.get_authenticated_user(current_user)
     await permission_checker.check_admin_role(user)
     
@@ -1168,7 +1224,8 @@ async def get_audit_logs(
         entity_type=entity_type,
         entity_id=entity_id,
         project_id=project_id,
-        limit=limit
+        limit=limit,
+        summary=summary
     )
     
     return logs
@@ -1871,7 +1928,7 @@ async def health_check():
 app.include_router(api_router)
 
 # Include Phase 2 hardened routes
-from hardened_routes import hardened_router
+from hardened_routes import hardened_router, deterministic_service
 app.include_router(hardened_router)
 
 # Include Phase 2 Wave 2 lifecycle routes
@@ -1891,6 +1948,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def start_audit_service():
+    await audit_service.create_indexes()
+    await audit_service.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await audit_service.stop()
     client.close()
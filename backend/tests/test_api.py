@@ -69,6 +69,35 @@ class TestAuth:
         print("Invalid credentials correctly rejected")
 
 
+class TestLogoutAll:
+    """Token revocation via logout-all"""
+    
+    def test_logout_all_revokes_existing_tokens(self):
+        """Test that logout-all invalidates the old access and refresh tokens"""
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "email": SUPERVISOR_EMAIL,
+            "password": SUPERVISOR_PASSWORD
+        })
+        if response.status_code != 200:
+            pytest.skip("Authentication failed - skipping logout-all test")
+        tokens = response.json()
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        
+        response = requests.post(f"{BASE_URL}/api/auth/logout-all", headers=headers)
+        assert response.status_code == 200, f"Logout-all failed: {response.text}"
+        
+        # The access token issued before logout-all is rejected
+        response = requests.get(f"{BASE_URL}/api/projects", headers=headers)
+        assert response.status_code == 401, f"Expected 401, got {response.status_code}"
+        
+        # The refresh token was revoked with it
+        response = requests.post(f"{BASE_URL}/api/auth/refresh", json={
+            "refresh_token": tokens["refresh_token"]
+        })
+        assert response.status_code == 401, f"Expected 401, got {response.status_code}"
+        print("Logout-all revoked access and refresh tokens")
+
+
 class TestSpeechToText:
     """Speech-to-Text endpoint tests"""
     
@@ -179,5 +208,64 @@ class TestProjectEndpoints:
         print(f"Projects response: {data}")
 
 
+
+class TestBulkFinancialMutations:
+    """Bulk financial mutation endpoint tests"""
+    
+    @pytest.fixture
+    def auth_token(self):
+        """Get authentication token for admin"""
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "email": ADMIN_EMAIL,
+            "password": ADMIN_PASSWORD
+        })
+        if response.status_code == 200:
+            return response.json().get("access_token")
+        pytest.skip("Authentication failed")
+    
+    def _post_bulk(self, auth_token, operations):
+        return requests.post(
+            f"{BASE_URL}/api/v2/financial-mutations/bulk",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"operations": operations}
+        )
+    
+    def test_bulk_empty_batch(self, auth_token):
+        """Test that an empty batch returns no results"""
+        response = self._post_bulk(auth_token, [])
+        assert response.status_code == 200, f"Bulk failed: {response.text}"
+        assert response.json() == []
+    
+    def test_bulk_unsupported_operation(self, auth_token):
+        """Test that an unknown operation is rejected"""
+        response = self._post_bulk(auth_token, [{"operation": "delete_payment", "params": {}}])
+        assert response.status_code == 400, f"Expected 400, got {response.status_code}"
+    
+    def test_bulk_invalid_payment_amount(self, auth_token):
+        """Test that params are validated like the single payment route"""
+        response = self._post_bulk(auth_token, [{
+            "operation": "create_payment",
+            "params": {
+                "pc_id": "000000000000000000000000",
+                "payment_amount": "not-a-number",
+                "payment_date": "2024-01-15T00:00:00",
+                "payment_reference": "TEST-REF"
+            }
+        }])
+        assert response.status_code == 422, f"Expected 422, got {response.status_code} - {response.text}"
+    
+    def test_bulk_unknown_budget(self, auth_token):
+        """Test that a budget update requires an existing budget"""
+        response = self._post_bulk(auth_token, [{
+            "operation": "update_budget",
+            "params": {
+                "budget_id": "000000000000000000000000",
+                "approved_budget_amount": 1000.0
+            }
+        }])
+        assert response.status_code == 404, f"Expected 404, got {response.status_code} - {response.text}"
+        print(f"Unknown budget response: {response.json()}")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
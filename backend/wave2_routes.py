@@ -565,6 +565,12 @@ async def initialize_wave2_indexes(
     return {"status": "success", "message": "Wave 2 indexes created"}
 
 
+@wave2_router.on_event("startup")
+async def create_lifecycle_indexes():
+    # unique_daily_attendance must exist for create_attendance to rely on it
+    await lifecycle_engine.create_indexes()
+
+
 # =============================================================================
 # HEALTH CHECK
 # =============================================================================
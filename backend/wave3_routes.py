@@ -99,6 +99,7 @@ class SnapshotCreate(BaseModel):
 class JobSchedule(BaseModel):
     job_type: str = Field(..., description="FINANCIAL_INTEGRITY, MEDIA_PURGE, AUDIO_PURGE, PDF_PURGE, DRIVE_RETRY, COMPRESSION_RETRY")
     params: Optional[Dict] = {}
+    dedup_key: Optional[str] = None
 
 
 class OCRVerify(BaseModel):
@@ -271,10 +272,11 @@ async def schedule_job(
         job_type=job_data.job_type,
         params=job_data.params or {},
         organisation_id=user["organisation_id"],
-        scheduled_by=user["user_id"]
+        scheduled_by=user["user_id"],
+        dedup_key=job_data.dedup_key
     )
     
-    # Start job execution asynchronously
+    # Start job execution asynchronously (a no-op if it already ran)
     await job_engine.run_job_async(job_id)
     
     return {"job_id": job_id, "status": "scheduled"}
@@ -409,12 +411,13 @@ async def run_stt(
     """
     user = await permission_checker.get_authenticated_user(current_user)
     
-    content = await file.read()
     audio_format = file.filename.split(".")[-1].lower() if file.filename else "unknown"
     
     try:
+        # Hand over the spooled upload so the provider streams it instead
+        # of holding a full in-memory copy for the duration of the call
         result = await ai_service.run_stt(
-            audio_content=content,
+            audio_content=file.file,
             audio_format=audio_format,
             organisation_id=user["organisation_id"],
             user_id=user["user_id"],
@@ -1459,6 +1462,16 @@ async def update_dpr(
 # SYSTEM
 # =============================================================================
 
+@wave3_router.on_event("shutdown")
+async def close_ai_service():
+    await ai_service.close()
+
+
+@wave3_router.on_event("shutdown")
+async def close_job_engine():
+    await job_engine.close()
+
+
 @wave3_router.post("/system/init-wave3-indexes")
 async def initialize_wave3_indexes(current_user: dict = Depends(get_current_user)):
     """Initialize all Wave 3 database indexes"""